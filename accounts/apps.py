@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        # 프로젝트 공통 DB 연결 훅 (가장 먼저 로드되는 프로젝트 앱에서 등록)
+        from config.db import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='config.db.configure_sqlite')
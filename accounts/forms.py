@@ -1,8 +1,12 @@
 import json
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
+from django.core.cache import cache
+from django.db.models import Q
 
-from .models import User
+from config.cache import cache_timeout
+
+from .models import User, get_hierarchy_version
 
 # 역할별 상위 역할 매핑: 해당 역할의 parent는 반드시 이 역할이어야 함
 ROLE_PARENT_MAP = {
@@ -13,6 +17,42 @@ ROLE_PARENT_MAP = {
     'seller': 'agency',     # 셀러 → 대행사 소속
 }
 
+# 상위 계정이 될 수 있는 역할
+PARENT_ROLES = ['admin', 'manager', 'agency']
+# 역할별 후보가 이보다 많으면 전체 목록 대신 검색(api_parent_options)으로 선택
+PARENT_CHOICES_INLINE_LIMIT = 500
+PARENT_CANDIDATES_CACHE_TIMEOUT = 60 * 60
+
+
+def get_parent_scope(request_user):
+    """상위 계정 후보 범위의 루트 (경리는 상위 총관리자 범위). None 이면 전체."""
+    if request_user is None:
+        return None
+    return request_user.parent if request_user.is_accountant and request_user.parent else request_user
+
+
+def parent_candidate_queryset(scope_user):
+    """scope_user 본인과 하위 계정 중 활성 상태인 상위 역할 계정."""
+    users = User.objects.filter(is_active=True, role__in=PARENT_ROLES)
+    if scope_user is not None:
+        users = users.filter(Q(pk=scope_user.pk) | Q(pk__in=scope_user.get_descendants().values('pk')))
+    return users
+
+
+def get_parent_candidates(scope_user):
+    """역할별 상위 계정 후보 {role: [{id, label}]} — 계층 버전이 바뀔 때까지 캐시."""
+    key = f'accounts:parent_candidates:{scope_user.pk if scope_user else "all"}:{get_hierarchy_version()}'
+    data = cache.get(key)
+    if data is None:
+        data = {role: [] for role in PARENT_ROLES}
+        rows = parent_candidate_queryset(scope_user).order_by('company_name', 'username').values(
+            'id', 'role', 'company_name', 'username',
+        )
+        for row in rows:
+            data[row['role']].append({'id': row['id'], 'label': row['company_name'] or row['username']})
+        cache.set(key, data, cache_timeout(PARENT_CANDIDATES_CACHE_TIMEOUT))
+    return data
+
 
 class LoginForm(AuthenticationForm):
     username = forms.CharField(
@@ -78,39 +118,52 @@ class UserForm(forms.ModelForm):
                     ('seller', '셀러'),
                 ]
 
-        # parent 필드: 역할별로 분리된 선택지 준비
+        # parent 필드: 편집자 범위의 후보만 검증하고, 선택지는 렌더링 시에만 캐시에서 불러온다
         if 'parent' in self.fields:
             self.fields['parent'].required = False
-            role_labels = dict(User.Role.choices)
-            users = User.objects.filter(is_active=True).order_by('company_name', 'username')
-
-            # 역할별 유저 목록 (JS에서 동적 필터링에 사용)
-            self._parent_data = {}
-            for role_key in ['admin', 'manager', 'agency']:
-                self._parent_data[role_key] = [
-                    {'id': u.pk, 'label': u.company_name or u.username}
-                    for u in users if u.role == role_key
-                ]
-
-            # 초기 선택지: 전체를 그룹으로 표시
-            grouped = {r: [] for r in ['admin', 'manager', 'agency']}
-            for u in users:
-                if u.role in grouped:
-                    label = u.company_name or u.username
-                    grouped[u.role].append((u.pk, label))
-            choices = [('', '-- 역할을 먼저 선택하세요 --')]
-            for role_key in ['admin', 'manager', 'agency']:
-                if grouped[role_key]:
-                    choices.append((role_labels.get(role_key, role_key), grouped[role_key]))
-            self.fields['parent'].choices = choices
+            self._parent_scope = get_parent_scope(self.request_user)
+            queryset = parent_candidate_queryset(self._parent_scope)
+            if self.instance.parent_id:
+                # 기존 소속은 비활성/범위 밖이어도 그대로 저장할 수 있도록 허용
+                queryset = queryset | User.objects.filter(pk=self.instance.parent_id)
+            self.fields['parent'].queryset = queryset
+            self.fields['parent'].choices = self._parent_choices
 
         if self.instance and self.instance.pk:
             self.fields['password1'].help_text = '변경시에만 입력'
             self.fields['username'].disabled = True
 
+    def _current_parent(self):
+        if self.instance.pk and self.instance.parent_id:
+            parent = self.instance.parent
+            return {'id': parent.pk, 'role': parent.role, 'label': parent.company_name or parent.username}
+        return None
+
+    def _parent_choices(self):
+        """초기 선택지: 역할별 그룹 (후보가 많은 역할은 현재 값만 포함하고 JS 검색으로 선택)."""
+        role_labels = dict(User.Role.choices)
+        candidates = get_parent_candidates(self._parent_scope)
+        current = self._current_parent()
+        choices = [('', '-- 역할을 먼저 선택하세요 --')]
+        for role_key in PARENT_ROLES:
+            items = candidates[role_key]
+            if len(items) > PARENT_CHOICES_INLINE_LIMIT:
+                items = [current] if current and current['role'] == role_key else []
+            if items:
+                choices.append((role_labels.get(role_key, role_key), [(u['id'], u['label']) for u in items]))
+        return choices
+
     def get_parent_json(self):
-        """템플릿에서 JS로 넘길 역할별 상위 유저 데이터"""
-        raw = json.dumps(getattr(self, '_parent_data', {}), ensure_ascii=False)
+        """템플릿에서 JS로 넘길 역할별 상위 유저 데이터 (null 이면 해당 역할은 검색으로 선택)"""
+        data = {}
+        if 'parent' in self.fields:
+            candidates = get_parent_candidates(self._parent_scope)
+            data = {
+                role: items if len(items) <= PARENT_CHOICES_INLINE_LIMIT else None
+                for role, items in candidates.items()
+            }
+            data['current'] = self._current_parent()
+        raw = json.dumps(data, ensure_ascii=False)
         return raw.replace('&', '\\u0026').replace('<', '\\u003c').replace('>', '\\u003e')
 
     def clean_password1(self):
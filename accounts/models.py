@@ -1,8 +1,29 @@
+import time
 from decimal import Decimal
 
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
 
+from config.cache import cache_timeout
+
+HIERARCHY_VERSION_KEY = 'accounts:hierarchy_version'
+# 이 필드가 바뀌면 계층 기반 캐시(상위 계정 후보 등)를 무효화
+HIERARCHY_FIELDS = {'username', 'company_name', 'role', 'parent', 'parent_id', 'is_active'}
+
+
+def get_hierarchy_version():
+    """계층 캐시 키에 붙이는 버전. 키가 사라져도 이전 값이 재사용되지 않도록 시각 기반.
+
+    워커별 로컬 캐시면 다른 워커의 bump 가 보이지 않으므로 버전도 짧게 만료시킨다 (config.cache).
+    """
+    return cache.get_or_set(HIERARCHY_VERSION_KEY, time.time_ns, cache_timeout(None))
+
+
+def bump_hierarchy_version():
+    """계층 변경 후 호출 — save()/delete() 는 자동, bulk_create/update 는 직접 호출해야 한다."""
+    cache.set(HIERARCHY_VERSION_KEY, time.time_ns(), cache_timeout(None))
+
 
 class User(AbstractUser):
     class Role(models.TextChoices):
@@ -44,13 +65,31 @@ class User(AbstractUser):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='가입일')
 
+    # 총관리자 → 책임자 → 대행사 → 셀러 (ROLE_PARENT_MAP 기준 최대 깊이)
+    HIERARCHY_DEPTH = 3
+
     class Meta:
         verbose_name = '사용자'
         verbose_name_plural = '사용자'
+        indexes = [
+            # 업체 트리 API: 상위 계정별 하위 목록을 이름순 커서 페이징
+            models.Index(fields=['parent', 'company_name', 'id'], name='accounts_user_tree_idx'),
+        ]
 
     def __str__(self):
         return f'[{self.get_role_display()}] {self.company_name or self.username}'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or HIERARCHY_FIELDS.intersection(update_fields):
+            bump_hierarchy_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_hierarchy_version()
+        return result
+
     @property
     def is_admin(self):
         return self.role == self.Role.ADMIN
@@ -92,6 +131,28 @@ class User(AbstractUser):
 
         return descendants
 
+    def get_descendants(self):
+        """하위 계정 queryset — parent 조인으로 한 번의 쿼리에 조회 (최대 HIERARCHY_DEPTH 단계)."""
+        condition = models.Q()
+        lookup = 'parent'
+        for _ in range(self.HIERARCHY_DEPTH):
+            condition |= models.Q(**{lookup: self})
+            lookup += '__parent'
+        return User.objects.filter(condition)
+
+    def get_order_scope_q(self, field='user'):
+        """get_all_order_user_ids 와 같은 범위를 IN 목록 대신 parent 조인 조건으로 (경리는 상위 총관리자 범위).
+
+        id 만 사용하므로 async 뷰에서도 추가 조회 없이 호출할 수 있다.
+        """
+        scope_id = self.parent_id if self.is_accountant and self.parent_id else self.pk
+        condition = models.Q(**{f'{field}_id': scope_id})
+        lookup = field
+        for _ in range(self.HIERARCHY_DEPTH):
+            lookup += '__parent'
+            condition |= models.Q(**{f'{lookup}_id': scope_id})
+        return condition
+
     def get_all_order_user_ids(self):
         """주문 조회에 포함할 전체 사용자 ID(자기 자신 포함).
         경리는 상위 총관리자의 범위를 상속받는다."""
@@ -1,6 +1,28 @@
+import json
+import os
+import runpy
+import time
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.forms import PARENT_CHOICES_INLINE_LIMIT, UserForm
+from accounts.models import User, bump_hierarchy_version
+
 
-from accounts.models import User
+def _bulk_users(role, parents, per_parent, prefix):
+    users = [
+        User(username=f'{prefix}{p.id}_{i}', role=role, parent=p, company_name=f'{prefix}{p.id}_{i}', password='!')
+        for p in parents for i in range(per_parent)
+    ]
+    User.objects.bulk_create(users, batch_size=1000)
+    return list(User.objects.filter(role=role, username__startswith=prefix))
 
 
 class UserHierarchyTests(TestCase):
@@ -32,3 +54,186 @@ class UserHierarchyTests(TestCase):
     def test_get_all_order_user_ids_includes_self(self):
         all_ids = set(self.manager.get_all_order_user_ids())
         self.assertEqual(all_ids, {self.manager.id, self.agency.id, self.seller.id})
+
+    def test_get_descendants_matches_descendant_ids(self):
+        for user in (self.admin, self.manager, self.agency, self.seller):
+            self.assertEqual(
+                set(user.get_descendants().values_list('id', flat=True)),
+                set(user.get_descendant_ids()),
+            )
+
+
+class UserTreeApiTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.client.login(username='admin', password='pw')
+
+    def _grow(self, managers, agencies, sellers, prefix):
+        manager_rows = _bulk_users('manager', [self.admin], managers, f'{prefix}m')
+        agency_rows = _bulk_users('agency', manager_rows, agencies, f'{prefix}a')
+        _bulk_users('seller', agency_rows, sellers, f'{prefix}s')
+        return manager_rows
+
+    def _api(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('accounts:api_user_tree'), params)
+        return response, len(ctx.captured_queries)
+
+    def test_root_level_returns_direct_children_with_counts(self):
+        managers = self._grow(2, 3, 1, 'x')
+        response = self.client.get(reverse('accounts:user_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['root_child_count'], 2)
+
+        response, _ = self._api()
+        nodes = response.json()['nodes']
+        self.assertEqual([n['id'] for n in nodes], [m.id for m in sorted(managers, key=lambda u: u.company_name)])
+        self.assertEqual({n['child_count'] for n in nodes}, {3})
+        self.assertIsNone(response.json()['next_cursor'])
+
+    def test_cursor_pages_through_siblings(self):
+        self._grow(7, 0, 0, 'p')
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self._api(**params)[0].json()
+            seen += [n['id'] for n in data['nodes']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = list(User.objects.filter(parent=self.admin).order_by('company_name', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_search_and_scope(self):
+        managers = self._grow(1, 1, 2, 's')
+        seller = User.objects.filter(role=User.Role.SELLER).first()
+        nodes = self._api(q=seller.company_name)[0].json()['nodes']
+        self.assertEqual([n['id'] for n in nodes], [seller.id])
+        self.assertTrue(nodes[0]['parent_label'])
+
+        other_admin = User.objects.create_user(username='other', password='pw', role=User.Role.ADMIN)
+        other_manager = User.objects.create_user(username='om', password='pw', role=User.Role.MANAGER, parent=other_admin)
+        self.assertEqual(self._api(parent=other_manager.id)[0].status_code, 404)
+        self.assertEqual(self._api(parent=managers[0].id)[0].status_code, 200)
+        self.assertEqual(self._api(q='om')[0].json()['nodes'], [])
+
+        self.client.force_login(seller)
+        self.assertEqual(self._api()[0].status_code, 403)
+
+    def test_query_count_does_not_grow_with_hierarchy(self):
+        managers = self._grow(1, 1, 1, 'a')
+        _, root_count = self._api()
+        _, child_count = self._api(parent=managers[0].id)
+
+        managers += self._grow(5, 4, 3, 'b')
+        _, count = self._api()
+        self.assertEqual(count, root_count)
+        _, count = self._api(parent=managers[-1].id)
+        self.assertEqual(count, child_count)
+
+    @skipUnless(os.getenv('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+    def test_benchmark_large_organization(self):
+        # 50 managers / 500 agencies / 10,000 sellers
+        self._grow(50, 10, 20, 'b')
+        started = time.perf_counter()
+        page = self.client.get(reverse('accounts:user_list'))
+        response, count = self._api()
+        elapsed = time.perf_counter() - started
+        print(f'\nuser_list + first tree page 50/500/10000: {elapsed * 1000:.0f} ms, '
+              f'{count} api queries, {len(page.content) + len(response.content)} bytes')
+
+
+class UserFormParentChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.manager = User.objects.create_user(
+            username='manager', password='pw', role=User.Role.MANAGER, parent=self.admin, company_name='가나',
+        )
+        self.agency = User.objects.create_user(
+            username='agency', password='pw', role=User.Role.AGENCY, parent=self.manager, company_name='다라',
+        )
+        self.other_admin = User.objects.create_user(username='other', password='pw', role=User.Role.ADMIN)
+        self.other_manager = User.objects.create_user(
+            username='other_manager', password='pw', role=User.Role.MANAGER, parent=self.other_admin,
+        )
+        self.client.login(username='admin', password='pw')
+
+    def _parent_json(self):
+        return json.loads(UserForm(request_user=self.admin).get_parent_json())
+
+    def test_candidates_are_scoped_and_cached(self):
+        data = self._parent_json()
+        self.assertEqual([u['id'] for u in data['admin']], [self.admin.id])
+        self.assertEqual([u['id'] for u in data['manager']], [self.manager.id])
+        self.assertEqual([u['id'] for u in data['agency']], [self.agency.id])
+
+        with self.assertNumQueries(0):
+            self._parent_json()
+
+        self.manager.company_name = '마바'
+        self.manager.save()
+        self.assertEqual(self._parent_json()['manager'][0]['label'], '마바')
+
+    def test_local_cache_expires_other_workers_changes(self):
+        self._parent_json()
+        # 다른 워커가 저장한 변경 — 이 워커의 LocMem 에는 bump 가 보이지 않는다
+        User.objects.filter(pk=self.manager.pk).update(company_name='사아')
+        self.assertEqual(self._parent_json()['manager'][0]['label'], '가나')
+
+        later = time.time() + settings.LOCAL_CACHE_MAX_TIMEOUT + 1
+        with patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self._parent_json()['manager'][0]['label'], '사아')
+
+    def test_out_of_scope_parent_is_rejected(self):
+        form = UserForm(
+            data={'username': 'new_agency', 'password1': 'pw', 'role': 'agency', 'parent': self.other_manager.id},
+            request_user=self.admin,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('parent', form.errors)
+
+    def test_large_roles_switch_to_type_ahead(self):
+        _bulk_users('agency', [self.manager], PARENT_CHOICES_INLINE_LIMIT + 1, 'bulk')
+        bump_hierarchy_version()
+        self.assertIsNone(self._parent_json()['agency'])
+
+        response = self.client.get(reverse('accounts:api_parent_options'), {'role': 'agency', 'q': 'bulk'})
+        self.assertEqual(len(response.json()['results']), 20)
+        response = self.client.get(reverse('accounts:api_parent_options'), {'role': 'manager', 'q': 'other'})
+        self.assertEqual(response.json()['results'], [])
+
+        self.client.force_login(self.agency)
+        response = self.client.get(reverse('accounts:api_parent_options'), {'role': 'agency'})
+        self.assertEqual(response.status_code, 403)
+
+
+class DatabaseSettingsTests(TestCase):
+    def _settings(self, **env):
+        with patch.dict(os.environ, env):
+            return runpy.run_path(str(settings.BASE_DIR / 'config' / 'settings.py'))
+
+    def test_sqlite_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_BUSY_TIMEOUT_MS)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_postgresql_settings_from_env(self):
+        db = self._settings(DB_ENGINE='postgresql', DB_NAME='oms', DB_STATEMENT_TIMEOUT_MS='5000')['DATABASES']['default']
+        self.assertEqual(db['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(db['NAME'], 'oms')
+        self.assertEqual(db['CONN_MAX_AGE'], 60)
+        self.assertEqual(db['OPTIONS']['options'], '-c statement_timeout=5000')
+
+        pooled = self._settings(DB_ENGINE='postgresql', DB_POOL='1', DB_POOL_MAX_SIZE='20')['DATABASES']['default']
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        self.assertEqual(pooled['OPTIONS']['pool']['max_size'], 20)
+
+    def test_empty_analytics_root_uses_default(self):
+        # .env.example 의 빈 ANALYTICS_ROOT= 가 현재 디렉터리(Path(''))가 되지 않도록
+        self.assertEqual(self._settings(ANALYTICS_ROOT='')['ANALYTICS_ROOT'], settings.BASE_DIR / 'analytics')
@@ -7,6 +7,8 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('users/', views.user_list, name='user_list'),
+    path('users/api/tree/', views.api_user_tree, name='api_user_tree'),
+    path('users/api/parent-options/', views.api_parent_options, name='api_parent_options'),
     path('users/create/', views.user_create, name='user_create'),
     path('users/<int:pk>/edit/', views.user_edit, name='user_edit'),
     path('users/<int:pk>/delete/', views.user_delete, name='user_delete'),
@@ -1,10 +1,17 @@
+import base64
+import json
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.http import require_POST
 from .models import User
-from .forms import LoginForm, UserForm
+from .forms import PARENT_ROLES, LoginForm, UserForm, get_parent_scope, parent_candidate_queryset
 
 
 def login_view(request):
@@ -27,113 +34,138 @@ def logout_view(request):
     return redirect('accounts:login')
 
 
+USER_TREE_PAGE_SIZE = 50
+USER_TREE_MAX_PAGE_SIZE = 200
+
+
+def _user_tree_scope(user):
+    """업체 트리의 루트 계정 (경리는 상위 총관리자의 범위를 사용). 셀러는 None."""
+    if user.is_admin or user.is_accountant:
+        return user.parent if user.is_accountant and user.parent else user
+    if user.is_manager or user.is_agency:
+        return user
+    return None
+
+
+def _encode_cursor(user):
+    raw = json.dumps([user.company_name, user.id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        company_name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(company_name), int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def _tree_node(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'label': user.company_name or user.username,
+        'first_name': user.first_name,
+        'phone': user.phone,
+        'role': user.role,
+        'role_display': user.get_role_display(),
+        'is_active': user.is_active,
+        'child_count': user.child_count,
+        'parent_id': user.parent_id,
+        'parent_label': (user.parent.company_name or user.parent.username) if user.parent_id else '',
+        'edit_url': reverse('accounts:user_edit', args=[user.pk]),
+    }
+
+
 @login_required
 def user_list(request):
-    pass  # admin view - account management only
+    scope_user = _user_tree_scope(request.user)
+    if scope_user is None:
+        return redirect('dashboard:index')
+    # 트리는 api_user_tree 로 한 단계씩 불러오므로 전체 하위 계정 수와 무관하게 렌더링
+    return render(request, 'accounts/user_list.html', {
+        'scope_user': scope_user,
+        'root_child_count': scope_user.children.count(),
+    })
 
-    if request.user.is_admin or request.user.is_accountant:
-        # 경리는 상위 총관리자의 범위를 사용
-        scope_user = request.user.parent if request.user.is_accountant and request.user.parent else request.user
-        descendant_ids = set(scope_user.get_descendant_ids())
-
-        # 책임자 → 대행사 → 셀러 3단계 트리
-        managers = User.objects.filter(role='manager', is_active=True, id__in=descendant_ids).order_by('company_name')
-        manager_groups = []
-        assigned_agency_ids = set()
-
-        for manager in managers:
-            agencies = User.objects.filter(parent=manager, role='agency', is_active=True, id__in=descendant_ids).order_by('company_name')
-            assigned_agency_ids.update(agencies.values_list('id', flat=True))
-
-            agency_rows = []
-            for agency in agencies:
-                sellers = User.objects.filter(parent=agency, role='seller', is_active=True, id__in=descendant_ids).order_by('company_name')
-                seller_rows = [{'user': s} for s in sellers]
-                agency_rows.append({
-                    'agency': agency,
-                    'sellers': seller_rows,
-                })
-
-            manager_groups.append({
-                'manager': manager,
-                'agencies': agency_rows,
-            })
-
-        # 책임자 소속 없는 대행사 → 셀러 트리 (소속 내에서만)
-        independent_agencies = User.objects.filter(
-            role='agency', is_active=True, id__in=descendant_ids,
-        ).exclude(id__in=assigned_agency_ids).order_by('company_name')
-        indie_agency_groups = []
-        assigned_seller_ids = set()
-
-        for agency in independent_agencies:
-            sellers = User.objects.filter(parent=agency, role='seller', is_active=True, id__in=descendant_ids).order_by('company_name')
-            assigned_seller_ids.update(sellers.values_list('id', flat=True))
-            seller_rows = [{'user': s} for s in sellers]
-            indie_agency_groups.append({
-                'agency': agency,
-                'sellers': seller_rows,
-            })
-
-        # 총관리자 본인 (직속 경리 + 셀러 포함)
-        admin_rows = []
-        direct_accountants = User.objects.filter(parent=scope_user, role='accountant', is_active=True).order_by('company_name')
-        accountant_rows = [{'user': a} for a in direct_accountants]
-        direct_sellers = User.objects.filter(parent=scope_user, role='seller', is_active=True).order_by('company_name')
-        seller_rows = [{'user': s} for s in direct_sellers]
-        admin_seller_ids = set(direct_sellers.values_list('id', flat=True))
-        admin_rows.append({
-            'user': scope_user,
-            'accountants': accountant_rows,
-            'sellers': seller_rows,
-        })
-
-        # 소속 없는 셀러 (소속 내에서만)
-        all_assigned_seller_ids = set()
-        for mg in manager_groups:
-            for ag in mg['agencies']:
-                for sr in ag['sellers']:
-                    all_assigned_seller_ids.add(sr['user'].id)
-        for ag in indie_agency_groups:
-            for sr in ag['sellers']:
-                all_assigned_seller_ids.add(sr['user'].id)
-        all_assigned_seller_ids.update(assigned_seller_ids)
-        all_assigned_seller_ids.update(admin_seller_ids)
-
-        independent_sellers = User.objects.filter(
-            role='seller', is_active=True, id__in=descendant_ids,
-        ).exclude(id__in=all_assigned_seller_ids).order_by('company_name')
-        indie_rows = [{'user': s} for s in independent_sellers]
-
-        return render(request, 'accounts/user_list.html', {
-            'admin_rows': admin_rows,
-            'manager_groups': manager_groups,
-            'groups': indie_agency_groups,
-            'indie_sellers': indie_rows,
-        })
-
-    elif request.user.is_manager:
-        # 책임자: 소속 대행사 → 셀러 트리 (읽기만)
-        agencies = User.objects.filter(parent=request.user, role='agency', is_active=True).order_by('company_name')
-        groups = []
-        for agency in agencies:
-            sellers = User.objects.filter(parent=agency, role='seller', is_active=True).order_by('company_name')
-            groups.append({
-                'agency': agency,
-                'sellers': [{'user': s} for s in sellers],
-            })
-        return render(request, 'accounts/user_list.html', {
-            'manager_view_groups': groups,
-        })
-
-    elif request.user.is_agency:
-        sellers = User.objects.filter(parent=request.user, is_active=True).order_by('company_name')
-        return render(request, 'accounts/user_list.html', {
-            'sellers': sellers,
-        })
 
+@login_required
+def api_user_tree(request):
+    """업체 트리 JSON: parent 의 직속 하위 계정 한 단계 (q 가 있으면 범위 내 전체 검색).
+
+    정렬은 (company_name, id), next_cursor 로 다음 페이지를 이어서 조회한다.
+    """
+    scope_user = _user_tree_scope(request.user)
+    if scope_user is None:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', USER_TREE_PAGE_SIZE)), 1), USER_TREE_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'invalid_limit'}, status=400)
+
+    q = request.GET.get('q', '').strip()
+    if q:
+        users = scope_user.get_descendants().filter(
+            models.Q(username__icontains=q) | models.Q(company_name__icontains=q)
+            | models.Q(first_name__icontains=q) | models.Q(phone__icontains=q)
+        )
     else:
-        return redirect('dashboard:index')
+        try:
+            parent_id = int(request.GET.get('parent') or scope_user.id)
+        except ValueError:
+            return JsonResponse({'error': 'invalid_parent'}, status=400)
+        if parent_id != scope_user.id and not scope_user.get_descendants().filter(pk=parent_id).exists():
+            return JsonResponse({'error': 'not_found'}, status=404)
+        users = User.objects.filter(parent_id=parent_id)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({'error': 'invalid_cursor'}, status=400)
+        company_name, pk = position
+        users = users.filter(
+            models.Q(company_name__gt=company_name) | models.Q(company_name=company_name, id__gt=pk)
+        )
+
+    child_count = User.objects.filter(parent_id=models.OuterRef('pk')).order_by().values('parent_id').annotate(
+        c=models.Count('id'),
+    ).values('c')
+    users = users.select_related('parent').only(
+        'id', 'username', 'company_name', 'first_name', 'phone', 'role', 'is_active', 'parent_id',
+        'parent__username', 'parent__company_name',
+    ).annotate(
+        child_count=Coalesce(models.Subquery(child_count), 0),
+    ).order_by('company_name', 'id')
+
+    page = list(users[:limit + 1])
+    next_cursor = _encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return JsonResponse({
+        'nodes': [_tree_node(u) for u in page[:limit]],
+        'next_cursor': next_cursor,
+    })
+
+
+PARENT_OPTIONS_LIMIT = 20
+
+
+@login_required
+def api_parent_options(request):
+    """UserForm 담당자(소속) 검색: role 역할의 상위 계정 후보를 이름 검색."""
+    if not (request.user.is_admin or request.user.is_accountant):
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    role = request.GET.get('role')
+    if role not in PARENT_ROLES:
+        return JsonResponse({'error': 'invalid_role'}, status=400)
+    users = parent_candidate_queryset(get_parent_scope(request.user)).filter(role=role)
+    q = request.GET.get('q', '').strip()
+    if q:
+        users = users.filter(models.Q(company_name__icontains=q) | models.Q(username__icontains=q))
+    rows = users.order_by('company_name', 'username').values('id', 'company_name', 'username')[:PARENT_OPTIONS_LIMIT]
+    return JsonResponse({
+        'results': [{'id': row['id'], 'label': row['company_name'] or row['username']} for row in rows],
+    })
 
 
 @login_required
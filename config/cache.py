@@ -0,0 +1,20 @@
+"""캐시 TTL 보정 — 버전 키로 무효화하는 캐시가 워커별 로컬 캐시에서도 오래 stale 하지 않도록."""
+from django.conf import settings
+
+# 프로세스마다 따로 저장되는 백엔드 (다른 워커의 set/delete 가 보이지 않음)
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias='default'):
+    return settings.CACHES[alias]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def cache_timeout(timeout, alias='default'):
+    """공유 캐시면 timeout 그대로, 로컬 캐시면 LOCAL_CACHE_MAX_TIMEOUT 이하로 (None=무기한 포함)."""
+    if is_shared_cache(alias):
+        return timeout
+    limit = settings.LOCAL_CACHE_MAX_TIMEOUT
+    return limit if timeout is None else min(timeout, limit)
@@ -0,0 +1,105 @@
+"""데이터베이스 연결 설정 훅과 read replica 라우팅."""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """SQLite 연결마다 WAL/busy_timeout/synchronous 를 설정해 개발 환경의 동시 쓰기 대기를 줄인다."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+
+
+# ── Read replica 라우팅 ──
+
+_replica_reads = ContextVar('replica_reads', default=False)
+READ_YOUR_WRITES_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ReplicaRouter:
+    """@read_from_replica 로 감싼 뷰 안의 조회만 replica 로, 나머지는 모두 default."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return settings.REPLICA_DATABASE_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica 는 default 의 복제본이므로 두 alias 간 객체 관계를 허용
+        if {obj1._state.db, obj2._state.db} <= {'default', settings.REPLICA_DATABASE_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if settings.REPLICA_DATABASE_ALIAS and db == settings.REPLICA_DATABASE_ALIAS:
+            return False
+        return None
+
+
+def _wrote_recently(request):
+    try:
+        return float(request.COOKIES.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_from_replica(view):
+    """읽기 전용 뷰(엑셀 다운로드/대시보드)의 GET 조회를 replica 로 보낸다.
+
+    replica 가 설정되지 않았거나, 사용자가 최근 REPLICA_READ_YOUR_WRITES_SECONDS 안에
+    쓰기 요청을 보냈다면 primary 에서 읽는다.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (not settings.REPLICA_DATABASE_ALIAS or request.method not in SAFE_METHODS
+                or _wrote_recently(request)):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+class ReadYourWritesMiddleware:
+    """쓰기 요청(POST 등) 응답에 쿠키를 붙여, 잠시 동안 그 사용자의 조회를 primary 로 고정한다.
+
+    ASGI 에서 async 뷰까지 스레드 전환 없이 이어지도록 sync/async 양쪽을 지원한다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._mark(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._mark(request, await self.get_response(request))
+
+    def _mark(self, request, response):
+        if settings.REPLICA_DATABASE_ALIAS and request.method not in SAFE_METHODS:
+            window = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE, str(int(time.time()) + window),
+                max_age=window, httponly=True,
+                secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,212 @@
+"""PostgreSQL 월별 범위 파티셔닝 (created_at 기준, 선택 기능).
+
+가장 빨리 늘어나는 주문 항목/알림 테이블을 created_at 월(Asia/Seoul) 단위 파티션으로 나눈다.
+created_at 범위 조회는 해당 월 파티션만 읽고(partition pruning), 오래된 데이터는
+대량 DELETE 대신 파티션을 떼어내(DETACH) 지울 수 있어 vacuum 부담이 줄어든다.
+
+- DB_PARTITIONING=1 인 PostgreSQL 에서만 동작한다. SQLite/미사용 환경에서는 아무것도 하지 않는다.
+- 기본키는 (id, created_at) 이 된다 (파티션 키가 포함되어야 하므로). id 는 시퀀스로 계속 고유하다.
+- 범위를 벗어난 행은 기본(default) 파티션으로 들어가므로 maintain_partitions 를 빼먹어도 INSERT 는 실패하지 않는다.
+  나중에 그 달 파티션을 만들 때 기본 파티션의 해당 월 행을 새 파티션으로 옮긴다.
+- 변환은 테이블을 새로 만들어 복사하므로 migrate 하는 동안 해당 테이블이 잠긴다.
+"""
+from datetime import date, datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+PARTITIONED_TABLES = ('orders_orderitem', 'dashboard_notification')
+PARTITION_KEY = 'created_at'
+
+
+def partitioning_enabled(connection):
+    return connection.vendor == 'postgresql' and settings.DB_PARTITIONING
+
+
+def shift_month(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bound(month):
+    """파티션 경계 (현재 시간대 월 1일 0시)."""
+    return timezone.make_aware(datetime(month.year, month.month, 1))
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection, table):
+    """월 파티션 [(월 1일, 파티션명)] — 월 순, 기본 파티션 제외."""
+    prefix = f'{table}_p'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)', [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        (date(int(name[-6:-2]), int(name[-2:]), 1), name)
+        for name in names if name.startswith(prefix) and name[len(prefix):].isdigit()
+    )
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def _create_month_partition(connection, cursor, table, month):
+    """월 파티션 생성. 기본 파티션에 그 달 행이 있으면 CREATE 가 범위 충돌로 실패하므로
+    기본 파티션을 잠시 떼어낸 뒤 파티션을 만들고, 행을 옮기고, 다시 붙인다 (같은 트랜잭션)."""
+    qn = connection.ops.quote_name
+    default = default_partition_name(table)
+    lower, upper = month_bound(month).isoformat(), month_bound(shift_month(month, 1)).isoformat()
+    in_month = f"{qn(PARTITION_KEY)} >= '{lower}' AND {qn(PARTITION_KEY)} < '{upper}'"
+    create = (
+        f'CREATE TABLE {qn(partition_name(table, month))} PARTITION OF {qn(table)} '
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [default])
+    moved = False
+    if cursor.fetchone()[0]:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE {in_month})')
+        moved = cursor.fetchone()[0]
+    if not moved:
+        cursor.execute(create)
+        return
+
+    cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(default)}')
+    cursor.execute(create)
+    cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(default)} WHERE {in_month}')
+    cursor.execute(f'DELETE FROM {qn(default)} WHERE {in_month}')
+    cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default)} DEFAULT')
+
+
+def create_partitions(connection, table, start, through):
+    """start ~ through 월 파티션을 없으면 만든다 (기본 파티션의 그 달 행은 옮긴다). 반환: 새로 만든 파티션명 목록."""
+    existing = {name for _, name in list_partitions(connection, table)}
+    created = []
+    month = start.replace(day=1)
+    with connection.cursor() as cursor:
+        while month <= through:
+            name = partition_name(table, month)
+            if name not in existing:
+                _create_month_partition(connection, cursor, table, month)
+                created.append(name)
+            month = shift_month(month, 1)
+    return created
+
+
+def detach_partitions(connection, table, before, drop=False, only_empty=False):
+    """before 월보다 이전 월 파티션을 떼어낸다 (drop 이면 삭제). 반환: (처리한 목록, 건너뛴 목록).
+
+    only_empty 면 행이 남은 파티션은 건너뛴다 (주문 항목처럼 살아 있는 데이터가 참조하는 테이블).
+    """
+    qn = connection.ops.quote_name
+    done, skipped = [], []
+    with connection.cursor() as cursor:
+        for month, name in list_partitions(connection, table):
+            if month >= before:
+                break
+            if only_empty:
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {qn(name)})')
+                if cursor.fetchone()[0]:
+                    skipped.append(name)
+                    continue
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {qn(name)}')
+            done.append(name)
+    return done, skipped
+
+
+def _table_ddl(cursor, table):
+    """테이블을 다시 만들 때 복원할 인덱스/외래키 DDL (기본키·고유 제약 제외)."""
+    cursor.execute(
+        'SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = to_regclass(%s) '
+        'AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid '
+        "AND c.conrelid = i.indrelid AND c.contype IN ('p', 'u', 'x'))", [table],
+    )
+    # 파티션 테이블의 인덱스는 'ON ONLY' 로 나온다 — 일반 테이블로 되돌릴 때도 그대로 쓸 수 있게
+    statements = [row[0].replace(' ON ONLY ', ' ON ') for row in cursor.fetchall()]
+    cursor.execute(
+        'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'", [table],
+    )
+    statements += [
+        f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}' for name, definition in cursor.fetchall()
+    ]
+    cursor.execute(
+        "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype IN ('u', 'x')", [table],
+    )
+    if cursor.fetchone():
+        raise ValueError(f'{table}: 고유 제약이 있는 테이블은 파티션 변환을 지원하지 않습니다.')
+    return statements
+
+
+def _rebuild(connection, table, partitioned, ahead=0):
+    """table 을 같은 열의 새 테이블(파티션 또는 일반)로 옮긴다."""
+    qn = connection.ops.quote_name
+    old = f'{table}_old'
+    with connection.cursor() as cursor:
+        statements = _table_ddl(cursor, table)
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            'SELECT attidentity FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s', [table, 'id'],
+        )
+        identity = bool(cursor.fetchone()[0])
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY)'
+            + (f' PARTITION BY RANGE ({qn(PARTITION_KEY)})' if partitioned else '')
+        )
+        if sequence and not identity:
+            # serial 컬럼: 기존 시퀀스가 옛 테이블과 함께 지워지지 않도록 소유자를 옮긴다
+            cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.{qn("id")}')
+
+        if partitioned:
+            cursor.execute(f'SELECT MIN({qn(PARTITION_KEY)}) FROM {qn(old)}')
+            first = cursor.fetchone()[0]
+            this_month = timezone.localdate().replace(day=1)
+            start = timezone.localtime(first).date().replace(day=1) if first else this_month
+            cursor.execute(f'CREATE TABLE {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT')
+            create_partitions(connection, table, min(start, this_month), shift_month(this_month, ahead))
+
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(old)}')
+        cursor.execute(f'DROP TABLE {qn(old)}')
+        key = f'{qn("id")}, {qn(PARTITION_KEY)}' if partitioned else qn('id')
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY ({key})')
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM " + qn(table),
+            [table],
+        )
+
+
+def partition_table(connection, table, ahead=None):
+    """일반 테이블 → 월 파티션 테이블 (이미 파티션이거나 기능이 꺼져 있으면 False)."""
+    if not partitioning_enabled(connection) or is_partitioned(connection, table):
+        return False
+    _rebuild(connection, table, True, settings.DB_PARTITION_MONTHS_AHEAD if ahead is None else ahead)
+    return True
+
+
+def unpartition_table(connection, table):
+    """월 파티션 테이블 → 일반 테이블 (migrate 되돌리기용)."""
+    if connection.vendor != 'postgresql' or not is_partitioned(connection, table):
+        return False
+    _rebuild(connection, table, False)
+    return True
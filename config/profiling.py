@@ -0,0 +1,212 @@
+"""요청 단위 프로파일링 (PROFILING_ENABLED=True 일 때만 동작).
+
+요청마다 전체 시간, DB 시간, 쿼리 수, 중복 쿼리 수(N+1 탐지), 최대 메모리를 기록해
+메모리 ring buffer 에 쌓고, URL 이름(예: orders:order_list)별로 집계해 보여준다.
+PROFILING_CPROFILE_RATE 비율만큼의 요청은 cProfile 결과(.prof)를 파일로 남긴다.
+"""
+import cProfile
+import random
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+UNRESOLVED = '<unresolved>'
+SQL_PREVIEW_LENGTH = 300
+_PROFILE_NAME_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+_records = deque()
+_lock = threading.Lock()
+# 현재 요청의 QueryRecorder — sync_to_async 가 context 를 복사하므로 async 뷰의 쿼리도 같은 요청에 기록된다
+_active_recorder = ContextVar('profiling_recorder', default=None)
+
+
+def clear():
+    """기록을 비우고 버퍼 크기를 현재 설정(PROFILING_BUFFER_SIZE)으로 맞춘다."""
+    global _records
+    with _lock:
+        _records = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+
+
+def recent(limit=None):
+    with _lock:
+        records = list(_records)
+    return records[-limit:] if limit else records
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def summarize():
+    """URL 이름별 집계. 평균 시간이 긴 순으로 정렬."""
+    groups = {}
+    for record in recent():
+        groups.setdefault(record['view'], []).append(record)
+
+    rows = []
+    for view, records in groups.items():
+        count = len(records)
+        wall = sorted(r['wall_ms'] for r in records)
+        memory = [r['peak_memory_kb'] for r in records if r['peak_memory_kb'] is not None]
+        worst = max(records, key=lambda r: r['duplicate_queries'])
+        rows.append({
+            'view': view,
+            'requests': count,
+            'wall_ms_avg': round(sum(wall) / count, 2),
+            'wall_ms_p95': _percentile(wall, 95),
+            'wall_ms_max': wall[-1],
+            'db_ms_avg': round(sum(r['db_ms'] for r in records) / count, 2),
+            'queries_avg': round(sum(r['queries'] for r in records) / count, 2),
+            'queries_max': max(r['queries'] for r in records),
+            'duplicate_queries_max': worst['duplicate_queries'],
+            'top_duplicate_sql': worst['top_duplicate_sql'],
+            'peak_memory_kb_max': max(memory) if memory else None,
+        })
+    rows.sort(key=lambda row: row['wall_ms_avg'], reverse=True)
+    return rows
+
+
+class QueryRecorder:
+    """connection.execute_wrapper 로 쿼리 수/시간과 SQL 템플릿별 반복 횟수를 센다."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        # 같은 SQL 템플릿이 파라미터만 바뀌어 반복 실행된 횟수 (첫 실행 제외)
+        return sum(n - 1 for n in self.statements.values())
+
+    def top_duplicate(self):
+        if not self.statements:
+            return None
+        sql, n = self.statements.most_common(1)[0]
+        return {'sql': sql[:SQL_PREVIEW_LENGTH], 'count': n} if n > 1 else None
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(sender=None, connection=None, **kwargs):
+    """연결마다 한 번 _record_query 를 설치한다 (DB 연결은 스레드별이라 요청마다 감쌀 수 없다)."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _dump_profile(profiler, view):
+    directory = settings.PROFILING_CPROFILE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    name = _PROFILE_NAME_RE.sub('_', view.replace(':', '.'))
+    path = directory / f'{name}-{timezone.now():%Y%m%d-%H%M%S-%f}.prof'
+    profiler.dump_stats(path)
+    return path.name
+
+
+class ProfilingMiddleware:
+    """요청별 성능 지표를 ring buffer 에 기록하는 opt-in 미들웨어.
+
+    메모리는 tracemalloc 기준이며, 여러 요청이 동시에 처리되면 최대값이 섞일 수 있다.
+    ASGI 에서는 async 로 동작해 체인 전체가 스레드 전환 없이 이어진다 (cProfile 은 이벤트 루프 스레드만 잰다).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        clear()
+        connection_created.connect(install_query_hook, dispatch_uid='config.profiling.install_query_hook')
+        for connection in connections.all(initialized_only=True):
+            install_query_hook(connection=connection)
+        if settings.PROFILING_TRACE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with ExitStack() as stack:
+            state = self._start(stack)
+            response = self.get_response(request)
+        return self._finish(request, response, *state)
+
+    async def __acall__(self, request):
+        with ExitStack() as stack:
+            state = self._start(stack)
+            response = await self.get_response(request)
+        return self._finish(request, response, *state)
+
+    def _start(self, stack):
+        recorder = QueryRecorder()
+        profiler = None
+        if settings.PROFILING_CPROFILE_RATE and random.random() < settings.PROFILING_CPROFILE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # 다른 요청이 이미 프로파일링 중
+                profiler = None
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        stack.callback(_active_recorder.reset, _active_recorder.set(recorder))
+        return recorder, profiler, tracing, time.perf_counter()
+
+    def _finish(self, request, response, recorder, profiler, tracing, started):
+        wall = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if tracing else None
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        profile = None
+        if profiler is not None:
+            profiler.disable()
+            profile = _dump_profile(profiler, view)
+
+        record = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'at': timezone.now().isoformat(),
+            'wall_ms': round(wall * 1000, 2),
+            'db_ms': round(recorder.duration * 1000, 2),
+            'queries': recorder.count,
+            'duplicate_queries': recorder.duplicates,
+            'top_duplicate_sql': recorder.top_duplicate(),
+            'peak_memory_kb': peak // 1024 if peak is not None else None,
+            'profile': profile,
+        }
+        with _lock:
+            _records.append(record)
+        return response
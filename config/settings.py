@@ -1,3 +1,4 @@
+import copy
 import os
 from pathlib import Path
 
@@ -43,12 +44,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'config.db.ReadYourWritesMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -75,12 +78,86 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database: DB_ENGINE=postgresql 이면 PostgreSQL, 기본은 로컬 SQLite
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite').strip().lower()
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+if DB_ENGINE == 'postgresql':
+    _db_options = {
+        'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}',
     }
-}
+    if _env_bool('DB_POOL'):
+        # psycopg 3 커넥션 풀 (psycopg[pool] 필요). 풀 사용 시 CONN_MAX_AGE 는 0 이어야 한다.
+        _db_options['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'jtwolab'),
+            'USER': os.getenv('DB_USER', 'jtwolab'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', '127.0.0.1'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if 'pool' in _db_options else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': _db_options,
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    # WAL/busy_timeout/synchronous 는 config.db.configure_sqlite 에서 연결마다 설정
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH') or BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # 쓰기 트랜잭션이 읽기 잠금에서 승격하다 SQLITE_BUSY 로 실패하지 않도록 시작 시 쓰기 잠금
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured('DB_ENGINE must be "sqlite" or "postgresql".')
+
+# Read replica: 설정하면 @read_from_replica 뷰(엑셀 다운로드/대시보드)의 GET 조회를 replica 로 보낸다
+if DB_ENGINE == 'postgresql' and os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default']['PORT'],
+    }
+elif DB_ENGINE == 'sqlite' and os.getenv('SQLITE_REPLICA_PATH'):
+    DATABASES['replica'] = {**copy.deepcopy(DATABASES['default']), 'NAME': os.getenv('SQLITE_REPLICA_PATH')}
+if 'replica' in DATABASES:
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+REPLICA_DATABASE_ALIAS = 'replica' if 'replica' in DATABASES else None
+REPLICA_READ_YOUR_WRITES_SECONDS = int(os.getenv('REPLICA_READ_YOUR_WRITES_SECONDS', '10'))
+DATABASE_ROUTERS = ['config.db.ReplicaRouter']
+
+# PostgreSQL 월별 파티셔닝 (orders_orderitem, dashboard_notification): 켜고 migrate 하면 테이블을 변환한다
+DB_PARTITIONING = DB_ENGINE == 'postgresql' and _env_bool('DB_PARTITIONING')
+DB_PARTITION_MONTHS_AHEAD = int(os.getenv('DB_PARTITION_MONTHS_AHEAD', '3'))
+
+# Cache: 워커가 여러 개면 버전 키 무효화를 공유하도록 Redis(redis 패키지 필요)를 지정한다.
+# 미지정 시 워커별 LocMem — 다른 워커의 무효화가 보이지 않으므로 config.cache.cache_timeout 이 TTL 을 짧게 제한
+CACHE_URL = os.getenv('CACHE_URL', '').strip()
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+LOCAL_CACHE_MAX_TIMEOUT = int(os.getenv('LOCAL_CACHE_MAX_TIMEOUT', '60'))
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -104,6 +181,22 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Analytics (월별 Parquet 주문 이력, pyarrow 필요)
+ANALYTICS_ROOT = Path(os.getenv('ANALYTICS_ROOT') or BASE_DIR / 'analytics')
+
+# Outbox (orders.outbox): 토픽별 핸들러 (dotted path) — manage.py dispatch_outbox 가 배치로 전달
+OUTBOX_HANDLERS = {
+    'order.status_changed': ['orders.outbox.notify_order_status'],
+}
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '10'))
+
+# Request profiling (opt-in, 관리자 JSON: /system/profiling/)
+PROFILING_ENABLED = _env_bool('PROFILING_ENABLED', default=False)
+PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', '5000'))
+PROFILING_TRACE_MEMORY = _env_bool('PROFILING_TRACE_MEMORY', default=True)
+PROFILING_CPROFILE_RATE = float(os.getenv('PROFILING_CPROFILE_RATE', '0'))
+PROFILING_CPROFILE_DIR = Path(os.getenv('PROFILING_CPROFILE_DIR') or BASE_DIR / 'profiles')
+
 # Auth
 AUTH_USER_MODEL = 'accounts.User'
 LOGIN_URL = '/accounts/login/'
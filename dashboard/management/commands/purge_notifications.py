@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.retention import (
+    NOTIFICATION_READ_TTL_DAYS, NOTIFICATION_UNREAD_TTL_DAYS, PURGE_BATCH_SIZE, expired_notifications,
+    purge_notifications,
+)
+
+
+class Command(BaseCommand):
+    help = '보관 기간이 지난 알림을 작은 배치로 나눠 삭제합니다 (읽은 알림/안 읽은 알림 기간 별도).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--read-days', type=int, default=NOTIFICATION_READ_TTL_DAYS, help='읽은 알림 보관 일수',
+        )
+        parser.add_argument(
+            '--unread-days', type=int, default=NOTIFICATION_UNREAD_TTL_DAYS, help='안 읽은 알림 보관 일수',
+        )
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE, help='트랜잭션 1회당 삭제 행 수')
+        parser.add_argument('--pause', type=float, default=0.0, help='배치 사이 대기(초)')
+        parser.add_argument('--dry-run', action='store_true', help='삭제하지 않고 대상 건수만 출력')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='0 보다 크면 종료하지 않고 지정한 초마다 반복 실행합니다.',
+        )
+
+    def handle(self, *args, **options):
+        if options['read_days'] < 1 or options['unread_days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('보관 일수와 --batch-size 는 1 이상이어야 합니다.')
+
+        ttl = {'read_ttl_days': options['read_days'], 'unread_ttl_days': options['unread_days']}
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'삭제 대상 알림 {expired_notifications(**ttl)[0].count()}건'))
+            return
+
+        while True:
+            deleted, partitions = purge_notifications(options['batch_size'], options['pause'], **ttl)
+            self.stdout.write(self.style.SUCCESS(f'알림 {deleted}건 삭제, 파티션 {partitions}개 삭제'))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
@@ -37,6 +37,10 @@ class Notification(models.Model):
         ordering = ['-created_at']
         verbose_name = '알림'
         verbose_name_plural = '알림'
+        indexes = [
+            # 사용자별 안읽은 알림 수/최근 목록 (context processor, 벨 아이콘)
+            models.Index(fields=['user', 'is_read', '-created_at'], name='dashboard_notif_user_read_idx'),
+        ]
 
     def __str__(self):
         return self.message
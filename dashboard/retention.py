@@ -0,0 +1,61 @@
+"""알림 보관 기간 정리.
+
+읽은 알림은 NOTIFICATION_READ_TTL_DAYS, 안 읽은 알림은 NOTIFICATION_UNREAD_TTL_DAYS 가 지나면 지운다.
+삭제는 id 순 작은 배치(배치마다 트랜잭션)로 나눠 긴 잠금을 잡지 않고,
+알림 테이블이 월 파티션이면(config.partitioning) 통째로 만료된 월은 파티션을 떼어내 지운다.
+"""
+import os
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from config.partitioning import detach_partitions, is_partitioned, partitioning_enabled
+
+from .models import Notification
+
+NOTIFICATION_READ_TTL_DAYS = int(os.getenv('NOTIFICATION_READ_TTL_DAYS', '30'))
+NOTIFICATION_UNREAD_TTL_DAYS = int(os.getenv('NOTIFICATION_UNREAD_TTL_DAYS', '90'))
+PURGE_BATCH_SIZE = 1000
+
+
+def expired_notifications(now=None, read_ttl_days=None, unread_ttl_days=None):
+    now = now or timezone.now()
+    read_cutoff = now - timedelta(days=NOTIFICATION_READ_TTL_DAYS if read_ttl_days is None else read_ttl_days)
+    unread_cutoff = now - timedelta(days=NOTIFICATION_UNREAD_TTL_DAYS if unread_ttl_days is None else unread_ttl_days)
+    return Notification.objects.filter(
+        Q(is_read=True, created_at__lt=read_cutoff) | Q(is_read=False, created_at__lt=unread_cutoff),
+    ), min(read_cutoff, unread_cutoff)
+
+
+def _drop_expired_partitions(cutoff):
+    """cutoff 이전에 끝나는 월 파티션을 삭제. 반환: 삭제한 파티션 수."""
+    table = Notification._meta.db_table
+    if not partitioning_enabled(connection) or not is_partitioned(connection, table):
+        return 0
+    with transaction.atomic():
+        dropped, _ = detach_partitions(
+            connection, table, timezone.localtime(cutoff).date().replace(day=1), drop=True,
+        )
+    return len(dropped)
+
+
+def purge_notifications(batch_size=PURGE_BATCH_SIZE, pause=0.0, read_ttl_days=None, unread_ttl_days=None):
+    """만료된 알림을 지운다. 반환: (삭제한 행 수, 삭제한 파티션 수).
+
+    pause 초만큼 배치 사이에 쉬어 복제 지연/IO 를 조절할 수 있다.
+    """
+    expired, cutoff = expired_notifications(read_ttl_days=read_ttl_days, unread_ttl_days=unread_ttl_days)
+    partitions = _drop_expired_partitions(cutoff)
+
+    deleted = 0
+    last = 0
+    while pks := list(expired.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size]):
+        with transaction.atomic():
+            deleted += Notification.objects.filter(pk__in=pks).delete()[0]
+        last = pks[-1]
+        if pause:
+            time.sleep(pause)
+    return deleted, partitions
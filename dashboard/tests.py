@@ -1,3 +1,274 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from orders.models import Order, get_deadline_version
+from config import profiling
+from config.cache import cache_timeout
+from products.models import Product
+
+from .models import Notification
+from .retention import purge_notifications
+from .views import DEADLINE_EVENTS_CACHE_TIMEOUT
+
+
+class DeadlineEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.manager = User.objects.create_user(
+            username='manager', password='pw', role=User.Role.MANAGER, parent=self.admin,
+        )
+        self.agency = User.objects.create_user(
+            username='agency', password='pw', role=User.Role.AGENCY, parent=self.manager,
+        )
+        self.seller = User.objects.create_user(
+            username='seller', password='pw', role=User.Role.SELLER, parent=self.agency, company_name='셀러상호',
+        )
+        self.outsider = User.objects.create_user(username='outsider', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='리워드', base_price=Decimal('1000'), cost_price=Decimal('800'), schema=[], max_work_days=3,
+        )
+        self.today = timezone.now().date()
+        self.order = self._order('A-1', self.seller, self.today + timedelta(days=2))
+        self._order('A-2', self.outsider, self.today + timedelta(days=2))
+        self._order('A-3', self.seller, self.today + timedelta(days=2), status=Order.Status.CANCELLED)
+
+    def _order(self, number, user, deadline, status=Order.Status.SUBMITTED):
+        return Order.objects.create(
+            order_number=number, user=user, product=self.product, status=status,
+            deadline=deadline, total_quantity=10, total_amount=Decimal('11000'), item_count=1,
+        )
+
+    def _get(self, mode='events', **headers):
+        params = {
+            'start': f'{self.today:%Y-%m-01}T00:00:00+09:00',
+            'end': f'{self.today + timedelta(days=40)}',
+            'mode': mode,
+        }
+        return self.client.get(reverse('dashboard:api_deadline_events'), params, **headers)
+
+    def test_events_are_scoped_and_projected(self):
+        for user in (self.admin, self.manager, self.agency, self.seller):
+            self.client.force_login(user)
+            events = self._get().json()
+            self.assertEqual([e['id'] for e in events], [self.order.id], user.username)
+        event = events[0]
+        self.assertEqual(event['extendedProps']['company'], '셀러상호')
+        self.assertEqual(event['extendedProps']['days_left'], 2)
+        self.assertEqual(event['color'], '#fff4e6')
+
+    def test_cached_response_and_etag(self):
+        self.client.force_login(self.agency)
+        first = self._get()
+        etag = first['ETag']
+        with self.assertNumQueries(2):  # 세션 + 사용자
+            not_modified = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.order.deadline = self.today + timedelta(days=20)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.save(update_fields=['deadline', 'updated_at'])
+        changed = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(changed.json()[0]['extendedProps']['days_left'], 20)
+
+        self.order.status = Order.Status.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.save(update_fields=['status', 'updated_at'])
+        self.assertEqual(self._get().json(), [])
+
+    def test_version_bumped_after_commit(self):
+        version = get_deadline_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.order.deadline = self.today + timedelta(days=5)
+            self.order.save(update_fields=['deadline', 'updated_at'])
+            # 커밋 전에는 이전 버전 — 동시 요청이 커밋 전 데이터를 새 키로 캐시하지 않도록
+            self.assertEqual(get_deadline_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_deadline_version(), version)
+
+    def test_product_rename_refreshes_titles(self):
+        self.client.force_login(self.seller)
+        etag = self._get()['ETag']
+        self.product.name = '트래픽'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        changed = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('트래픽', changed.json()[0]['title'])
+
+    def test_local_cache_timeout_is_capped(self):
+        with override_settings(LOCAL_CACHE_MAX_TIMEOUT=60):
+            self.assertEqual(cache_timeout(DEADLINE_EVENTS_CACHE_TIMEOUT), 60)
+            self.assertEqual(cache_timeout(None), 60)
+            self.assertEqual(cache_timeout(30), 30)
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(cache_timeout(DEADLINE_EVENTS_CACHE_TIMEOUT), DEADLINE_EVENTS_CACHE_TIMEOUT)
+            self.assertIsNone(cache_timeout(None))
+
+    def test_summary_mode_groups_by_day(self):
+        self._order('A-4', self.seller, self.today + timedelta(days=2))
+        self._order('A-5', self.agency, self.today + timedelta(days=10))
+        self.client.force_login(self.manager)
+        with CaptureQueriesContext(connection) as ctx:
+            days = self._get(mode='summary').json()
+        self.assertEqual(len([q for q in ctx.captured_queries if 'orders_order' in q['sql']]), 1)
+        self.assertEqual(
+            [(d['start'], d['extendedProps']['count'], d['extendedProps']['total_quantity'], d['extendedProps']['bucket'])
+             for d in days],
+            [
+                (str(self.today + timedelta(days=2)), 2, 20, 'urgent'),
+                (str(self.today + timedelta(days=10)), 1, 10, 'normal'),
+            ],
+        )
+        # 같은 범위라도 요약/개별 응답은 별도 캐시
+        self.assertEqual(len(self._get().json()), 3)
+
+
+class NotificationApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seller', password='pw', role=User.Role.SELLER)
+        self.other = User.objects.create_user(username='other', password='pw', role=User.Role.SELLER)
+        self.notes = [
+            Notification.objects.create(user=self.user, message=f'알림 {i}', link='/orders/') for i in range(12)
+        ]
+        self.foreign = Notification.objects.create(user=self.other, message='다른 사용자')
+        self.client.force_login(self.user)
+
+    def test_unread_returns_count_and_latest(self):
+        data = self.client.get(reverse('dashboard:notification_unread')).json()
+        self.assertEqual(data['count'], 12)
+        self.assertEqual(len(data['items']), 10)
+        self.assertLessEqual({item['id'] for item in data['items']}, {n.pk for n in self.notes})
+
+    def test_mark_read(self):
+        response = self.client.post(reverse('dashboard:notification_read', args=[self.notes[0].pk]))
+        self.assertEqual(response.json(), {'success': True})
+        self.notes[0].refresh_from_db()
+        self.assertTrue(self.notes[0].is_read)
+        # 다른 사용자 알림은 404, GET 은 405
+        response = self.client.post(reverse('dashboard:notification_read', args=[self.foreign.pk]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('dashboard:notification_read', args=[self.notes[1].pk]))
+        self.assertEqual(response.status_code, 405)
+
+    def test_mark_all_read(self):
+        self.client.post(reverse('dashboard:notification_read_all'))
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+        self.assertFalse(Notification.objects.get(pk=self.foreign.pk).is_read)
+        self.assertEqual(self.client.get(reverse('dashboard:notification_unread')).json()['count'], 0)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seller', password='pw', role=User.Role.SELLER)
+        self.kept = [
+            self._notification(days=1, is_read=True),
+            self._notification(days=40, is_read=False),
+        ]
+        self.expired = [
+            self._notification(days=40, is_read=True),
+            self._notification(days=100, is_read=False),
+            self._notification(days=200, is_read=True),
+        ]
+
+    def _notification(self, days, is_read):
+        notification = Notification.objects.create(user=self.user, message=f'{days}일 전', is_read=is_read)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days))
+        return notification
+
+    def test_purge_deletes_expired_in_batches(self):
+        with CaptureQueriesContext(connection) as ctx:
+            deleted, _ = purge_notifications(batch_size=2, read_ttl_days=30, unread_ttl_days=90)
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            set(Notification.objects.values_list('pk', flat=True)), {n.pk for n in self.kept},
+        )
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('DELETE')]), 2)
+
+    def test_command_dry_run_and_ttl_options(self):
+        out = StringIO()
+        call_command('purge_notifications', '--dry-run', '--read-days', '30', '--unread-days', '90', stdout=out)
+        self.assertIn('3건', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 5)
+
+        call_command('purge_notifications', '--read-days', '1000', '--unread-days', '30', stdout=out)
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 0)
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_TRACE_MEMORY=False, PROFILING_BUFFER_SIZE=100)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(username='seller', password='pw', role=User.Role.SELLER)
+        for i in range(3):
+            Notification.objects.create(user=self.seller, message=f'알림 {i}')
+
+    def test_records_are_grouped_by_url_name(self):
+        self.client.force_login(self.seller)
+        self.client.get(reverse('dashboard:notification_unread'))
+        self.client.get(reverse('dashboard:notification_unread'))
+        self.client.get('/no-such-page/')
+
+        rows = {row['view']: row for row in profiling.summarize()}
+        row = rows['dashboard:notification_unread']
+        self.assertEqual(row['requests'], 2)
+        self.assertGreater(row['queries_max'], 0)
+        self.assertIsNone(row['peak_memory_kb_max'])
+        self.assertEqual(rows[profiling.UNRESOLVED]['requests'], 1)
+
+    def test_async_chain_records_queries_of_its_own_request(self):
+        async def view(request):
+            await sync_to_async(lambda: list(Notification.objects.all()))()
+            return HttpResponse()
+
+        middleware = profiling.ProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        async_to_sync(middleware)(RequestFactory().get('/async/'))
+        list(Notification.objects.all())  # 요청 밖 쿼리는 기록되지 않는다
+        record = profiling.recent()[-1]
+        self.assertEqual((record['path'], record['queries']), ('/async/', 1))
+
+    def test_duplicate_queries_are_detected(self):
+        recorder = profiling.QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for note in Notification.objects.all():
+                User.objects.get(pk=note.user_id)
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates, 2)
+        self.assertEqual(recorder.top_duplicate()['count'], 3)
+
+    def test_endpoint_is_admin_only(self):
+        self.client.force_login(self.seller)
+        self.assertEqual(self.client.get(reverse('dashboard:profiling_stats')).status_code, 403)
+
+        self.client.force_login(self.admin)
+        data = self.client.get(reverse('dashboard:profiling_stats'), {'recent': 5}).json()
+        self.assertTrue(data['enabled'])
+        self.assertIn('dashboard:profiling_stats', [r['view'] for r in data['recent']])
+        self.client.post(reverse('dashboard:profiling_stats'))
+        # 비운 뒤에는 초기화 요청 자신만 남는다
+        self.assertEqual([r['method'] for r in profiling.recent()], ['POST'])
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_records_nothing(self):
+        profiling.clear()
+        self.client.force_login(self.seller)
+        self.client.get(reverse('dashboard:notification_unread'))
+        self.assertEqual(profiling.recent(), [])
@@ -1,13 +1,24 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import hashlib
+import json
+
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Sum, Count, Q
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views.decorators.http import require_POST
 from datetime import timedelta, date
-from orders.models import Order
-from accounts.models import User
+from orders.archive import archived_totals
+from orders.models import Order, get_deadline_version
+from accounts.models import User, get_hierarchy_version
+from config import profiling
+from config.cache import cache_timeout
+from config.db import read_from_replica
 from .models import Notice, Notification
 from .forms import NoticeForm
 
@@ -46,6 +57,7 @@ def _parse_period(request):
 
 
 @login_required
+@read_from_replica
 def index(request):
     user = request.user
     today = timezone.now().date()
@@ -60,15 +72,17 @@ def index(request):
         return redirect('orders:order_grid')
 
 
-def _common_stats(orders, period_paid):
-    """공통 상태별 현황 + 물량 통계 (입금확인 기준)"""
+def _common_stats(orders, period_paid, archived):
+    """공통 상태별 현황 + 물량/기간 통계 (입금확인 기준, archived: 보관된 주문 합계)"""
     return {
+        'period_orders': period_paid.count() + archived['period_orders'],
+        'period_amount': (period_paid.aggregate(s=Sum('total_amount'))['s'] or 0) + archived['period_amount'],
         'status_submitted': orders.filter(status='submitted').count(),
         'status_paid': orders.filter(status='paid').count(),
         'status_processing': orders.filter(status='processing').count(),
-        'status_completed': orders.filter(status='completed').count(),
-        'period_items': period_paid.aggregate(s=Sum('total_quantity'))['s'] or 0,
-        'total_items': orders.filter(confirmed_at__isnull=False).exclude(status='cancelled').aggregate(s=Sum('total_quantity'))['s'] or 0,
+        'status_completed': orders.filter(status='completed').count() + archived['completed'],
+        'period_items': (period_paid.aggregate(s=Sum('total_quantity'))['s'] or 0) + archived['period_items'],
+        'total_items': (orders.filter(confirmed_at__isnull=False).exclude(status='cancelled').aggregate(s=Sum('total_quantity'))['s'] or 0) + archived['total_items'],
         'notices': Notice.objects.filter(is_active=True)[:5],
     }
 
@@ -101,11 +115,9 @@ def admin_dashboard(request, today):
         'total_managers': descendant_users.filter(role='manager').count(),
         'total_agencies': descendant_users.filter(role='agency').count(),
         'total_sellers': descendant_users.filter(role='seller').count(),
-        'period_orders': period_paid.count(),
-        'period_amount': period_paid.aggregate(s=Sum('total_amount'))['s'] or 0,
         'pending_orders': orders.filter(status='submitted').count(),
         'recent_orders': orders.select_related('user', 'product')[:10],
-        **_common_stats(orders, period_paid),
+        **_common_stats(orders, period_paid, archived_totals(all_ids, start_date, end_date)),
         **_period_context(request, start_date, end_date, period, date_from, date_to),
     }
     return render(request, 'dashboard/admin.html', context)
@@ -124,10 +136,8 @@ def manager_dashboard(request, today):
 
     context = {
         'agency_count': agency_count,
-        'period_orders': period_paid.count(),
-        'period_amount': period_paid.aggregate(s=Sum('total_amount'))['s'] or 0,
         'recent_orders': orders.select_related('user', 'product')[:10],
-        **_common_stats(orders, period_paid),
+        **_common_stats(orders, period_paid, archived_totals(all_ids, start_date, end_date)),
         **_period_context(request, start_date, end_date, period, date_from, date_to),
     }
     return render(request, 'dashboard/manager.html', context)
@@ -146,10 +156,8 @@ def agency_dashboard(request, today):
     context = {
         'balance': user.balance,
         'seller_count': len(child_ids),
-        'period_orders': period_paid.count(),
-        'period_amount': period_paid.aggregate(s=Sum('total_amount'))['s'] or 0,
         'recent_orders': orders.select_related('user', 'product')[:10],
-        **_common_stats(orders, period_paid),
+        **_common_stats(orders, period_paid, archived_totals(all_ids, start_date, end_date)),
         **_period_context(request, start_date, end_date, period, date_from, date_to),
     }
     return render(request, 'dashboard/agency.html', context)
@@ -165,10 +173,8 @@ def seller_dashboard(request, today):
 
     context = {
         'balance': user.balance,
-        'period_orders': period_paid.count(),
-        'period_amount': period_paid.aggregate(s=Sum('total_amount'))['s'] or 0,
         'recent_orders': orders.select_related('product')[:10],
-        **_common_stats(orders, period_paid),
+        **_common_stats(orders, period_paid, archived_totals([user.id], start_date, end_date)),
         **_period_context(request, start_date, end_date, period, date_from, date_to),
     }
     return render(request, 'dashboard/seller.html', context)
@@ -180,98 +186,215 @@ def deadline_calendar(request):
     return render(request, 'dashboard/deadline_calendar.html')
 
 
-@login_required
-def api_deadline_events(request):
-    """캘린더에 표시할 마감일 이벤트 JSON API"""
-    user = request.user
-    start = request.GET.get('start', '')
-    end = request.GET.get('end', '')
+DEADLINE_EVENT_FIELDS = (
+    'id', 'order_number', 'status', 'deadline', 'item_count', 'total_quantity', 'total_amount',
+    'user__company_name', 'user__username', 'product__name',
+)
+DEADLINE_EVENTS_CACHE_TIMEOUT = 60 * 60 * 24
+
 
-    orders = Order.objects.select_related('user', 'product').filter(
+# 색상: 만료(빨강), 3일 이내(주황), 7일 이내(노랑), 여유(회색) — (배경, 글자)
+DEADLINE_COLORS = {
+    'expired': ('#ffeef0', '#d1344b'),
+    'urgent': ('#fff4e6', '#c05621'),
+    'soon': ('#fefce8', '#a16207'),
+    'normal': ('#f2f4f6', '#4e5968'),
+}
+
+
+def _deadline_bucket(days_left):
+    if days_left < 0:
+        return 'expired'
+    if days_left <= 3:
+        return 'urgent'
+    if days_left <= 7:
+        return 'soon'
+    return 'normal'
+
+
+def _deadline_events_key(request, user):
+    """캐시 키 = (조회 범위, start, end, 오늘) + 주문/계층 버전 — 마감일·상태·소속이 바뀌면 새 키."""
+    scope_id = user.parent_id if user.is_accountant and user.parent_id else user.pk
+    return 'dashboard:deadline_events:' + ':'.join(str(part) for part in (
+        scope_id,
+        request.GET.get('start', '')[:10],
+        request.GET.get('end', '')[:10],
+        request.GET.get('mode', 'events'),
+        timezone.now().date(),
+        get_deadline_version(),
+        get_hierarchy_version(),
+    ))
+
+
+def _deadline_orders(user, start, end):
+    orders = Order.objects.filter(
+        user.get_order_scope_q(),
         deadline__isnull=False,
     ).exclude(status='cancelled')
-
     if start:
         orders = orders.filter(deadline__gte=start)
     if end:
         orders = orders.filter(deadline__lte=end)
+    return orders
 
-    # 역할별 필터
-    if user.is_admin or user.is_accountant or user.is_manager:
-        orders = orders.filter(user_id__in=user.get_all_order_user_ids())
-    elif user.is_agency:
-        child_ids = list(User.objects.filter(parent=user).values_list('id', flat=True))
-        orders = orders.filter(user_id__in=child_ids + [user.id])
-    elif user.is_seller:
-        orders = orders.filter(user=user)
 
+async def _deadline_summary(user, start, end):
+    """일자별 요약 이벤트 — GROUP BY deadline 1회 (같은 날은 D-day 가 같으므로 구간도 일자 기준)."""
     today = timezone.now().date()
+    rows = _deadline_orders(user, start, end).order_by().values('deadline').annotate(
+        count=Count('id'),
+        total_quantity=Sum('total_quantity'),
+    ).order_by('deadline')
     events = []
-    for order in orders:
-        company = order.user.company_name or order.user.username
-        days_left = (order.deadline - today).days
-
-        # 색상: 만료(빨강), 3일 이내(주황), 7일 이내(노랑), 여유(회색)
-        if days_left < 0:
-            color = '#ffeef0'
-            text_color = '#d1344b'
-            suffix = '만료됨'
-        elif days_left <= 3:
-            color = '#fff4e6'
-            text_color = '#c05621'
-            suffix = f'D-{days_left}'
-        elif days_left <= 7:
-            color = '#fefce8'
-            text_color = '#a16207'
-            suffix = f'D-{days_left}'
-        else:
-            color = '#f2f4f6'
-            text_color = '#4e5968'
-            suffix = f'D-{days_left}'
+    async for row in rows:
+        deadline = row['deadline']
+        days_left = (deadline - today).days
+        bucket = _deadline_bucket(days_left)
+        color, text_color = DEADLINE_COLORS[bucket]
+        events.append({
+            'id': f'day-{deadline.isoformat()}',
+            'title': f'{row["count"]}건 / {row["total_quantity"] or 0:,}타',
+            'start': deadline.isoformat(),
+            'allDay': True,
+            'color': color,
+            'textColor': text_color,
+            'extendedProps': {
+                'summary': True,
+                'date': deadline.isoformat(),
+                'count': row['count'],
+                'total_quantity': row['total_quantity'] or 0,
+                'bucket': bucket,
+                'days_left': days_left,
+            },
+        })
+    return events
 
+
+async def _deadline_events(user, start, end):
+    today = timezone.now().date()
+    status_labels = dict(Order.Status.choices)
+    events = []
+    orders = _deadline_orders(user, start, end)
+    async for row in orders.order_by('deadline', 'id').values(*DEADLINE_EVENT_FIELDS):
+        company = row['user__company_name'] or row['user__username'] or '(삭제된 사용자)'
+        deadline = row['deadline']
+        days_left = (deadline - today).days
+        color, text_color = DEADLINE_COLORS[_deadline_bucket(days_left)]
         events.append({
-            'id': order.pk,
-            'title': f'{company} / {order.total_quantity}타 / {order.product.name} / {order.deadline.strftime("%m.%d")}',
-            'start': order.deadline.isoformat(),
+            'id': row['id'],
+            'title': f'{company} / {row["total_quantity"]}타 / {row["product__name"]} / {deadline.strftime("%m.%d")}',
+            'start': deadline.isoformat(),
             'color': color,
             'textColor': text_color,
-            'url': f'/orders/{order.pk}/',
+            'url': f'/orders/{row["id"]}/',
             'extendedProps': {
-                'order_number': order.order_number,
+                'order_number': row['order_number'],
                 'company': company,
-                'product': order.product.name,
-                'status': order.get_status_display(),
-                'item_count': order.item_count,
-                'total_quantity': order.total_quantity,
-                'total_amount': int(order.total_amount),
+                'product': row['product__name'],
+                'status': status_labels.get(row['status'], row['status']),
+                'item_count': row['item_count'],
+                'total_quantity': row['total_quantity'],
+                'total_amount': int(row['total_amount']),
                 'days_left': days_left,
-                'deadline': order.deadline.isoformat(),
+                'deadline': deadline.isoformat(),
             },
         })
+    return events
+
 
-    return JsonResponse(events, safe=False)
+@login_required
+async def api_deadline_events(request):
+    """캘린더에 표시할 마감일 이벤트 JSON API (async)
+
+    mode=summary 면 주문 대신 일자별 건수/타수 요약을 반환한다.
+    같은 범위/기간 응답은 캐시하고, ETag 가 같으면 304 로 응답한다.
+    """
+    user = await request.auser()
+    try:
+        start = date.fromisoformat(request.GET['start'][:10]) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end'][:10]) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({'error': 'invalid_range'}, status=400)
+
+    key = _deadline_events_key(request, user)
+    etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    content = await cache.aget(key)
+    if content is None:
+        build = _deadline_summary if request.GET.get('mode') == 'summary' else _deadline_events
+        content = json.dumps(await build(user, start, end), ensure_ascii=False)
+        await cache.aset(key, content, cache_timeout(DEADLINE_EVENTS_CACHE_TIMEOUT))
+
+    response = HttpResponse(content, content_type='application/json')
+    response.headers['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 # ── 알림 ──
 
+@login_required
+async def notification_unread(request):
+    """안읽은 알림 수/최근 목록 (벨 아이콘 주기 갱신용, async)"""
+    user = await request.auser()
+    unread = Notification.objects.filter(user=user, is_read=False)
+    items = [
+        {'id': n.pk, 'message': n.message, 'link': n.link, 'created_at': n.created_at.isoformat()}
+        async for n in unread[:10]
+    ]
+    return JsonResponse({'count': await unread.acount(), 'items': items})
+
+
 @login_required
 @require_POST
-def notification_read(request, pk):
+async def notification_read(request, pk):
     """개별 알림 읽음 처리"""
-    notif = get_object_or_404(Notification, pk=pk, user=request.user)
+    user = await request.auser()
+    notif = await aget_object_or_404(Notification, pk=pk, user=user)
     notif.is_read = True
-    notif.save(update_fields=['is_read'])
+    await notif.asave(update_fields=['is_read'])
     return JsonResponse({'success': True})
 
 
 @login_required
 @require_POST
-def notification_read_all(request):
+async def notification_read_all(request):
     """전체 알림 읽음 처리"""
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    user = await request.auser()
+    await Notification.objects.filter(user=user, is_read=False).aupdate(is_read=True)
     return JsonResponse({'success': True})
 
 
+# ── 요청 프로파일링 ──
+
+@login_required
+def profiling_stats(request):
+    """URL 이름별 요청 프로파일 집계 JSON (admin 전용)
+
+    ?recent=N 이면 최근 N건의 개별 기록도 함께 반환하고, POST 는 기록을 비운다.
+    """
+    if not request.user.is_admin:
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    if request.method == 'POST':
+        profiling.clear()
+        return JsonResponse({'success': True})
+    try:
+        recent = max(0, int(request.GET.get('recent', 0)))
+    except ValueError:
+        return JsonResponse({'error': 'invalid_recent'}, status=400)
+    data = {
+        'enabled': settings.PROFILING_ENABLED,
+        'buffer_size': settings.PROFILING_BUFFER_SIZE,
+        'views': profiling.summarize(),
+    }
+    if recent:
+        data['recent'] = profiling.recent(recent)
+    return JsonResponse(data)
+
+
 # ── 공지사항 ──
 
 @login_required
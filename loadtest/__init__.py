@@ -0,0 +1,4 @@
+"""로컬 서버 대상 부하 테스트 도구 (표준 라이브러리만 사용).
+
+실행 중인 서버에 HTTP 로 접속하므로 Django 설정을 불러오지 않는다.
+"""
@@ -0,0 +1,124 @@
+"""세션 쿠키/CSRF 토큰을 유지하는 HTTP 클라이언트와 지연시간 집계."""
+import http.cookiejar
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class Session:
+    """로그인한 사용자 1명의 세션 (스레드 1개에서만 사용)."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def _url(self, path):
+        return path if path.startswith('http') else self.base_url + path
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None, headers=None):
+        """(status, body bytes) 반환. HTTP 오류 응답도 예외 없이 돌려준다."""
+        headers = dict(headers or {})
+        if method != 'GET':
+            headers.setdefault('X-CSRFToken', self.csrf_token())
+            headers.setdefault('Referer', self.base_url + '/')
+        req = urllib.request.Request(self._url(path), data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, username, password):
+        status, body = self.request('GET', '/accounts/login/')
+        match = CSRF_INPUT_RE.search(body.decode('utf-8', 'replace'))
+        data = urllib.parse.urlencode({
+            'csrfmiddlewaretoken': match.group(1) if match else self.csrf_token(),
+            'username': username,
+            'password': password,
+        }).encode()
+        status, body = self.request('POST', '/accounts/login/', data=data, headers={
+            'Content-Type': 'application/x-www-form-urlencoded',
+        })
+        if not any(cookie.name == 'sessionid' for cookie in self.cookies):
+            raise RuntimeError(f'{username} 로그인 실패 (HTTP {status})')
+        return self
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Stats:
+    """엔드포인트별 응답 시간(ms)/오류 수 집계."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, elapsed_ms, ok):
+        self.latencies[name].append(elapsed_ms)
+        if not ok:
+            self.errors[name] += 1
+
+    def merge(self, other):
+        for name, values in other.latencies.items():
+            self.latencies[name].extend(values)
+        for name, count in other.errors.items():
+            self.errors[name] += count
+
+    def timed(self, name, func, *args, ok_statuses=(200, 304), **kwargs):
+        started = time.perf_counter()
+        try:
+            status, body = func(*args, **kwargs)
+        except OSError:
+            status, body = None, b''
+        self.record(name, (time.perf_counter() - started) * 1000, status in ok_statuses)
+        return status, body
+
+    def summary(self, duration):
+        rows = {}
+        all_values = []
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            all_values.extend(values)
+            rows[name] = self._row(values, self.errors[name], duration)
+        rows['TOTAL'] = self._row(sorted(all_values), sum(self.errors.values()), duration)
+        return rows
+
+    @staticmethod
+    def _row(values, errors, duration):
+        return {
+            'requests': len(values),
+            'errors': errors,
+            'error_rate': round(errors / len(values) * 100, 2) if values else 0.0,
+            'rps': round(len(values) / duration, 1) if duration else 0.0,
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+        }
+
+
+def format_table(rows):
+    lines = [f'{"endpoint":<28}{"req":>8}{"err":>6}{"err%":>7}{"rps":>9}{"p50":>9}{"p95":>9}{"p99":>9}']
+    for name, row in rows.items():
+        lines.append(
+            f'{name:<28}{row["requests"]:>8}{row["errors"]:>6}{row["error_rate"]:>7}{row["rps"]:>9}'
+            f'{row["p50_ms"]:>9}{row["p95_ms"]:>9}{row["p99_ms"]:>9}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,91 @@
+"""WSGI / ASGI 서버의 처리량(req/s)과 p99 비교.
+
+같은 DB 를 보는 두 서버를 띄운 뒤 동일한 혼합 트래픽을 차례로 보낸다.
+
+    gunicorn config.wsgi -w 4 -b 127.0.0.1:8001
+    uvicorn config.asgi:application --workers 4 --port 8002
+
+    python -m loadtest.compare --wsgi http://127.0.0.1:8001 --asgi http://127.0.0.1:8002 \\
+        --username seller1 --password pass --concurrency 50 --duration 30
+
+혼합 트래픽: 알림 폴링, 마감 캘린더 요약, 상품 스키마, 카테고리 상품 목록,
+주문 목록(동기 화면)을 가중치 비율로 섞는다.
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from .client import Session, Stats, format_table
+
+
+def build_mix(product_id, category_id):
+    month = date.today().replace(day=1)
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return [
+        # (이름, 경로, 가중치)
+        ('notification_unread', '/notifications/unread/', 5),
+        ('deadline_summary', f'/api/deadlines/?mode=summary&start={month}&end={next_month}', 2),
+        ('product_schema', f'/products/{product_id}/schema/', 3),
+        ('category_products', f'/products/categories/{category_id}/products/', 2),
+        ('order_list', '/orders/', 1),
+    ]
+
+
+def _worker(base_url, username, password, mix, deadline, seed):
+    stats = Stats()
+    session = Session(base_url).login(username, password)
+    rng = random.Random(seed)
+    weights = [weight for _, _, weight in mix]
+    while time.monotonic() < deadline:
+        name, path, _ = rng.choices(mix, weights=weights)[0]
+        stats.timed(name, session.request, 'GET', path)
+    return stats
+
+
+def run(base_url, username, password, mix, concurrency, duration):
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_worker, base_url, username, password, mix, deadline, seed)
+            for seed in range(concurrency)
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats.summary(time.monotonic() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='WSGI / ASGI 혼합 트래픽 비교')
+    parser.add_argument('--wsgi', required=True, help='WSGI 서버 주소')
+    parser.add_argument('--asgi', required=True, help='ASGI 서버 주소')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--product', type=int, default=1, help='스키마 조회 상품 ID')
+    parser.add_argument('--category', type=int, default=1, help='상품 목록 조회 카테고리 ID')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30, help='서버당 측정 시간(초)')
+    parser.add_argument('--json', dest='json_path', help='결과를 저장할 JSON 파일')
+    args = parser.parse_args(argv)
+
+    mix = build_mix(args.product, args.category)
+    results = {}
+    for label, url in (('wsgi', args.wsgi), ('asgi', args.asgi)):
+        results[label] = run(url, args.username, args.password, mix, args.concurrency, args.duration)
+        print(f'\n[{label}] {url}  concurrency={args.concurrency} duration={args.duration}s')
+        print(format_table(results[label]))
+
+    wsgi, asgi = results['wsgi']['TOTAL'], results['asgi']['TOTAL']
+    print(f'\nrps  wsgi {wsgi["rps"]} / asgi {asgi["rps"]}')
+    print(f'p99  wsgi {wsgi["p99_ms"]}ms / asgi {asgi["p99_ms"]}ms')
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
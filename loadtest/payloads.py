@@ -0,0 +1,139 @@
+"""부하 테스트 요청 본문 — 스키마 기반 주문 행, 최소 xlsx, multipart 인코딩."""
+import io
+import random
+import uuid
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+KEYWORDS = ['맛집', '카페', '네일', '헬스', '필라테스', '꽃집', '미용실', '치과', '학원', '캠핑']
+
+
+def input_fields(schema):
+    """엑셀 양식에 들어가는 입력 필드 (orders.views.api_excel_upload 와 같은 기준)."""
+    return [
+        field for field in schema
+        if field.get('type') not in ('readonly', 'calc', 'date_calc')
+        and not (field.get('sample') and field.get('type') != 'date')
+    ]
+
+
+def _value(field, rng):
+    kind = field.get('type', 'text')
+    if field.get('sample') and kind != 'date':
+        return field['sample']
+    if kind == 'url':
+        return f'https://example.com/{rng.getrandbits(40):x}'
+    if kind == 'number':
+        return str(rng.choice([1, 5, 10, 10, 30, 50, 100]))
+    if kind == 'date':
+        return (date.today() + timedelta(days=rng.randint(1, 7))).isoformat()
+    if kind == 'select':
+        return rng.choice(field.get('options') or [''])
+    return rng.choice(KEYWORDS)
+
+
+def order_rows(schema, count, rng=None):
+    """그리드에서 입력한 것과 같은 형태의 주문 행 (calc/date_calc 는 화면처럼 계산해서 채운다)."""
+    rng = rng or random.Random()
+    rows = []
+    for _ in range(count):
+        row = {f['name']: _value(f, rng) for f in schema if f.get('type') not in ('readonly', 'calc', 'date_calc')}
+        for f in schema:
+            formula = f.get('formula') or {}
+            if f.get('type') == 'calc':
+                a = int(row.get(formula.get('fieldA'), 0) or 0)
+                b = int(row.get(formula.get('fieldB'), 0) or 0)
+                row[f['name']] = str({'+': a + b, '-': a - b, '/': a // b if b else 0}.get(formula.get('operator'), a * b))
+            elif f.get('type') == 'date_calc':
+                start = date.fromisoformat(row[formula['dateField']])
+                days = int(row.get(formula.get('daysField')) or 1)
+                row[f['name']] = (start + timedelta(days=days - 1)).isoformat()
+        rows.append(row)
+    return rows
+
+
+def _column(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def xlsx_bytes(headers, rows):
+    """시트 1개짜리 최소 xlsx (openpyxl 없이 주문 업로드 양식을 만든다)."""
+    lines = []
+    for r, values in enumerate([headers] + rows, 1):
+        cells = ''.join(_cell(f'{_column(c)}{r}', value) for c, value in enumerate(values))
+        lines.append(f'<row r="{r}">{cells}</row>')
+    main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    rel = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    package = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    parts = {
+        '[Content_Types].xml': (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            f'<Relationships xmlns="{package}">'
+            f'<Relationship Id="rId1" Type="{rel}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'<workbook xmlns="{main}" xmlns:r="{rel}">'
+            '<sheets><sheet name="주문 데이터" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'<Relationships xmlns="{package}">'
+            f'<Relationship Id="rId1" Type="{rel}/worksheet" Target="worksheets/sheet1.xml"/></Relationships>'
+        ),
+        'xl/worksheets/sheet1.xml': (
+            f'<worksheet xmlns="{main}">'
+            f'<dimension ref="A1:{_column(max(len(headers), 1) - 1)}{len(rows) + 1}"/>'
+            f'<sheetData>{"".join(lines)}</sheetData></worksheet>'
+        ),
+    }
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in parts.items():
+            archive.writestr(name, '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + xml)
+    return buf.getvalue()
+
+
+def upload_workbook(schema, count, rng=None):
+    """엑셀 업로드용 파일 — 헤더는 양식과 같은 라벨, 값은 입력 필드만."""
+    fields = input_fields(schema)
+    rows = order_rows(schema, count, rng)
+    headers = [f.get('label', f['name']) for f in fields]
+    return xlsx_bytes(headers, [[row.get(f['name'], '') for f in fields] for row in rows])
+
+
+def multipart(fields, files):
+    """(body, content_type). files 는 {필드명: (파일명, content_type, bytes)}."""
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for name, value in fields.items():
+        chunks.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content_type, content) in files.items():
+        chunks.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    chunks.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(chunks), f'multipart/form-data; boundary={boundary}'
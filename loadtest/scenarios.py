@@ -0,0 +1,295 @@
+"""주문 접수/관리자 업무 혼합 부하 시나리오.
+
+generate_synthetic_data 로 만든 계정으로 로그인한 가상 사용자들이 실제 사용 흐름을 반복한다.
+
+- 셀러: 주문 화면(그리드) 로드 → 카테고리 상품 → 스키마 조회 → (엑셀 업로드) → 접수,
+  주문 목록/상세/항목 조회
+- 관리자: 주문 목록/검색, 상세, 상태 변경, 엑셀 내보내기
+
+각 가상 사용자는 가중치에 따라 작업 하나를 고르고 think time 만큼 쉰 뒤 다음 작업을 한다.
+--sellers 에 여러 값을 주면 단계별로 실행해 동시 셀러 수에 따른 접수 지연/오류율을 비교할 수 있다.
+
+    python manage.py generate_synthetic_data --orders 20000
+    python manage.py runserver --noreload   # 또는 gunicorn / uvicorn
+
+    python -m loadtest.scenarios --base-url http://127.0.0.1:8000 \\
+        --sellers 10,25,50 --admins 3 --duration 60 --json result.json
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import Session, Stats, format_table
+from .payloads import XLSX_CONTENT_TYPE, multipart, order_rows, upload_workbook
+
+CATEGORY_RE = re.compile(r'selectCategory\((\d+)')
+ORDER_LINK_RE = re.compile(r'/orders/(\d+)/')
+# 리다이렉트를 따라간 뒤의 응답까지 정상으로 본다 (상태 변경은 302 → 상세 화면 200)
+OK = (200, 304)
+
+
+def task(weight):
+    """시나리오 메서드를 가중치 weight 의 작업으로 등록한다."""
+    def decorator(func):
+        func.task_weight = weight
+        return func
+    return decorator
+
+
+class Scenario:
+    """가상 사용자 1명. task 로 등록된 메서드를 가중치대로 골라 실행한다."""
+
+    def __init__(self, session, stats, rng, options):
+        self.session = session
+        self.stats = stats
+        self.rng = rng
+        self.options = options
+        self.tasks = [
+            getattr(self, name) for name in dir(type(self))
+            if getattr(getattr(type(self), name), 'task_weight', None)
+        ]
+        self.weights = [t.task_weight for t in self.tasks]
+
+    def on_start(self):
+        pass
+
+    def get(self, name, path):
+        return self.stats.timed(name, self.session.request, 'GET', path, ok_statuses=OK)
+
+    def post(self, name, path, data, content_type, headers=None):
+        return self.stats.timed(
+            name, self.session.request, 'POST', path, data=data,
+            headers={'Content-Type': content_type, **(headers or {})}, ok_statuses=OK,
+        )
+
+    def run(self, deadline):
+        self.on_start()
+        while time.monotonic() < deadline:
+            self.rng.choices(self.tasks, weights=self.weights)[0]()
+            time.sleep(self.rng.uniform(self.options.wait_min, self.options.wait_max))
+
+
+class SellerScenario(Scenario):
+    def on_start(self):
+        self.products = []
+        self.schemas = {}
+        self.order_ids = []
+        # 접수할 상품 목록은 시작할 때 모든 카테고리를 한 번씩 열어 모아 둔다
+        status, body = self.get('order_grid', '/orders/grid/')
+        self.categories = sorted(set(CATEGORY_RE.findall(body.decode('utf-8', 'replace')))) if status == 200 else []
+        for category_id in self.categories:
+            self.category_products(category_id)
+
+    def category_products(self, category_id):
+        status, body = self.get('category_products', f'/products/categories/{category_id}/products/')
+        if status == 200:
+            self.products.extend(p['id'] for p in json.loads(body)['products'] if p['id'] not in self.products)
+
+    def _product(self):
+        if not self.products:
+            return None
+        product_id = self.rng.choice(self.products)
+        if product_id not in self.schemas:
+            status, body = self.get('product_schema', f'/products/{product_id}/schema/')
+            if status != 200:
+                return None
+            self.schemas[product_id] = json.loads(body)['schema'] or []
+        return product_id
+
+    @task(2)
+    def load_grid(self):
+        status, _ = self.get('order_grid', '/orders/grid/')
+        if status == 200 and self.categories:
+            self.category_products(self.rng.choice(self.categories))
+
+    @task(3)
+    def fetch_schema(self):
+        product_id = self.rng.choice(self.products) if self.products else None
+        if product_id:
+            self.get('product_schema', f'/products/{product_id}/schema/')
+
+    @task(3)
+    def submit(self):
+        product_id = self._product()
+        if product_id is None:
+            return
+        schema = self.schemas[product_id]
+        rows = order_rows(schema, self.options.rows, self.rng)
+        if self.rng.random() < self.options.excel_ratio:
+            body, content_type = multipart(
+                {'product_id': product_id},
+                {'file': ('orders.xlsx', XLSX_CONTENT_TYPE, upload_workbook(schema, self.options.rows, self.rng))},
+            )
+            status, response = self.post('excel_upload', '/orders/api/excel-upload/', body, content_type)
+            if status != 200:
+                return
+            rows = json.loads(response)['rows']
+        payload = json.dumps({'product_id': product_id, 'rows': rows, 'memo': 'loadtest'}).encode()
+        self.post(
+            'order_submit', '/orders/api/submit/', payload, 'application/json',
+            headers={'Idempotency-Key': uuid.uuid4().hex},
+        )
+
+    @task(2)
+    def order_list(self):
+        status, body = self.get('order_list', '/orders/')
+        if status == 200:
+            self.order_ids = ORDER_LINK_RE.findall(body.decode('utf-8', 'replace')) or self.order_ids
+
+    @task(2)
+    def order_detail(self):
+        if not self.order_ids:
+            return
+        order_id = self.rng.choice(self.order_ids)
+        self.get('order_detail', f'/orders/{order_id}/')
+        self.get('order_items', f'/orders/{order_id}/items/')
+
+
+class AdminScenario(Scenario):
+    STATUSES = ['processing', 'completed']
+
+    def on_start(self):
+        self.order_ids = []
+        self.order_list()
+
+    @task(4)
+    def order_list(self):
+        status, body = self.get('admin_order_list', '/orders/')
+        if status == 200:
+            self.order_ids = ORDER_LINK_RE.findall(body.decode('utf-8', 'replace')) or self.order_ids
+
+    @task(1)
+    def order_search(self):
+        self.get('admin_order_search', f'/orders/?q={self.rng.randint(0, 9999):04d}')
+
+    @task(2)
+    def order_detail(self):
+        if self.order_ids:
+            order_id = self.rng.choice(self.order_ids)
+            self.get('admin_order_detail', f'/orders/{order_id}/')
+            self.get('admin_order_items', f'/orders/{order_id}/items/')
+
+    @task(2)
+    def status_update(self):
+        if self.order_ids:
+            data = urllib.parse.urlencode({'status': self.rng.choice(self.STATUSES)}).encode()
+            self.post(
+                'status_update', f'/orders/{self.rng.choice(self.order_ids)}/status/', data,
+                'application/x-www-form-urlencoded',
+            )
+
+    @task(1)
+    def export(self):
+        self.get('order_export', '/orders/export/')
+
+
+def discover_sellers(base_url, admin_username, password, prefix, limit):
+    """관리자 업체 트리 검색으로 prefix 셀러 계정을 최대 limit 개 찾는다."""
+    session = Session(base_url).login(admin_username, password)
+    usernames, cursor = [], None
+    while len(usernames) < limit:
+        query = {'q': f'{prefix}seller', 'limit': 200}
+        if cursor:
+            query['cursor'] = cursor
+        status, body = session.request('GET', '/accounts/users/api/tree/?' + urllib.parse.urlencode(query))
+        if status != 200:
+            raise RuntimeError(f'셀러 계정 조회 실패 (HTTP {status})')
+        data = json.loads(body)
+        usernames += [
+            node['username'] for node in data['nodes']
+            if node['role'] == 'seller' and node['is_active'] and node['username'].startswith(prefix)
+        ]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    return usernames[:limit]
+
+
+def _user(scenario_class, base_url, username, options, stats, deadline, delay, seed, lock):
+    time.sleep(delay)
+    local = Stats()
+    try:
+        session = Session(base_url).login(username, options.password)
+    except (RuntimeError, OSError):
+        local.record('login', 0.0, False)
+    else:
+        scenario_class(session, local, random.Random(seed), options).run(deadline)
+    with lock:
+        stats.merge(local)
+
+
+def run(base_url, sellers, admins, seller_usernames, options):
+    """sellers 명의 셀러와 admins 명의 관리자를 duration 초 동안 돌리고 엔드포인트별 요약을 반환한다."""
+    stats = Stats()
+    lock = threading.Lock()
+    users = [(SellerScenario, seller_usernames[i % len(seller_usernames)]) for i in range(sellers)]
+    users += [(AdminScenario, options.admin)] * admins
+    started = time.monotonic()
+    deadline = started + options.ramp + options.duration
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        futures = [
+            pool.submit(
+                _user, scenario_class, base_url, username, options, stats, deadline,
+                options.ramp * i / len(users), options.seed + i, lock,
+            )
+            for i, (scenario_class, username) in enumerate(users)
+        ]
+        for future in futures:
+            future.result()
+    return stats.summary(time.monotonic() - started)
+
+
+def _sizes(value):
+    return [int(size) for size in value.split(',') if size.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='주문 접수/관리자 업무 혼합 부하 테스트')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--prefix', default='syn-', help='generate_synthetic_data 접두어')
+    parser.add_argument('--password', default='bench1234')
+    parser.add_argument('--admin', help='관리자 계정 (기본: <prefix>admin)')
+    parser.add_argument('--sellers', type=_sizes, default=[10], help='동시 셀러 수 (쉼표로 여러 단계)')
+    parser.add_argument('--admins', type=int, default=2, help='동시 관리자 수')
+    parser.add_argument('--duration', type=float, default=60, help='단계별 측정 시간(초)')
+    parser.add_argument('--ramp', type=float, default=5, help='가상 사용자 시작을 나눠 두는 시간(초)')
+    parser.add_argument('--wait-min', type=float, default=0.5, help='작업 사이 최소 대기(초)')
+    parser.add_argument('--wait-max', type=float, default=2.0, help='작업 사이 최대 대기(초)')
+    parser.add_argument('--rows', type=int, default=20, help='접수 1건당 행 수')
+    parser.add_argument('--excel-ratio', type=float, default=0.3, help='엑셀 업로드를 거쳐 접수하는 비율')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='결과를 저장할 JSON 파일')
+    options = parser.parse_args(argv)
+    options.admin = options.admin or f'{options.prefix}admin'
+
+    seller_usernames = discover_sellers(
+        options.base_url, options.admin, options.password, options.prefix, max(options.sellers),
+    )
+    if not seller_usernames:
+        parser.error(f'{options.prefix} 셀러 계정이 없습니다. generate_synthetic_data 를 먼저 실행하세요.')
+
+    results = {}
+    for sellers in options.sellers:
+        summary = run(options.base_url, sellers, options.admins, seller_usernames, options)
+        results[str(sellers)] = summary
+        print(f'\n[sellers={sellers} admins={options.admins}] {options.base_url}  duration={options.duration}s')
+        print(format_table(summary))
+
+    print(f'\n{"sellers":>8}{"rps":>9}{"submit/s":>10}{"submit p95":>12}{"err%":>8}')
+    for sellers, summary in results.items():
+        submit = summary.get('order_submit') or {'rps': 0.0, 'p95_ms': 0.0}
+        total = summary['TOTAL']
+        print(f'{sellers:>8}{total["rps"]:>9}{submit["rps"]:>10}{submit["p95_ms"]:>12}{total["error_rate"]:>8}')
+    if options.json_path:
+        with open(options.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
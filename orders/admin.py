@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Order, OrderItem, BalanceTransaction
+from .models import (
+    ArchivedOrder, Order, OrderArchiveRollup, OrderItem, OrderSchema, OrderSubmission, BalanceTransaction,
+    DeadlineSweep, OutboxEvent, SettlementPeriod,
+)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -7,6 +10,10 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['row_number', 'data', 'unit_price', 'status']
 
+    def get_queryset(self, request):
+        # data 가 order.item_fields 를 읽으므로 항목마다 주문을 다시 조회하지 않도록
+        return super().get_queryset(request).select_related('order')
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -20,3 +27,55 @@ class OrderAdmin(admin.ModelAdmin):
 class BalanceTransactionAdmin(admin.ModelAdmin):
     list_display = ['user', 'tx_type', 'amount', 'balance_after', 'description', 'created_at']
     list_filter = ['tx_type']
+
+
+@admin.register(SettlementPeriod)
+class SettlementPeriodAdmin(admin.ModelAdmin):
+    list_display = ['month', 'closed_by', 'closed_at']
+    readonly_fields = ['month', 'closed_by', 'closed_at']
+
+
+@admin.register(DeadlineSweep)
+class DeadlineSweepAdmin(admin.ModelAdmin):
+    list_display = ['swept_through', 'notified', 'created_at']
+    readonly_fields = ['swept_through', 'notified', 'created_at']
+
+
+@admin.register(OrderSubmission)
+class OrderSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['key', 'user', 'order', 'created_at']
+    search_fields = ['key', 'order__order_number']
+    readonly_fields = ['user', 'key', 'payload_hash', 'order', 'response', 'created_at']
+
+
+@admin.register(OrderSchema)
+class OrderSchemaAdmin(admin.ModelAdmin):
+    list_display = ['content_hash', 'created_at']
+    readonly_fields = ['content_hash', 'columns', 'created_at']
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ['order_number', 'user', 'product', 'item_count', 'total_amount', 'status', 'created_at', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['order_number']
+    exclude = ['payload']
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OrderArchiveRollup)
+class OrderArchiveRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'confirmed_date', 'order_count', 'total_quantity', 'total_amount']
+    list_filter = ['status']
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'topic', 'attempts', 'available_at', 'created_at']
+    list_filter = ['topic']
+    readonly_fields = ['topic', 'payload', 'last_error', 'created_at']
@@ -0,0 +1,267 @@
+"""주문 이력 분석용 컬럼 저장소.
+
+주문/주문 항목을 월별 파티션 Parquet 파일(ANALYTICS_ROOT/<table>/month=YYYY-MM/)로
+내보내고, 집계 리포트는 운영 DB 대신 이 파일을 pyarrow 로 읽어 계산한다.
+보관된 주문(ArchivedOrder)도 주문일 기준 같은 파티션에 함께 내보낸다.
+pyarrow 는 선택 의존성이므로 없으면 ImproperlyConfigured 를 발생시킨다.
+"""
+import json
+import os
+from datetime import date, datetime, timedelta
+from itertools import chain, islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Min
+from django.utils import timezone
+
+from accounts.models import User
+
+from .models import ArchivedOrder, Order, OrderItem, unpack_item
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+EXPORT_BATCH_SIZE = 5000
+
+REPORT_DIMENSIONS = {
+    'month': ('월별', ['month']),
+    'product': ('상품별', ['product_id', 'product_name']),
+    'agency': ('대행사별', ['agency_id', 'agency_name']),
+}
+
+ORDER_FIELDS = [
+    ('id', 'int64'),
+    ('order_number', 'string'),
+    ('status', 'string'),
+    ('user_id', 'int64'),
+    ('user_name', 'string'),
+    ('agency_id', 'int64'),
+    ('agency_name', 'string'),
+    ('product_id', 'int64'),
+    ('product_name', 'string'),
+    ('item_count', 'int64'),
+    ('total_quantity', 'int64'),
+    ('total_amount', 'int64'),
+    ('created_at', 'timestamp'),
+    ('confirmed_at', 'timestamp'),
+]
+
+ITEM_FIELDS = [
+    ('order_id', 'int64'),
+    ('row_number', 'int64'),
+    ('status', 'string'),
+    ('unit_price', 'int64'),
+    ('data', 'string'),
+]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImproperlyConfigured('분석 저장소를 사용하려면 pyarrow 를 설치하세요.')
+
+
+def _schema(fields):
+    types = {'int64': pa.int64(), 'string': pa.string(), 'timestamp': pa.timestamp('us', tz='UTC')}
+    return pa.schema([(name, types[kind]) for name, kind in fields])
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+
+
+def get_analytics_root():
+    return settings.ANALYTICS_ROOT
+
+
+def _month_range(month):
+    end = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return timezone.make_aware(datetime(month.year, month.month, 1)), timezone.make_aware(datetime(end.year, end.month, 1))
+
+
+def _write_partition(table_name, month, fields, rows):
+    """rows(dict iterable)를 배치 단위로 임시 파일에 쓴 뒤 파티션 파일을 교체한다."""
+    directory = get_analytics_root() / table_name / f'month={month:%Y-%m}'
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / 'part-0.parquet'
+    tmp = directory / 'part-0.parquet.tmp'
+    schema = _schema(fields)
+    count = 0
+    with pq.ParquetWriter(tmp, schema, compression='zstd') as writer:
+        while batch := list(islice(rows, EXPORT_BATCH_SIZE)):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    os.replace(tmp, target)
+    return count
+
+
+ORDER_ROW_COLUMNS = (
+    'id', 'order_number', 'status', 'user_id', 'user__username', 'user__company_name', 'user__role',
+    'user__parent_id', 'user__parent__username', 'user__parent__company_name',
+    'product_id', 'product__name', 'item_count', 'total_quantity', 'total_amount',
+    'created_at', 'confirmed_at',
+)
+
+
+def _order_rows(start, end):
+    """해당 기간 주문 — 운영 테이블 다음에 보관된 주문 (같은 열)."""
+    orders = chain.from_iterable(
+        model.objects.filter(created_at__gte=start, created_at__lt=end).values_list(*ORDER_ROW_COLUMNS)
+        .order_by('id').iterator(chunk_size=EXPORT_BATCH_SIZE)
+        for model in (Order, ArchivedOrder)
+    )
+    for (pk, number, status, user_id, username, company, role, parent_id, parent_username,
+         parent_company, product_id, product_name, item_count, quantity, amount,
+         created_at, confirmed_at) in orders:
+        # 대행사 기준 집계: 셀러 주문은 소속 대행사, 대행사 주문은 본인
+        if role == User.Role.AGENCY:
+            agency_id, agency_name = user_id, company or username
+        elif role == User.Role.SELLER and parent_id:
+            agency_id, agency_name = parent_id, parent_company or parent_username
+        else:
+            agency_id, agency_name = None, None
+        yield {
+            'id': pk,
+            'order_number': number,
+            'status': status,
+            'user_id': user_id,
+            'user_name': (company or username) if user_id else None,
+            'agency_id': agency_id,
+            'agency_name': agency_name,
+            'product_id': product_id,
+            'product_name': product_name,
+            'item_count': item_count,
+            'total_quantity': quantity,
+            'total_amount': int(amount),
+            'created_at': created_at,
+            'confirmed_at': confirmed_at,
+        }
+
+
+def _item_rows(start, end):
+    # 항목은 주문과 같은 트랜잭션에서 만들어지므로 created_at >= 주문일 — 월 파티션이면 이전 월은 읽지 않는다
+    items = OrderItem.objects.filter(
+        order__created_at__gte=start, order__created_at__lt=end, created_at__gte=start,
+    ).values_list(
+        'order_id', 'row_number', 'status', 'unit_price', 'order__item_fields', 'cells',
+    ).order_by('order_id', 'row_number')
+    for order_id, row_number, status, unit_price, fields, cells in items.iterator(chunk_size=EXPORT_BATCH_SIZE):
+        yield {
+            'order_id': order_id,
+            'row_number': row_number,
+            'status': status,
+            'unit_price': int(unit_price),
+            'data': json.dumps(unpack_item(fields, cells), ensure_ascii=False),
+        }
+
+    archived = ArchivedOrder.objects.filter(created_at__gte=start, created_at__lt=end).only('id', 'payload')
+    for order in archived.order_by('id').iterator(chunk_size=100):
+        fields = order.data['item_fields']
+        for row_number, cells, unit_price, status in order.item_values('row_number', 'cells', 'unit_price', 'status'):
+            yield {
+                'order_id': order.id,
+                'row_number': row_number,
+                'status': status,
+                'unit_price': unit_price,
+                'data': json.dumps(unpack_item(fields, cells), ensure_ascii=False),
+            }
+
+
+def export_month(month):
+    """해당 월(주문일 기준) 주문/항목 파티션을 다시 쓴다. 반환: (주문 수, 항목 수)."""
+    _require_pyarrow()
+    month = month.replace(day=1)
+    start, end = _month_range(month)
+    order_count = _write_partition('orders', month, ORDER_FIELDS, _order_rows(start, end))
+    item_count = _write_partition('order_items', month, ITEM_FIELDS, _item_rows(start, end))
+
+    manifest_path = get_analytics_root() / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    manifest[f'{month:%Y-%m}'] = {
+        'exported_at': timezone.now().isoformat(),
+        'orders': order_count,
+        'items': item_count,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return order_count, item_count
+
+
+def months_to_export(all_months=False):
+    """기본은 변경 가능성이 있는 이번 달/지난달, all_months 면 첫 주문 월부터 전부."""
+    this_month = timezone.localdate().replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    if not all_months:
+        return [last_month, this_month]
+    firsts = [model.objects.aggregate(m=Min('created_at'))['m'] for model in (Order, ArchivedOrder)]
+    first = min((value for value in firsts if value is not None), default=None)
+    if first is None:
+        return []
+    month = timezone.localtime(first).date().replace(day=1)
+    months = []
+    while month <= this_month:
+        months.append(month)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return months
+
+
+def load_manifest():
+    path = get_analytics_root() / 'manifest.json'
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def query_order_totals(group_by='month', month_from=None, month_to=None, user_ids=None,
+                       include_cancelled=False):
+    """Parquet 에서 차원별 주문 합계를 계산한다 (운영 DB 미사용).
+
+    month_from/month_to 는 'YYYY-MM' 문자열, user_ids 는 조회 범위 제한용.
+    """
+    _require_pyarrow()
+    keys = REPORT_DIMENSIONS[group_by][1]
+    path = get_analytics_root() / 'orders'
+    if not path.exists():
+        return []
+
+    dataset = ds.dataset(path, format='parquet', partitioning=_partitioning())
+    expr = None
+    conditions = []
+    if month_from:
+        conditions.append(pc.field('month') >= month_from)
+    if month_to:
+        conditions.append(pc.field('month') <= month_to)
+    if user_ids is not None:
+        conditions.append(pc.field('user_id').isin(pa.array(list(user_ids), pa.int64())))
+    if not include_cancelled:
+        conditions.append(pc.field('status') != Order.Status.CANCELLED.value)
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+
+    table = dataset.to_table(
+        columns=sorted(set(keys) | {'id', 'item_count', 'total_quantity', 'total_amount'}),
+        filter=expr,
+    )
+    result = table.group_by(keys).aggregate([
+        ('id', 'count'),
+        ('item_count', 'sum'),
+        ('total_quantity', 'sum'),
+        ('total_amount', 'sum'),
+    ])
+    rows = [
+        {
+            **{key: row[key] for key in keys},
+            'order_count': row['id_count'],
+            'item_count': row['item_count_sum'] or 0,
+            'total_quantity': row['total_quantity_sum'] or 0,
+            'total_amount': row['total_amount_sum'] or 0,
+        }
+        for row in result.to_pylist()
+    ]
+    if group_by == 'month':
+        rows.sort(key=lambda r: r['month'], reverse=True)
+    else:
+        rows.sort(key=lambda r: r['total_amount'], reverse=True)
+    return rows
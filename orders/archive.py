@@ -0,0 +1,143 @@
+"""오래된 완료/취소 주문 보관.
+
+N개월 전(월 단위)보다 먼저 접수된 완료/취소 주문을 항목과 함께 ArchivedOrder 한 행
+(항목은 zlib 압축 JSON)으로 옮기고, 주문/항목 테이블에서는 지운다.
+
+- 입금확인 월이 정산 마감된 주문만 옮긴다 — 정산은 SettlementSnapshot 으로 계속 계산된다.
+- 잔액 거래/정산 스냅샷의 order 는 지우기 전에 archived_order(같은 id)로 옮겨 연결을 유지한다.
+- 대시보드 합계가 바뀌지 않도록 (주문자, 상태, 입금확인일) 별 건수/수량/금액을 OrderArchiveRollup 에 더한다.
+- 주문 상세/항목/엑셀은 주문이 없으면 보관본에서 읽는다 (ArchivedOrder.to_order).
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    ArchivedOrder, BalanceTransaction, Order, OrderArchiveRollup, OrderItem, SettlementSnapshot, bump_deadline_version,
+)
+from .settlement import get_closed_month
+
+ARCHIVE_STATUSES = [Order.Status.COMPLETED, Order.Status.CANCELLED]
+ARCHIVE_BATCH_SIZE = 500
+
+
+def _shift_month(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archivable_orders(months, today=None):
+    """보관 대상: 완료/취소 + 접수일이 months 개월 전 1일 이전 + 미입금이거나 정산 마감된 월에 입금확인."""
+    today = today or timezone.localdate()
+    cutoff = _shift_month(today.replace(day=1), -months)
+    settled = Q(confirmed_at__isnull=True)
+    closed_month = get_closed_month()
+    if closed_month:
+        open_from = _shift_month(closed_month, 1)
+        settled |= Q(confirmed_at__lt=timezone.make_aware(datetime(open_from.year, open_from.month, 1)))
+    return Order.objects.filter(
+        settled,
+        status__in=ARCHIVE_STATUSES,
+        created_at__lt=timezone.make_aware(datetime(cutoff.year, cutoff.month, 1)),
+    )
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+@transaction.atomic
+def _archive_batch(orders, pks):
+    """pks 중 아직 대상인 주문을 보관본/합계로 옮기고 지운다. 반환: (주문 수, 항목 수)."""
+    batch = list(orders.filter(pk__in=pks).select_for_update())
+    if not batch:
+        return 0, 0
+
+    items = defaultdict(list)
+    rows = OrderItem.objects.filter(order__in=batch).order_by('order_id', 'row_number').values_list(
+        'order_id', 'row_number', 'cells', 'unit_price', 'status', 'result_message',
+    )
+    for order_id, row_number, cells, unit_price, status, result_message in rows.iterator(chunk_size=5000):
+        items[order_id].append([row_number, cells, int(unit_price), status, result_message])
+
+    archived = []
+    totals = defaultdict(lambda: [0, 0, Decimal('0')])
+    for order in batch:
+        archived.append(ArchivedOrder(
+            id=order.pk,
+            order_number=order.order_number,
+            user_id=order.user_id,
+            product_id=order.product_id,
+            status=order.status,
+            total_amount=order.total_amount,
+            item_count=order.item_count,
+            total_quantity=order.total_quantity,
+            deadline=order.deadline,
+            memo=order.memo,
+            schema_snapshot_id=order.schema_snapshot_id,
+            confirmed_at=order.confirmed_at,
+            created_at=order.created_at,
+            payload=ArchivedOrder.pack({
+                'item_fields': order.item_fields,
+                'confirmed_by_id': order.confirmed_by_id,
+                'approved_by_id': order.approved_by_id,
+                'approved_at': _isoformat(order.approved_at),
+                'updated_at': _isoformat(order.updated_at),
+                'items': items[order.pk],
+            }),
+        ))
+        # 대시보드의 confirmed_at__date 와 같은 기준 (현재 시간대 날짜)
+        confirmed_date = timezone.localtime(order.confirmed_at).date() if order.confirmed_at else None
+        total = totals[(order.user_id, order.status, confirmed_date)]
+        total[0] += 1
+        total[1] += order.total_quantity
+        total[2] += order.total_amount
+
+    ArchivedOrder.objects.bulk_create(archived)
+    OrderArchiveRollup.objects.bulk_create([
+        OrderArchiveRollup(
+            user_id=user_id, status=status, confirmed_date=confirmed_date,
+            order_count=count, total_quantity=quantity, total_amount=amount,
+        )
+        for (user_id, status, confirmed_date), (count, quantity, amount) in totals.items()
+    ])
+    # 주문 삭제의 SET_NULL 로 연결이 사라지기 전에 보관본으로 옮긴다
+    for model in (BalanceTransaction, SettlementSnapshot):
+        model.objects.filter(order__in=batch).update(archived_order_id=F('order_id'))
+    Order.objects.filter(pk__in=[order.pk for order in batch]).delete()
+    return len(batch), sum(len(rows) for rows in items.values())
+
+
+def archive_orders(months, batch_size=ARCHIVE_BATCH_SIZE, dry_run=False, today=None):
+    """대상 주문을 id 순 배치(배치마다 트랜잭션)로 보관한다. 반환: (주문 수, 항목 수)."""
+    orders = archivable_orders(months, today)
+    if dry_run:
+        return orders.count(), orders.aggregate(s=Sum('item_count'))['s'] or 0
+
+    order_count = item_count = 0
+    last = 0
+    while pks := list(orders.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size]):
+        archived_orders, archived_items = _archive_batch(orders, pks)
+        order_count += archived_orders
+        item_count += archived_items
+        last = pks[-1]
+    if order_count:
+        bump_deadline_version()
+    return order_count, item_count
+
+
+def archived_totals(user_ids, start_date, end_date):
+    """보관된 주문의 대시보드 합계 (user_ids 범위, 기간은 입금확인일 기준)."""
+    period = Q(confirmed_date__gte=start_date, confirmed_date__lte=end_date)
+    totals = OrderArchiveRollup.objects.filter(user_id__in=user_ids).aggregate(
+        completed=Sum('order_count', filter=Q(status=Order.Status.COMPLETED)),
+        total_items=Sum('total_quantity', filter=Q(confirmed_date__isnull=False) & ~Q(status=Order.Status.CANCELLED)),
+        period_orders=Sum('order_count', filter=period),
+        period_amount=Sum('total_amount', filter=period),
+        period_items=Sum('total_quantity', filter=period),
+    )
+    return {key: value or 0 for key, value in totals.items()}
@@ -0,0 +1,213 @@
+"""주요 화면/서비스 벤치마크.
+
+현재 DB(보통 generate_synthetic_data 로 만든 데이터)에 대해 화면은 Django 테스트 클라이언트로
+미들웨어까지 포함해 요청하고, 서비스 함수는 직접 호출한다. 데이터를 바꾸는 벤치마크는
+트랜잭션 안에서 실행한 뒤 롤백한다. 결과는 커밋별로 비교할 수 있도록 JSON 으로 저장한다.
+"""
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+
+from .deadlines import sweep_deadlines
+from .models import Order, OrderItem
+from .services import create_order
+from .settlement import settlement_rows
+
+SUBMIT_ROWS = 500
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=settings.BASE_DIR,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _host():
+    # 테스트 클라이언트 요청이 ALLOWED_HOSTS 검사를 통과하도록 허용된 호스트 하나를 사용
+    host = (settings.ALLOWED_HOSTS or ['localhost'])[0].lstrip('.*')
+    return host or 'localhost'
+
+
+def _pick_users(prefix):
+    """역할별 대표 계정 — 셀러/대행사는 주문이 가장 많은 계정."""
+    users = User.objects.filter(username__startswith=prefix)
+    admin = users.filter(role=User.Role.ADMIN).first() or User.objects.filter(role=User.Role.ADMIN).first()
+    busiest = (
+        Order.objects.filter(user__username__startswith=prefix).values('user_id')
+        .annotate(n=Count('id')).order_by('-n').values_list('user_id', flat=True).first()
+    )
+    seller = User.objects.filter(pk=busiest).first() if busiest else users.filter(role=User.Role.SELLER).first()
+    return {
+        'admin': admin,
+        'manager': users.filter(role=User.Role.MANAGER).first(),
+        'agency': seller.parent if seller else None,
+        'seller': seller,
+    }
+
+
+def _view_benchmarks(users):
+    """(이름, 사용자 역할, URL, GET 파라미터)."""
+    today = timezone.localdate()
+    month = today.replace(day=1)
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    largest = OrderItem.objects.values('order_id').annotate(n=Count('id')).order_by('-n').values_list(
+        'order_id', flat=True,
+    ).first()
+    deadlines = {'start': str(month), 'end': str(next_month)}
+    rows = [
+        ('dashboard.index.admin', 'admin', reverse('dashboard:index'), {}),
+        ('dashboard.index.seller', 'seller', reverse('dashboard:index'), {}),
+        ('dashboard.deadlines.summary', 'admin', reverse('dashboard:api_deadline_events'),
+         {**deadlines, 'mode': 'summary'}),
+        ('dashboard.deadlines.events', 'manager', reverse('dashboard:api_deadline_events'), deadlines),
+        ('orders.list.admin', 'admin', reverse('orders:order_list'), {}),
+        ('orders.list.admin.search', 'admin', reverse('orders:order_list'), {'q': '0001'}),
+        ('orders.list.agency', 'agency', reverse('orders:order_list'), {}),
+        ('orders.list.seller', 'seller', reverse('orders:order_list'), {}),
+        ('orders.export.manager', 'manager', reverse('orders:order_export'), {}),
+        ('orders.settlement.month', 'admin', reverse('orders:settlement_list'), {}),
+        ('orders.settlement.all', 'admin', reverse('orders:settlement_list'), {'period': 'all'}),
+        ('accounts.user_list', 'admin', reverse('accounts:user_list'), {}),
+        ('products.price_matrix', 'admin', reverse('products:price_matrix'), {}),
+        ('orders.grid', 'seller', reverse('orders:order_grid'), {}),
+    ]
+    if largest:
+        rows += [
+            ('orders.detail.largest', 'admin', reverse('orders:order_detail', args=[largest]), {}),
+            ('orders.items.largest', 'admin', reverse('orders:api_order_items', args=[largest]), {'limit': 1000}),
+            ('orders.items_export.largest', 'admin', reverse('orders:order_items_export', args=[largest]), {}),
+        ]
+    return [row for row in rows if users.get(row[1])]
+
+
+def _service_benchmarks(users):
+    admin, seller = users['admin'], users['seller']
+    order = Order.objects.filter(user=seller).select_related('product').first() if seller else None
+
+    def settlement_summary():
+        settlement_rows(admin.get_all_order_user_ids(), period='all').summary()
+
+    def submit():
+        rows = [order.items.order_by('row_number').first().data] * SUBMIT_ROWS
+        create_order(seller, order.product, rows)
+
+    services = [('services.settlement_summary.all', settlement_summary, False)]
+    if order:
+        services.append((f'services.create_order.{SUBMIT_ROWS}', submit, True))
+    services.append(('services.sweep_deadlines', lambda: sweep_deadlines(timezone.localdate()), True))
+    return services
+
+
+def _measure(func, repeat, warmup, rollback):
+    def call():
+        if not rollback:
+            return func()
+        try:
+            with transaction.atomic():
+                func()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    for _ in range(warmup):
+        call()
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+    timings.sort()
+    return {
+        'runs': repeat,
+        'min_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'max_ms': round(timings[-1], 2),
+        'queries': queries,
+    }
+
+
+def run_benchmarks(prefix='syn-', repeat=5, warmup=1, only=None, log=None):
+    """벤치마크를 실행하고 결과 dict 를 반환한다. only 는 이름 접두어 목록."""
+    log = log or (lambda message: None)
+    users = _pick_users(prefix)
+    if users['admin'] is None:
+        raise ValueError('관리자 계정이 없습니다. generate_synthetic_data 로 데이터를 먼저 만드세요.')
+
+    clients = {}
+    for role, user in users.items():
+        if user:
+            clients[role] = Client(HTTP_HOST=_host())
+            clients[role].force_login(user)
+
+    def selected(name):
+        return not only or any(name.startswith(prefix_) for prefix_ in only)
+
+    results = {}
+    for name, role, url, params in _view_benchmarks(users):
+        if not selected(name):
+            continue
+
+        def request(client=clients[role], url=url, params=params):
+            response = client.get(url, params, secure=not settings.DEBUG)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{url} 응답 {response.status_code}')
+
+        results[name] = _measure(request, repeat, warmup, rollback=False)
+        log(f'{name}: {results[name]["median_ms"]}ms ({results[name]["queries"]} queries)')
+
+    for name, func, rollback in _service_benchmarks(users):
+        if not selected(name):
+            continue
+        results[name] = _measure(func, repeat, warmup, rollback)
+        log(f'{name}: {results[name]["median_ms"]}ms ({results[name]["queries"]} queries)')
+
+    return {
+        'commit': _git_commit(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'dataset': {
+            'users': User.objects.count(),
+            'orders': Order.objects.count(),
+            'order_items': OrderItem.objects.count(),
+        },
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare_results(previous, current):
+    """(이름, 이전 중앙값, 현재 중앙값, 변화율%) 목록 — 두 결과에 모두 있는 항목만."""
+    rows = []
+    for name, result in current['results'].items():
+        before = previous.get('results', {}).get(name)
+        if not before:
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0.0
+        rows.append((name, before['median_ms'], result['median_ms'], round(change, 1)))
+    return rows
@@ -0,0 +1,86 @@
+"""마감 임박 알림 스윕.
+
+주문 마감일이 D-7 / D-3 / D-0 기준을 넘어서는 시점에 주문자에게 알림을 만든다.
+매 실행은 직전 실행의 처리 기준일(DeadlineSweep) 이후 기준을 넘은 주문만
+deadline 인덱스 범위 조회로 찾으므로, 같은 알림이 두 번 만들어지지 않는다.
+
+동시 실행(cron + --interval 루프 등)은 트랜잭션 잠금으로 직렬화한다 — PostgreSQL 은 advisory lock,
+SQLite 는 IMMEDIATE 트랜잭션의 쓰기 잠금. 처리 기준일은 고유 제약이라, 잠금을 우회한 실행이
+같은 기준일을 다시 기록하면 IntegrityError 로 알림까지 함께 롤백된다.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from dashboard.models import Notification
+
+from .models import DeadlineSweep, Order
+
+DEADLINE_THRESHOLDS = (7, 3, 0)
+NOTIFICATION_BATCH_SIZE = 1000
+# pg_advisory_xact_lock 키 (스윕 전용)
+DEADLINE_SWEEP_LOCK_ID = 7_301_001
+
+
+def _threshold_message(order_number, threshold):
+    if threshold == 0:
+        return f'주문 {order_number} 마감일입니다 (D-Day)'
+    return f'주문 {order_number} 마감 D-{threshold}'
+
+
+def _lock_sweep():
+    """동시 실행 방지 — 잠금을 얻은 뒤에 처리 기준일을 읽어야 다른 실행의 결과가 보인다."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [DEADLINE_SWEEP_LOCK_ID])
+
+
+def _last_swept():
+    return DeadlineSweep.objects.aggregate(d=Max('swept_through'))['d']
+
+
+@transaction.atomic
+def sweep_deadlines(today=None):
+    """today 까지 기준을 넘은 주문에 알림을 만들고 처리 기준일을 기록한다.
+
+    첫 실행은 today 에 기준을 넘는 주문만 대상으로 한다.
+    여러 기준을 한 번에 넘은 주문(실행 공백)은 가장 임박한 기준 1건만 알린다.
+    반환: 만든 알림 수.
+    """
+    today = today or timezone.localdate()
+    _lock_sweep()
+    last = _last_swept()
+    since = last if last else today - timedelta(days=1)
+    if since >= today:
+        return 0
+
+    # 기준 t 를 (since, today] 사이에 넘은 주문: since + t < deadline <= today + t
+    window = Q()
+    for threshold in DEADLINE_THRESHOLDS:
+        window |= Q(deadline__gt=since + timedelta(days=threshold), deadline__lte=today + timedelta(days=threshold))
+
+    orders = Order.objects.filter(window, user__isnull=False).exclude(status=Order.Status.CANCELLED).values_list(
+        'id', 'order_number', 'user_id', 'deadline',
+    ).order_by('deadline', 'id')
+
+    def notifications():
+        for pk, order_number, user_id, deadline in orders.iterator(chunk_size=NOTIFICATION_BATCH_SIZE):
+            days_left = (deadline - today).days
+            threshold = min(t for t in DEADLINE_THRESHOLDS if t >= days_left)
+            yield Notification(
+                user_id=user_id,
+                message=_threshold_message(order_number, threshold),
+                link=f'/orders/{pk}/',
+            )
+
+    count = 0
+    rows = notifications()
+    while batch := list(islice(rows, NOTIFICATION_BATCH_SIZE)):
+        Notification.objects.bulk_create(batch)
+        count += len(batch)
+
+    DeadlineSweep.objects.create(swept_through=today, notified=count)
+    return count
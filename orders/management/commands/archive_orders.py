@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.archive import ARCHIVE_BATCH_SIZE, archive_orders
+
+
+class Command(BaseCommand):
+    help = '오래된 완료/취소 주문을 항목과 함께 보관 테이블로 옮깁니다 (정산 마감된 주문만).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=12,
+            help='이번 달 기준 몇 개월 전(1일)보다 먼저 접수된 주문을 옮길지 (기본 12)',
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='트랜잭션 1회당 주문 수')
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 건수만 출력')
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError('--months 는 1 이상이어야 합니다.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+
+        orders, items = archive_orders(options['months'], options['batch_size'], options['dry_run'])
+        label = '보관 대상' if options['dry_run'] else '보관 완료'
+        self.stdout.write(self.style.SUCCESS(f'{label}: 주문 {orders}건 / 항목 {items}건'))
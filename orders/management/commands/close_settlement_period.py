@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.settlement import close_settlement_period
+
+
+class Command(BaseCommand):
+    help = '정산월을 마감하고 주문별 정산 수치를 스냅샷으로 고정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'month', nargs='?',
+            help='마감할 정산월 (YYYY-MM). 생략하면 지난달. 이전 미마감 월도 함께 마감됩니다.',
+        )
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = date.fromisoformat(f"{options['month']}-01")
+            except ValueError:
+                raise CommandError('정산월은 YYYY-MM 형식이어야 합니다.')
+        else:
+            month = timezone.localdate().replace(day=1) - timedelta(days=1)
+
+        try:
+            periods = close_settlement_period(month)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for period in periods:
+            self.stdout.write(self.style.SUCCESS(
+                f'{period.month:%Y-%m} 마감: {period.snapshots.count()}건'
+            ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.outbox import DISPATCH_BATCH_SIZE, dispatch
+
+
+class Command(BaseCommand):
+    help = '아웃박스 이벤트(주문 상태 변경 등)를 배치로 꺼내 알림 생성/연동 핸들러에 전달합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DISPATCH_BATCH_SIZE, help='트랜잭션 1회당 이벤트 수')
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='0 보다 크면 종료하지 않고 지정한 초마다 새 이벤트를 확인합니다.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+
+        while True:
+            delivered, failed = dispatch(options['batch_size'])
+            if delivered or failed or options['interval'] <= 0:
+                self.stdout.write(self.style.SUCCESS(f'이벤트 {delivered}건 전달, {failed}건 실패(재시도 예정)'))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.analytics import export_month, months_to_export
+
+
+class Command(BaseCommand):
+    help = '주문/주문 항목을 월별 Parquet 파티션으로 내보냅니다 (분석 리포트용).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', action='append', help='내보낼 월 (YYYY-MM), 여러 번 지정 가능')
+        parser.add_argument('--all', action='store_true', help='첫 주문 월부터 전체를 다시 내보냅니다.')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                months = [date.fromisoformat(f'{m}-01') for m in options['month']]
+            except ValueError:
+                raise CommandError('월은 YYYY-MM 형식이어야 합니다.')
+        else:
+            # 기본: 아직 주문 상태가 바뀔 수 있는 지난달/이번 달만 갱신
+            months = months_to_export(all_months=options['all'])
+
+        for month in months:
+            try:
+                order_count, item_count = export_month(month)
+            except ImproperlyConfigured as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f'{month:%Y-%m}: 주문 {order_count}건, 항목 {item_count}건'
+            ))
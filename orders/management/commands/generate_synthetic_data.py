@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.synthetic import DEFAULT_PASSWORD, generate_dataset
+
+
+class Command(BaseCommand):
+    help = '성능 재현용 합성 데이터(계층/상품/단가/주문/항목/알림)를 bulk insert 로 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='syn-', help='생성하는 계정/상품/주문번호 접두어')
+        parser.add_argument('--managers', type=int, default=5, help='책임자 수')
+        parser.add_argument('--agencies', type=int, default=10, help='책임자당 대행사 수')
+        parser.add_argument('--sellers', type=int, default=20, help='대행사당 셀러 수')
+        parser.add_argument('--products', type=int, default=30)
+        parser.add_argument('--orders', type=int, default=100_000)
+        parser.add_argument('--max-items', type=int, default=50, help='주문당 최대 항목 수 (롱테일 분포)')
+        parser.add_argument('--months', type=int, default=12, help='주문일 분포 기간 (개월)')
+        parser.add_argument('--policy-ratio', type=float, default=0.2, help='개별 단가가 있는 업체 비율')
+        parser.add_argument('--notifications', type=int, default=20, help='셀러당 알림 수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--force', action='store_true', help='DEBUG=False 환경에서도 실행합니다.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('운영 DB 보호를 위해 DEBUG=False 에서는 --force 가 필요합니다.')
+        if min(options['managers'], options['agencies'], options['sellers'], options['products']) < 1:
+            raise CommandError('책임자/대행사/셀러/상품 수는 1 이상이어야 합니다.')
+
+        counts = generate_dataset(
+            prefix=options['prefix'],
+            managers=options['managers'],
+            agencies=options['agencies'],
+            sellers=options['sellers'],
+            products=options['products'],
+            orders=options['orders'],
+            max_items=options['max_items'],
+            months=options['months'],
+            policy_ratio=options['policy_ratio'],
+            notifications=options['notifications'],
+            seed=options['seed'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        summary = ', '.join(f'{name} {value:,}' for name, value in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'생성 완료: {summary}'))
+        self.stdout.write(f'로그인: {options["prefix"]}admin / {DEFAULT_PASSWORD}')
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from config.partitioning import (
+    PARTITIONED_TABLES, create_partitions, detach_partitions, is_partitioned, partition_table,
+    partitioning_enabled, shift_month,
+)
+
+# 주문 항목은 주문이 살아 있는 동안 지우면 안 되므로 빈 파티션(보관/삭제 후)만 떼어낸다
+ONLY_EMPTY_TABLES = {'orders_orderitem'}
+
+
+class Command(BaseCommand):
+    help = '월별 파티션 테이블(주문 항목/알림)에 앞으로의 월 파티션을 만들고 오래된 파티션을 떼어냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=settings.DB_PARTITION_MONTHS_AHEAD,
+            help='이번 달 이후 미리 만들어 둘 월 수',
+        )
+        parser.add_argument(
+            '--retain-months', type=int, default=0,
+            help='0 보다 크면 이번 달 기준 이 개월 수보다 오래된 월 파티션을 떼어냅니다.',
+        )
+        parser.add_argument('--drop', action='store_true', help='떼어낸 파티션 테이블을 삭제')
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='아직 파티션이 아닌 테이블을 변환 (migrate 이후에 DB_PARTITIONING 을 켠 경우)',
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning_enabled(connection):
+            self.stdout.write(self.style.WARNING('파티셔닝이 꺼져 있습니다 (PostgreSQL + DB_PARTITIONING=1 필요).'))
+            return
+        if options['ahead'] < 0 or options['retain_months'] < 0:
+            raise CommandError('--ahead/--retain-months 는 0 이상이어야 합니다.')
+
+        this_month = timezone.localdate().replace(day=1)
+        for table in PARTITIONED_TABLES:
+            with transaction.atomic():
+                if options['convert'] and partition_table(connection, table, options['ahead']):
+                    self.stdout.write(f'{table}: 파티션 테이블로 변환')
+                if not is_partitioned(connection, table):
+                    self.stdout.write(self.style.WARNING(f'{table}: 파티션 테이블이 아닙니다 (--convert 로 변환).'))
+                    continue
+                created = create_partitions(connection, table, this_month, shift_month(this_month, options['ahead']))
+                detached, skipped = [], []
+                if options['retain_months']:
+                    detached, skipped = detach_partitions(
+                        connection, table, shift_month(this_month, -options['retain_months']),
+                        drop=options['drop'], only_empty=table in ONLY_EMPTY_TABLES,
+                    )
+            self.stdout.write(self.style.SUCCESS(
+                f'{table}: 생성 {len(created)}개, {"삭제" if options["drop"] else "분리"} {len(detached)}개'
+            ))
+            if skipped:
+                self.stdout.write(self.style.WARNING(f'{table}: 데이터가 남아 건너뜀 {", ".join(skipped)}'))
@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.benchmarks import compare_results, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = '주요 화면/서비스의 응답 시간과 쿼리 수를 측정해 JSON 으로 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='syn-', help='generate_synthetic_data 의 접두어')
+        parser.add_argument('--repeat', type=int, default=5, help='항목별 측정 횟수')
+        parser.add_argument('--warmup', type=int, default=1, help='측정 전 예열 횟수')
+        parser.add_argument('--only', action='append', help='이 이름으로 시작하는 항목만 실행 (여러 번 지정 가능)')
+        parser.add_argument('--output', help='결과 JSON 경로 (기본: benchmark-results/<커밋>.json)')
+        parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat 는 1 이상이어야 합니다.')
+        previous = None
+        if options['compare']:
+            try:
+                previous = json.loads(Path(options['compare']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'비교 파일을 읽을 수 없습니다: {exc}')
+
+        try:
+            result = run_benchmarks(
+                prefix=options['prefix'], repeat=options['repeat'], warmup=options['warmup'],
+                only=options['only'], log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        name = result['commit'] or timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        output = Path(options['output'] or settings.BASE_DIR / 'benchmark-results' / f'{name}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'결과 저장: {output}'))
+
+        if previous:
+            self.stdout.write(f'\n비교: {previous.get("commit")} → {result["commit"]} (중앙값 ms)')
+            for name, before, after, change in compare_results(previous, result):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                self.stdout.write(style(f'{name:<40}{before:>10}{after:>10}{change:>+8}%'))
@@ -0,0 +1,32 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.deadlines import sweep_deadlines
+
+
+class Command(BaseCommand):
+    help = '마감 D-7/D-3/D-Day 기준을 넘은 주문의 주문자에게 알림을 만듭니다 (직전 실행 이후분만).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='처리 기준일 (YYYY-MM-DD). 생략하면 오늘.')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='0 보다 크면 종료하지 않고 지정한 초마다 반복 실행합니다.',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('처리 기준일은 YYYY-MM-DD 형식이어야 합니다.')
+
+        while True:
+            count = sweep_deadlines(today)
+            self.stdout.write(self.style.SUCCESS(f'마감 알림 {count}건 생성'))
+            if options['interval'] <= 0:
+                break
+            time.sleep(options['interval'])
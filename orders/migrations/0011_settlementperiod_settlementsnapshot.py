@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_remove_paid_status'),
+        ('products', '0010_pricepolicy_reduction_rate_alter_pricepolicy_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='해당 월 1일', unique=True, verbose_name='정산월')),
+                ('closed_at', models.DateTimeField(auto_now_add=True, verbose_name='마감 시각')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='closed_settlement_periods', to=settings.AUTH_USER_MODEL, verbose_name='마감자')),
+            ],
+            options={
+                'verbose_name': '정산 마감',
+                'verbose_name_plural': '정산 마감',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SettlementSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(max_length=30, verbose_name='주문번호')),
+                ('status', models.CharField(choices=[('submitted', '접수완료'), ('processing', '작업중'), ('completed', '완료'), ('cancelled', '취소')], max_length=15, verbose_name='상태')),
+                ('item_count', models.PositiveIntegerField(default=0, verbose_name='건수')),
+                ('total_amount', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=12, verbose_name='총 금액')),
+                ('supply', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=12, verbose_name='공급가')),
+                ('vat', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=12, verbose_name='부가세')),
+                ('total_qty', models.PositiveIntegerField(default=0, verbose_name='총타수')),
+                ('reduction_rate', models.PositiveIntegerField(default=0, verbose_name='감은 비율 (%)')),
+                ('reduced_qty', models.PositiveIntegerField(default=0, verbose_name='감은 타수')),
+                ('actual_qty', models.PositiveIntegerField(default=0, verbose_name='실투입')),
+                ('reduced_profit', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=12, verbose_name='감은 수익')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='입금확인 시각')),
+                ('confirmed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='입금확인자')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='settlement_snapshots', to='orders.order', verbose_name='주문')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='orders.settlementperiod', verbose_name='정산 마감')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='settlement_snapshots', to='products.product', verbose_name='상품')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='settlement_snapshots', to=settings.AUTH_USER_MODEL, verbose_name='주문자')),
+            ],
+            options={
+                'verbose_name': '정산 스냅샷',
+                'verbose_name_plural': '정산 스냅샷',
+                'ordering': ['-confirmed_at'],
+                'indexes': [models.Index(fields=['user', 'confirmed_at'], name='orders_sett_user_id_dd886d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_settlementperiod_settlementsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'row_number'], name='orders_item_order_row_idx'),
+        ),
+    ]
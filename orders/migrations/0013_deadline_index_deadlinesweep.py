@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_orderitem_order_row_index'),
+        ('products', '0010_pricepolicy_reduction_rate_alter_pricepolicy_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadlineSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('swept_through', models.DateField(verbose_name='처리 기준일')),
+                ('notified', models.PositiveIntegerField(default=0, verbose_name='알림 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='실행 시각')),
+            ],
+            options={
+                'verbose_name': '마감 알림 스윕',
+                'verbose_name_plural': '마감 알림 스윕',
+                'ordering': ['-swept_through', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['deadline'], name='orders_order_deadline_idx'),
+        ),
+    ]
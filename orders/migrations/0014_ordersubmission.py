@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_deadline_index_deadlinesweep'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, verbose_name='요청 키')),
+                ('payload_hash', models.CharField(max_length=64, verbose_name='요청 본문 해시')),
+                ('response', models.JSONField(default=dict, verbose_name='응답')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='접수 시각')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='orders.order', verbose_name='주문')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_submissions', to=settings.AUTH_USER_MODEL, verbose_name='주문자')),
+            ],
+            options={
+                'verbose_name': '주문 접수 키',
+                'verbose_name_plural': '주문 접수 키',
+                'constraints': [models.UniqueConstraint(fields=('user', 'key'), name='orders_submission_user_key_uniq')],
+            },
+        ),
+    ]
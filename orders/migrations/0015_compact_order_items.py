@@ -0,0 +1,102 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+import orders.models
+
+ORDER_BATCH = 500
+
+
+def _order_batches(Order):
+    """주문 id 를 ORDER_BATCH 개씩 — 변환 중인 테이블을 열어 둔 커서로 읽지 않도록 키셋으로 나눈다."""
+    last = 0
+    while True:
+        ids = list(Order.objects.filter(id__gt=last).order_by('id').values_list('id', flat=True)[:ORDER_BATCH])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def pack_items(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    Product = apps.get_model('products', 'Product')
+    schema_names = {pk: [f['name'] for f in schema or []] for pk, schema in Product.objects.values_list('id', 'schema')}
+
+    for ids in _order_batches(Order):
+        orders = list(Order.objects.filter(id__in=ids).only('id', 'product_id'))
+        items = {}
+        for item in OrderItem.objects.filter(order_id__in=ids).only('id', 'order_id', 'data'):
+            items.setdefault(item.order_id, []).append(item)
+        for order in orders:
+            # orders.models.item_fields_for / pack_item 과 같은 규칙
+            fields = list(schema_names.get(order.product_id, []))
+            seen = set(fields)
+            for item in items.get(order.id, []):
+                for name in item.data or {}:
+                    if name not in seen:
+                        seen.add(name)
+                        fields.append(name)
+            order.item_fields = fields
+            for item in items.get(order.id, []):
+                data = item.data or {}
+                cells = []
+                for name in fields:
+                    if name not in data:
+                        cells.append({})
+                    else:
+                        cells.append({'v': data[name]} if isinstance(data[name], dict) else data[name])
+                while cells and cells[-1] == {}:
+                    cells.pop()
+                item.cells = cells
+        Order.objects.bulk_update(orders, ['item_fields'])
+        OrderItem.objects.bulk_update([i for rows in items.values() for i in rows], ['cells'], batch_size=ORDER_BATCH)
+
+
+def unpack_items(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+
+    for ids in _order_batches(Order):
+        fields = dict(Order.objects.filter(id__in=ids).values_list('id', 'item_fields'))
+        items = list(OrderItem.objects.filter(order_id__in=ids).only('id', 'order_id', 'cells'))
+        for item in items:
+            # orders.models.unpack_item 과 같은 규칙
+            item.data = {}
+            for name, cell in zip(fields[item.order_id], item.cells):
+                if isinstance(cell, dict):
+                    if 'v' not in cell:
+                        continue
+                    cell = cell['v']
+                item.data[name] = cell
+        OrderItem.objects.bulk_update(items, ['data'], batch_size=ORDER_BATCH)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_ordersubmission'),
+        ('products', '0010_pricepolicy_reduction_rate_alter_pricepolicy_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_fields',
+            field=models.JSONField(
+                blank=True, default=list, encoder=orders.models.CompactJSONEncoder,
+                help_text='OrderItem.cells 위치별 필드명', verbose_name='항목 필드 순서',
+            ),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='cells',
+            field=models.JSONField(default=list, encoder=orders.models.CompactJSONEncoder, verbose_name='입력 데이터'),
+        ),
+        migrations.RunPython(pack_items, unpack_items),
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='data',
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:40
+
+import hashlib
+import json
+
+import django.db.models.deletion
+import orders.models
+from django.db import migrations, models
+
+# orders.models.compile_schema / OrderSchema.hash_columns 의 이 시점 사본 — 이후 변경과 무관하게 같은 해시를 만든다
+EXPORT_COLUMN_WIDTHS = {'date': 14, 'number': 12, 'url': 30}
+DEFAULT_EXPORT_COLUMN_WIDTH = 20
+
+
+def compile_schema(schema):
+    columns = []
+    for field in schema or []:
+        kind = field.get('type', 'text')
+        columns.append({
+            'name': field['name'],
+            'label': field.get('label', field['name']),
+            'type': kind,
+            'color': field.get('color') or '',
+            'width': EXPORT_COLUMN_WIDTHS.get(kind, DEFAULT_EXPORT_COLUMN_WIDTH),
+        })
+    return columns
+
+
+def hash_columns(columns):
+    payload = json.dumps(columns, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def snapshot_existing_orders(apps, schema_editor):
+    """기존 주문은 접수 시점 스키마가 남아 있지 않으므로 현재 상품 스키마로 스냅샷을 만든다."""
+    Order = apps.get_model('orders', 'Order')
+    OrderSchema = apps.get_model('orders', 'OrderSchema')
+    Product = apps.get_model('products', 'Product')
+    for product_id, schema in Product.objects.values_list('id', 'schema'):
+        columns = compile_schema(schema)
+        snapshot, _ = OrderSchema.objects.get_or_create(
+            content_hash=hash_columns(columns), defaults={'columns': columns},
+        )
+        Order.objects.filter(product_id=product_id, schema_snapshot__isnull=True).update(schema_snapshot=snapshot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_compact_order_items'),
+        ('products', '0010_pricepolicy_reduction_rate_alter_pricepolicy_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSchema',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True, verbose_name='내용 해시')),
+                ('columns', models.JSONField(default=list, encoder=orders.models.CompactJSONEncoder, verbose_name='열 정의')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+            ],
+            options={
+                'verbose_name': '주문 스키마',
+                'verbose_name_plural': '주문 스키마',
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='schema_snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='orders.orderschema', verbose_name='주문 스키마'),
+        ),
+        migrations.RunPython(snapshot_existing_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_order_schema_snapshot'),
+        ('products', '0010_pricepolicy_reduction_rate_alter_pricepolicy_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='주문 ID')),
+                ('order_number', models.CharField(max_length=30, unique=True, verbose_name='주문번호')),
+                ('status', models.CharField(choices=[('submitted', '접수완료'), ('processing', '작업중'), ('completed', '완료'), ('cancelled', '취소')], max_length=15, verbose_name='상태')),
+                ('total_amount', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=12, verbose_name='총 금액')),
+                ('item_count', models.PositiveIntegerField(default=0, verbose_name='건수')),
+                ('total_quantity', models.PositiveIntegerField(default=0, verbose_name='총 수량')),
+                ('deadline', models.DateField(blank=True, null=True, verbose_name='마감일')),
+                ('memo', models.TextField(blank=True, verbose_name='메모')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='입금확인 시각')),
+                ('created_at', models.DateTimeField(verbose_name='주문일')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='보관 시각')),
+                ('payload', models.BinaryField(verbose_name='보관 데이터')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='products.product', verbose_name='상품')),
+                ('schema_snapshot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_orders', to='orders.orderschema', verbose_name='주문 스키마')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to=settings.AUTH_USER_MODEL, verbose_name='주문자')),
+            ],
+            options={
+                'verbose_name': '보관 주문',
+                'verbose_name_plural': '보관 주문',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='orders_archived_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderArchiveRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('submitted', '접수완료'), ('processing', '작업중'), ('completed', '완료'), ('cancelled', '취소')], max_length=15, verbose_name='상태')),
+                ('confirmed_date', models.DateField(blank=True, null=True, verbose_name='입금확인일')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='주문 수')),
+                ('total_quantity', models.PositiveBigIntegerField(default=0, verbose_name='총 수량')),
+                ('total_amount', models.DecimalField(decimal_places=0, default=Decimal('0'), max_digits=14, verbose_name='총 금액')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='주문자')),
+            ],
+            options={
+                'verbose_name': '보관 주문 합계',
+                'verbose_name_plural': '보관 주문 합계',
+                'indexes': [models.Index(fields=['user', 'confirmed_date'], name='orders_rollup_user_date_idx')],
+            },
+        ),
+    ]
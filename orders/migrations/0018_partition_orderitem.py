@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:20
+
+from django.db import migrations
+
+from config.partitioning import partition_table, unpartition_table
+
+
+def partition(apps, schema_editor):
+    partition_table(schema_editor.connection, 'orders_orderitem')
+
+
+def unpartition(apps, schema_editor):
+    unpartition_table(schema_editor.connection, 'orders_orderitem')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0017_archivedorder_orderarchiverollup'),
+    ]
+
+    operations = [
+        # DB_PARTITIONING=1 인 PostgreSQL 에서만 created_at 월별 파티션으로 변환 (그 외에는 아무것도 하지 않음)
+        migrations.RunPython(partition, unpartition),
+    ]
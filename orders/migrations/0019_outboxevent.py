@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:05
+
+import django.utils.timezone
+import orders.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0018_partition_orderitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=50, verbose_name='토픽')),
+                ('payload', models.JSONField(default=dict, encoder=orders.models.CompactJSONEncoder, verbose_name='내용')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='실패 횟수')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 오류')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='처리 가능 시각')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+            ],
+            options={
+                'verbose_name': '아웃박스 이벤트',
+                'verbose_name_plural': '아웃박스 이벤트',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['available_at', 'id'], name='orders_outbox_available_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0019_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deadlinesweep',
+            name='swept_through',
+            field=models.DateField(unique=True, verbose_name='처리 기준일'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 22:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0020_deadlinesweep_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ordersubmission',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='orders.order', verbose_name='주문'),
+        ),
+    ]
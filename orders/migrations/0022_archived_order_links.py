@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0021_ordersubmission_pending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='balancetransaction',
+            name='archived_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='orders.archivedorder', verbose_name='관련 주문 (보관)'),
+        ),
+        migrations.AddField(
+            model_name='settlementsnapshot',
+            name='archived_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='settlement_snapshots', to='orders.archivedorder', verbose_name='주문 (보관)'),
+        ),
+    ]
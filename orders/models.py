@@ -1,7 +1,133 @@
-from django.db import models
+import hashlib
+import json
+import time
+import zlib
+
+from django.db import models, transaction
 from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from decimal import Decimal
 
+from config.cache import cache_timeout
+
+DEADLINE_VERSION_KEY = 'orders:deadline_version'
+# 이 필드가 바뀌면 마감일 캘린더 캐시를 무효화
+DEADLINE_FIELDS = {
+    'order_number', 'user', 'product', 'status', 'deadline', 'item_count', 'total_quantity', 'total_amount',
+}
+
+
+def get_deadline_version():
+    """마감일 캘린더 캐시 키/ETag 에 붙이는 버전 (accounts.models.get_hierarchy_version 과 같은 방식)."""
+    return cache.get_or_set(DEADLINE_VERSION_KEY, time.time_ns, cache_timeout(None))
+
+
+def _set_deadline_version():
+    cache.set(DEADLINE_VERSION_KEY, time.time_ns(), cache_timeout(None))
+
+
+def bump_deadline_version():
+    """주문 마감일/상태 변경 후 호출 — save()/delete() 는 자동, queryset.update() 는 직접 호출해야 한다.
+
+    커밋 후에 올린다: 트랜잭션 안에서 올리면 동시 요청이 커밋 전 데이터를 새 버전 키로 캐시할 수 있다.
+    """
+    transaction.on_commit(_set_deadline_version)
+
+
+class CompactJSONEncoder(json.JSONEncoder):
+    """공백 없는 구분자, 한글을 \\uXXXX 대신 그대로 — 텍스트로 저장하는 DB(SQLite 등)에서 크기를 줄인다."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.update(ensure_ascii=False, separators=(',', ':'))
+        super().__init__(*args, **kwargs)
+
+
+# 엑셀 내보내기 열 너비 (스키마 필드 타입별)
+EXPORT_COLUMN_WIDTHS = {'date': 14, 'number': 12, 'url': 30}
+DEFAULT_EXPORT_COLUMN_WIDTH = 20
+
+
+def compile_schema(schema):
+    """상품 스키마 → 주문 항목을 그리는 데 필요한 열 정의 (이름/라벨/타입/색/엑셀 너비)."""
+    columns = []
+    for field in schema or []:
+        kind = field.get('type', 'text')
+        columns.append({
+            'name': field['name'],
+            'label': field.get('label', field['name']),
+            'type': kind,
+            'color': field.get('color') or '',
+            'width': EXPORT_COLUMN_WIDTHS.get(kind, DEFAULT_EXPORT_COLUMN_WIDTH),
+        })
+    return columns
+
+
+def item_fields_for(schema, rows):
+    """주문 항목 배열의 열 순서 — 스키마 필드 순서, 그 뒤에 스키마에 없는 키(처음 나온 순)."""
+    fields = [f['name'] for f in schema or []]
+    seen = set(fields)
+    for row in rows:
+        for name in row:
+            if name not in seen:
+                seen.add(name)
+                fields.append(name)
+    return fields
+
+
+def pack_item(fields, data):
+    """dict 행 → 위치 배열. None 은 null, 없는 키는 {} (끝쪽은 잘라낸다), dict 값은 {"v": 값} 으로 감싼다."""
+    cells = []
+    for name in fields:
+        if name not in data:
+            cells.append({})
+        else:
+            value = data[name]
+            cells.append({'v': value} if isinstance(value, dict) else value)
+    while cells and cells[-1] == {}:
+        cells.pop()
+    return cells
+
+
+def unpack_item(fields, cells):
+    """위치 배열 → dict 행 ({} 인 칸과 배열 뒤쪽은 원래 없던 키)."""
+    row = {}
+    for name, cell in zip(fields, cells):
+        if isinstance(cell, dict):
+            if 'v' not in cell:
+                continue
+            cell = cell['v']
+        row[name] = cell
+    return row
+
+
+class OrderSchema(models.Model):
+    """주문 시점의 컴파일된 스키마 — 내용 해시로 중복을 없애 같은 스키마의 주문들이 한 행을 공유한다."""
+    content_hash = models.CharField(max_length=64, unique=True, verbose_name='내용 해시')
+    columns = models.JSONField(default=list, encoder=CompactJSONEncoder, verbose_name='열 정의')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+
+    class Meta:
+        verbose_name = '주문 스키마'
+        verbose_name_plural = '주문 스키마'
+
+    def __str__(self):
+        return self.content_hash[:12]
+
+    @staticmethod
+    def hash_columns(columns):
+        payload = json.dumps(columns, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @classmethod
+    def for_schema(cls, schema):
+        """상품 스키마의 스냅샷 (같은 내용이면 기존 행)."""
+        columns = compile_schema(schema)
+        snapshot, _ = cls.objects.get_or_create(content_hash=cls.hash_columns(columns), defaults={'columns': columns})
+        return snapshot
+
 
 class Order(models.Model):
     class Status(models.TextChoices):
@@ -37,6 +163,15 @@ class Order(models.Model):
         help_text='리워드 상품 만료 날짜',
     )
     memo = models.TextField(blank=True, verbose_name='메모')
+    schema_snapshot = models.ForeignKey(
+        OrderSchema, on_delete=models.PROTECT,
+        null=True, blank=True,
+        related_name='orders', verbose_name='주문 스키마',
+    )
+    item_fields = models.JSONField(
+        default=list, blank=True, encoder=CompactJSONEncoder, verbose_name='항목 필드 순서',
+        help_text='OrderItem.cells 위치별 필드명',
+    )
     confirmed_at = models.DateTimeField(
         null=True, blank=True, verbose_name='입금확인 시각',
     )
@@ -60,10 +195,53 @@ class Order(models.Model):
         verbose_name = '주문'
         verbose_name_plural = '주문'
         ordering = ['-created_at']
+        indexes = [
+            # 마감 임박 스윕/캘린더: 마감일 범위 조회
+            models.Index(fields=['deadline'], name='orders_order_deadline_idx'),
+        ]
 
     def __str__(self):
         return f"{self.order_number} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or DEADLINE_FIELDS.intersection(update_fields):
+            bump_deadline_version()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_deadline_version()
+        return result
+
+    # 보관본에서 복원한 주문이면 ArchivedOrder (읽기 전용)
+    archive = None
+
+    def get_absolute_url(self):
+        return reverse('orders:order_detail', args=[self.pk])
+
+    @property
+    def columns(self):
+        """항목 열 정의 — 접수 시점 스냅샷, 스냅샷이 없는 주문만 현재 상품 스키마로 계산."""
+        if self.schema_snapshot_id:
+            return self.schema_snapshot.columns
+        return compile_schema(self.product.schema)
+
+    def item_reader(self, names):
+        """OrderItem.cells 에서 names 순서로 값을 꺼내는 함수 (없는 값은 '')."""
+        index = {name: i for i, name in enumerate(self.item_fields)}
+        positions = [index.get(name) for name in names]
+
+        def read(cells):
+            values = []
+            for i in positions:
+                value = cells[i] if i is not None and i < len(cells) else None
+                if isinstance(value, dict):
+                    value = value.get('v')
+                values.append('' if value is None else value)
+            return values
+        return read
+
 
 class OrderItem(models.Model):
     class Status(models.TextChoices):
@@ -77,7 +255,8 @@ class OrderItem(models.Model):
         related_name='items', verbose_name='주문',
     )
     row_number = models.PositiveIntegerField(verbose_name='행 번호')
-    data = models.JSONField(default=dict, verbose_name='입력 데이터')
+    # 입력 데이터를 키 없이 order.item_fields 순서의 배열로 저장 — dict 는 data 로 접근
+    cells = models.JSONField(default=list, encoder=CompactJSONEncoder, verbose_name='입력 데이터')
     unit_price = models.DecimalField(
         max_digits=10, decimal_places=0, default=Decimal('0'),
         verbose_name='단가',
@@ -93,10 +272,188 @@ class OrderItem(models.Model):
         verbose_name = '주문 항목'
         verbose_name_plural = '주문 항목'
         ordering = ['row_number']
+        indexes = [
+            # 주문 상세 항목 API: 주문별 row_number 키셋 페이징
+            models.Index(fields=['order', 'row_number'], name='orders_item_order_row_idx'),
+        ]
 
     def __str__(self):
         return f"#{self.row_number} - {self.order.order_number}"
 
+    @property
+    def data(self):
+        """입력 데이터 dict. order.items 로 불러오면 주문을 다시 조회하지 않는다."""
+        return unpack_item(self.order.item_fields, self.cells)
+
+    @data.setter
+    def data(self, value):
+        # 주문의 열 순서에 없는 키는 뒤에 덧붙인다 (기존 위치는 그대로라 다른 항목에 영향 없음) — save() 때 주문에 저장
+        fields = self.order.item_fields
+        new_fields = [name for name in value if name not in fields]
+        if new_fields:
+            fields.extend(new_fields)
+            self._order_fields_changed = True
+        self.cells = pack_item(fields, value)
+
+    def save(self, *args, **kwargs):
+        if getattr(self, '_order_fields_changed', False):
+            self.order.save(update_fields=['item_fields'])
+            self._order_fields_changed = False
+        super().save(*args, **kwargs)
+
+
+class OrderSubmission(models.Model):
+    """Idempotency-Key 로 접수된 주문 — 같은 키의 재요청에는 저장된 응답을 돌려준다."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='order_submissions', verbose_name='주문자',
+    )
+    key = models.CharField(max_length=64, verbose_name='요청 키')
+    payload_hash = models.CharField(max_length=64, verbose_name='요청 본문 해시')
+    # 접수 처리 중인 예약은 주문이 비어 있다
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='submissions', verbose_name='주문',
+    )
+    response = models.JSONField(default=dict, verbose_name='응답')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='접수 시각')
+
+    class Meta:
+        verbose_name = '주문 접수 키'
+        verbose_name_plural = '주문 접수 키'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='orders_submission_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} → {self.order_id}"
+
+
+# 보관본 항목 배열의 칸 순서
+ARCHIVE_ITEM_FIELDS = ('row_number', 'cells', 'unit_price', 'status', 'result_message')
+
+
+class ArchivedOrder(models.Model):
+    """주문 테이블에서 옮겨 둔 오래된 완료/취소 주문 — 항목은 payload 한 칸에 압축해 둔다.
+
+    id 는 원래 주문 id 그대로라 /orders/<id>/ 링크가 계속 동작한다.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name='주문 ID')
+    order_number = models.CharField(max_length=30, unique=True, verbose_name='주문번호')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='archived_orders', verbose_name='주문자',
+    )
+    product = models.ForeignKey(
+        'products.Product', on_delete=models.PROTECT,
+        related_name='archived_orders', verbose_name='상품',
+    )
+    status = models.CharField(max_length=15, choices=Order.Status.choices, verbose_name='상태')
+    total_amount = models.DecimalField(
+        max_digits=12, decimal_places=0, default=Decimal('0'),
+        verbose_name='총 금액',
+    )
+    item_count = models.PositiveIntegerField(default=0, verbose_name='건수')
+    total_quantity = models.PositiveIntegerField(default=0, verbose_name='총 수량')
+    deadline = models.DateField(null=True, blank=True, verbose_name='마감일')
+    memo = models.TextField(blank=True, verbose_name='메모')
+    schema_snapshot = models.ForeignKey(
+        OrderSchema, on_delete=models.PROTECT,
+        null=True, blank=True,
+        related_name='archived_orders', verbose_name='주문 스키마',
+    )
+    confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name='입금확인 시각')
+    created_at = models.DateTimeField(verbose_name='주문일')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='보관 시각')
+    # zlib 압축 JSON: 나머지 주문 필드 + items (ARCHIVE_ITEM_FIELDS 순서 배열)
+    payload = models.BinaryField(verbose_name='보관 데이터')
+
+    class Meta:
+        verbose_name = '보관 주문'
+        verbose_name_plural = '보관 주문'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='orders_archived_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} (보관)"
+
+    def get_absolute_url(self):
+        return reverse('orders:order_detail', args=[self.pk])
+
+    @staticmethod
+    def pack(data):
+        return zlib.compress(json.dumps(data, cls=CompactJSONEncoder, default=str).encode())
+
+    @property
+    def data(self):
+        if not hasattr(self, '_data'):
+            self._data = json.loads(zlib.decompress(self.payload))
+        return self._data
+
+    def item_values(self, *fields):
+        """OrderItem values_list(*fields) 와 같은 형태의 튜플 목록 (row_number 순)."""
+        positions = [ARCHIVE_ITEM_FIELDS.index(name) for name in fields]
+        return [tuple(item[i] for i in positions) for item in self.data['items']]
+
+    def to_order(self):
+        """화면/엑셀용으로 복원한 Order (저장하지 않는다, archive 로 보관본을 가리킨다)."""
+        data = self.data
+        order = Order(
+            id=self.id,
+            order_number=self.order_number,
+            user=self.user,
+            product=self.product,
+            status=self.status,
+            total_amount=self.total_amount,
+            item_count=self.item_count,
+            total_quantity=self.total_quantity,
+            deadline=self.deadline,
+            memo=self.memo,
+            schema_snapshot=self.schema_snapshot,
+            item_fields=data['item_fields'],
+            confirmed_at=self.confirmed_at,
+            confirmed_by_id=data['confirmed_by_id'],
+            approved_by_id=data['approved_by_id'],
+            approved_at=parse_datetime(data['approved_at']) if data['approved_at'] else None,
+            created_at=self.created_at,
+            updated_at=parse_datetime(data['updated_at']),
+        )
+        order.archive = self
+        return order
+
+
+class OrderArchiveRollup(models.Model):
+    """보관한 주문의 (주문자, 상태, 입금확인일) 별 합계 — 대시보드 합계에 더한다.
+
+    보관 배치마다 행을 추가하므로 같은 키의 행이 여러 개일 수 있다 (항상 Sum 으로 읽는다).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+', verbose_name='주문자',
+    )
+    status = models.CharField(max_length=15, choices=Order.Status.choices, verbose_name='상태')
+    confirmed_date = models.DateField(null=True, blank=True, verbose_name='입금확인일')
+    order_count = models.PositiveIntegerField(default=0, verbose_name='주문 수')
+    total_quantity = models.PositiveBigIntegerField(default=0, verbose_name='총 수량')
+    total_amount = models.DecimalField(
+        max_digits=14, decimal_places=0, default=Decimal('0'),
+        verbose_name='총 금액',
+    )
+
+    class Meta:
+        verbose_name = '보관 주문 합계'
+        verbose_name_plural = '보관 주문 합계'
+        indexes = [
+            models.Index(fields=['user', 'confirmed_date'], name='orders_rollup_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.status} {self.confirmed_date} ({self.order_count}건)"
+
 
 class BalanceTransaction(models.Model):
     class TxType(models.TextChoices):
@@ -123,6 +480,12 @@ class BalanceTransaction(models.Model):
         null=True, blank=True,
         related_name='transactions', verbose_name='관련 주문',
     )
+    # 주문이 보관되면 order 는 비고 보관본(같은 id)을 가리킨다
+    archived_order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='transactions', verbose_name='관련 주문 (보관)',
+    )
     description = models.CharField(max_length=200, blank=True, verbose_name='설명')
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
@@ -138,3 +501,132 @@ class BalanceTransaction(models.Model):
 
     def __str__(self):
         return f"{self.user} {self.get_tx_type_display()} {self.amount}원"
+
+
+class SettlementPeriod(models.Model):
+    month = models.DateField(unique=True, verbose_name='정산월', help_text='해당 월 1일')
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='closed_settlement_periods',
+        verbose_name='마감자',
+    )
+    closed_at = models.DateTimeField(auto_now_add=True, verbose_name='마감 시각')
+
+    class Meta:
+        verbose_name = '정산 마감'
+        verbose_name_plural = '정산 마감'
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} 마감"
+
+
+class SettlementSnapshot(models.Model):
+    """마감된 정산월의 주문별 정산 수치 (마감 시점 고정값)."""
+    period = models.ForeignKey(
+        SettlementPeriod, on_delete=models.CASCADE,
+        related_name='snapshots', verbose_name='정산 마감',
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='settlement_snapshots', verbose_name='주문',
+    )
+    archived_order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='settlement_snapshots', verbose_name='주문 (보관)',
+    )
+    order_number = models.CharField(max_length=30, verbose_name='주문번호')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='settlement_snapshots', verbose_name='주문자',
+    )
+    product = models.ForeignKey(
+        'products.Product', on_delete=models.PROTECT,
+        related_name='settlement_snapshots', verbose_name='상품',
+    )
+    status = models.CharField(
+        max_length=15, choices=Order.Status.choices, verbose_name='상태',
+    )
+    item_count = models.PositiveIntegerField(default=0, verbose_name='건수')
+    total_amount = models.DecimalField(
+        max_digits=12, decimal_places=0, default=Decimal('0'),
+        verbose_name='총 금액',
+    )
+    supply = models.DecimalField(
+        max_digits=12, decimal_places=0, default=Decimal('0'),
+        verbose_name='공급가',
+    )
+    vat = models.DecimalField(
+        max_digits=12, decimal_places=0, default=Decimal('0'),
+        verbose_name='부가세',
+    )
+    total_qty = models.PositiveIntegerField(default=0, verbose_name='총타수')
+    reduction_rate = models.PositiveIntegerField(default=0, verbose_name='감은 비율 (%)')
+    reduced_qty = models.PositiveIntegerField(default=0, verbose_name='감은 타수')
+    actual_qty = models.PositiveIntegerField(default=0, verbose_name='실투입')
+    reduced_profit = models.DecimalField(
+        max_digits=12, decimal_places=0, default=Decimal('0'),
+        verbose_name='감은 수익',
+    )
+    confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name='입금확인 시각')
+    confirmed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='+',
+        verbose_name='입금확인자',
+    )
+
+    class Meta:
+        verbose_name = '정산 스냅샷'
+        verbose_name_plural = '정산 스냅샷'
+        ordering = ['-confirmed_at']
+        indexes = [
+            models.Index(fields=['user', 'confirmed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} ({self.period})"
+
+    def get_absolute_url(self):
+        if self.order_id is None:
+            return ''
+        return reverse('orders:order_detail', args=[self.order_id])
+
+
+class OutboxEvent(models.Model):
+    """상태 변경과 같은 트랜잭션에 쌓는 이벤트 — dispatch_outbox 가 배치로 꺼내 핸들러에 전달한다 (orders.outbox)."""
+    topic = models.CharField(max_length=50, verbose_name='토픽')
+    payload = models.JSONField(default=dict, encoder=CompactJSONEncoder, verbose_name='내용')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='실패 횟수')
+    last_error = models.TextField(blank=True, verbose_name='마지막 오류')
+    available_at = models.DateTimeField(default=timezone.now, verbose_name='처리 가능 시각')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+
+    class Meta:
+        verbose_name = '아웃박스 이벤트'
+        verbose_name_plural = '아웃박스 이벤트'
+        ordering = ['id']
+        indexes = [
+            # 디스패처: 처리 가능한 이벤트를 id 순으로
+            models.Index(fields=['available_at', 'id'], name='orders_outbox_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk}"
+
+
+class DeadlineSweep(models.Model):
+    """마감 임박 알림 스윕 실행 기록. 가장 최근 swept_through 가 다음 실행의 기준점."""
+    swept_through = models.DateField(unique=True, verbose_name='처리 기준일')
+    notified = models.PositiveIntegerField(default=0, verbose_name='알림 수')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='실행 시각')
+
+    class Meta:
+        verbose_name = '마감 알림 스윕'
+        verbose_name_plural = '마감 알림 스윕'
+        ordering = ['-swept_through', '-id']
+
+    def __str__(self):
+        return f"{self.swept_through} 까지 ({self.notified}건)"
@@ -0,0 +1,175 @@
+"""트랜잭션 아웃박스.
+
+주문 상태 변경 같은 이벤트는 요청 안에서 알림/외부 연동을 직접 처리하지 않고,
+같은 트랜잭션에 OutboxEvent 행만 쌓는다 (publish). 상태 변경이 롤백되면 이벤트도 남지 않는다.
+별도 프로세스(manage.py dispatch_outbox)가 이벤트를 id 순 배치로 꺼내
+settings.OUTBOX_HANDLERS 의 토픽별 핸들러에 payload 목록으로 전달한다.
+
+- 핸들러는 handler(payloads) 형태. 한 토픽의 핸들러들은 이벤트 삭제와 같은 트랜잭션에서 실행되므로
+  DB 에만 쓰는 핸들러(알림 생성)는 정확히 한 번 반영된다. 외부 호출은 재시도될 수 있으니 멱등하게 작성한다.
+- 핸들러가 실패하면 그 토픽의 배치는 롤백되고 이벤트를 한 건씩 다시 전달한다 — 실패한 이벤트만
+  지수 백오프 후 재시도되고, 같은 배치의 정상 이벤트는 그대로 전달된다.
+  OUTBOX_MAX_ATTEMPTS 번 실패한 이벤트는 더 꺼내지 않는다 (관리자 화면에서 last_error 확인).
+- 지연(DEFERRABLE) 외래키 위반은 커밋 때 드러난다. PostgreSQL 은 세이브포인트 안에서 미리 검사하고,
+  그래도 배치 커밋이 실패하면 이벤트마다 따로 커밋해 문제 이벤트 하나가 디스패처 전체를 막지 않게 한다.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from accounts.models import User
+from dashboard.models import Notification
+
+from .models import Order, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS_CHANGED = 'order.status_changed'
+DISPATCH_BATCH_SIZE = 500
+RETRY_BASE_SECONDS = 30
+
+
+def publish(topic, payloads):
+    """이벤트를 현재 트랜잭션에 기록한다 (payloads: dict 목록)."""
+    OutboxEvent.objects.bulk_create([OutboxEvent(topic=topic, payload=payload) for payload in payloads])
+
+
+def order_status_payload(order_id, order_number, user_id, status, previous=None):
+    return {
+        'order_id': order_id,
+        'order_number': order_number,
+        'user_id': user_id,
+        'status': str(status),
+        'previous': str(previous) if previous else None,
+    }
+
+
+def publish_order_status(changes):
+    """주문 상태 변경 이벤트. changes: (pk, order_number, user_id, status, 이전 status) 목록."""
+    publish(ORDER_STATUS_CHANGED, [order_status_payload(*change) for change in changes])
+
+
+def notify_order_status(payloads):
+    """주문자에게 상태 변경 알림 (주문자가 없거나 이벤트 기록 뒤 삭제된 주문은 건너뜀)."""
+    labels = dict(Order.Status.choices)
+    user_ids = set(User.objects.filter(
+        pk__in={payload['user_id'] for payload in payloads if payload['user_id']},
+    ).values_list('pk', flat=True))
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=payload['user_id'],
+            message=f"주문 {payload['order_number']} 상태: {labels.get(payload['status'], payload['status'])}",
+            link=f"/orders/{payload['order_id']}/",
+        )
+        for payload in payloads if payload['user_id'] in user_ids
+    ])
+
+
+def handlers_for(topic):
+    return [import_string(path) for path in settings.OUTBOX_HANDLERS.get(topic, [])]
+
+
+def _ready_events():
+    return OutboxEvent.objects.filter(available_at__lte=timezone.now(), attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+
+
+def _record_failure(events, exc):
+    now = timezone.now()
+    for event in events:
+        event.attempts += 1
+        event.last_error = f'{type(exc).__name__}: {exc}'[:2000]
+        event.available_at = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** min(event.attempts - 1, 10))
+    OutboxEvent.objects.bulk_update(events, ['attempts', 'last_error', 'available_at'])
+
+
+def _deliver(topic, events):
+    """한 토픽의 이벤트를 핸들러에 전달하고 지운다. 반환: (전달 수, 실패 수).
+
+    배치가 실패하면 한 건씩 다시 전달해 실패한 이벤트에만 시도 횟수/백오프를 기록한다.
+    """
+    try:
+        with transaction.atomic():
+            payloads = [event.payload for event in events]
+            for handler in handlers_for(topic):
+                handler(payloads)
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+            if connection.vendor == 'postgresql':
+                # 지연 외래키 검사를 세이브포인트 안에서 (SET CONSTRAINTS ALL IMMEDIATE)
+                connection.check_constraints()
+    except Exception as exc:
+        if len(events) > 1:
+            logger.warning('outbox %s 배치 전달 실패 — 한 건씩 다시 전달 (%d건)', topic, len(events))
+            delivered = failed = 0
+            for event in events:
+                event_delivered, event_failed = _deliver(topic, [event])
+                delivered += event_delivered
+                failed += event_failed
+            return delivered, failed
+        logger.exception('outbox %s 전달 실패 (event %s)', topic, events[0].pk)
+        _record_failure(events, exc)
+        return 0, 1
+    return len(events), 0
+
+
+@transaction.atomic
+def _dispatch_batch(batch_size):
+    # PostgreSQL 에서는 SKIP LOCKED 로 잠가 디스패처를 여러 개 띄워도 같은 이벤트를 나눠 갖지 않는다
+    events = list(_ready_events().select_for_update(skip_locked=True).order_by('id')[:batch_size])
+    by_topic = defaultdict(list)
+    for event in events:
+        by_topic[event.topic].append(event)
+
+    delivered = failed = 0
+    for topic, topic_events in by_topic.items():
+        topic_delivered, topic_failed = _deliver(topic, topic_events)
+        delivered += topic_delivered
+        failed += topic_failed
+    return delivered, failed
+
+
+def _dispatch_each(batch_size):
+    """이벤트마다 따로 커밋한다 — 커밋 시점에 실패한 이벤트만 재시도로 돌린다."""
+    delivered = failed = 0
+    for pk in list(_ready_events().order_by('id').values_list('pk', flat=True)[:batch_size]):
+        try:
+            with transaction.atomic():
+                event = _ready_events().select_for_update(skip_locked=True).filter(pk=pk).first()
+                if event is None:
+                    continue
+                event_delivered, event_failed = _deliver(event.topic, [event])
+        except DatabaseError as exc:
+            logger.exception('outbox event %s 커밋 실패', pk)
+            with transaction.atomic():
+                _record_failure(list(OutboxEvent.objects.select_for_update().filter(pk=pk)), exc)
+            event_delivered, event_failed = 0, 1
+        delivered += event_delivered
+        failed += event_failed
+    return delivered, failed
+
+
+def dispatch_batch(batch_size=DISPATCH_BATCH_SIZE):
+    """처리 가능한 이벤트를 최대 batch_size 건 전달한다. 반환: (전달 수, 실패 수).
+
+    배치 트랜잭션 커밋이 실패하면(지연 외래키 위반 등) 같은 이벤트들을 한 건씩 다시 처리한다.
+    """
+    try:
+        return _dispatch_batch(batch_size)
+    except DatabaseError:
+        logger.exception('outbox 배치 커밋 실패 — 이벤트마다 따로 처리')
+        return _dispatch_each(batch_size)
+
+
+def dispatch(batch_size=DISPATCH_BATCH_SIZE):
+    """남은 이벤트를 배치로 모두 전달한다 (실패한 이벤트는 다음 실행에서 재시도). 반환: (전달 수, 실패 수)."""
+    delivered = failed = 0
+    while True:
+        batch_delivered, batch_failed = dispatch_batch(batch_size)
+        delivered += batch_delivered
+        failed += batch_failed
+        if batch_delivered + batch_failed < batch_size or not batch_delivered:
+            return delivered, failed
@@ -1,15 +1,76 @@
+import hashlib
+import json
 import os
 from datetime import timedelta
 from decimal import Decimal
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from products.models import PricePolicy
 
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderSchema, OrderSubmission, bump_deadline_version, item_fields_for, pack_item
+from .outbox import publish_order_status
 
 ORDER_MAX_ITEMS = int(os.getenv('ORDER_MAX_ITEMS', '5000'))
+# 같은 Idempotency-Key 재요청에 저장된 응답을 돌려주는 기간
+ORDER_IDEMPOTENCY_TTL_HOURS = int(os.getenv('ORDER_IDEMPOTENCY_TTL_HOURS', '24'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+# 예약만 되고 응답이 기록되지 않은 키(프로세스 중단 등)를 버려진 것으로 보는 시간
+ORDER_IDEMPOTENCY_PENDING_SECONDS = int(os.getenv('ORDER_IDEMPOTENCY_PENDING_SECONDS', '600'))
+
+
+class SubmissionInProgress(Exception):
+    """같은 Idempotency-Key 의 요청이 아직 처리 중."""
+
+
+def submission_hash(product_id, rows, memo):
+    """접수 요청 본문 해시 — 키 재사용 시 같은 내용인지 비교한다."""
+    payload = json.dumps([product_id, rows, memo], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@transaction.atomic
+def reserve_submission(user, key, payload_hash):
+    """주문 생성 전에 키를 예약한다 (짧은 별도 트랜잭션). 반환: (예약 행, 저장된 응답).
+
+    - 처음 온 요청: (처리 중 행, None) — 접수가 끝나면 complete_submission, 실패하면 release_submission.
+    - 이미 접수된 키: (None, 저장된 응답) — 주문을 다시 만들지 않고 그대로 돌려준다.
+    - 같은 키가 처리 중이면 SubmissionInProgress, 다른 내용에 쓰였으면 ValueError.
+    """
+    now = timezone.now()
+    # 만료된 키는 이 사용자 것만 정리 — (user, key) 유니크 인덱스로 조회
+    OrderSubmission.objects.filter(user=user, created_at__lt=now - timedelta(hours=ORDER_IDEMPOTENCY_TTL_HOURS)).delete()
+    # 버려진 예약(응답 없이 오래된 행)은 새 요청이 가져간다
+    OrderSubmission.objects.filter(
+        user=user, key=key, order__isnull=True,
+        created_at__lt=now - timedelta(seconds=ORDER_IDEMPOTENCY_PENDING_SECONDS),
+    ).delete()
+    try:
+        with transaction.atomic():
+            return OrderSubmission.objects.create(user=user, key=key, payload_hash=payload_hash), None
+    except IntegrityError:
+        pass
+    submission = OrderSubmission.objects.get(user=user, key=key)
+    if submission.payload_hash != payload_hash:
+        raise ValueError('같은 요청 키로 다른 내용이 이미 접수되었습니다. 새로고침 후 다시 접수하세요.')
+    if submission.order_id is None:
+        raise SubmissionInProgress('같은 주문 접수가 처리 중입니다. 잠시 후 다시 확인하세요.')
+    return None, submission.response
+
+
+def complete_submission(submission, order, response):
+    """예약한 키에 접수 결과를 기록한다 — 주문 생성과 같은 트랜잭션에서 호출."""
+    submission.order = order
+    submission.response = response
+    submission.save(update_fields=['order', 'response'])
+
+
+def release_submission(submission):
+    """접수에 실패한 예약을 풀어 같은 키로 다시 시도할 수 있게 한다."""
+    OrderSubmission.objects.filter(pk=submission.pk, order__isnull=True).delete()
 
 
 def get_user_price(product, user):
@@ -63,6 +124,7 @@ def create_order(user, product, items_data, memo=''):
     total_amount = supply_amount + vat_amount
 
     deadline_date = timezone.now().date() + timedelta(days=product.max_work_days)
+    item_fields = item_fields_for(product.schema, items_data)
 
     order = Order.objects.create(
         order_number='TEMP',
@@ -73,6 +135,8 @@ def create_order(user, product, items_data, memo=''):
         total_quantity=total_qty,
         deadline=deadline_date,
         memo=memo,
+        schema_snapshot=OrderSchema.for_schema(product.schema),
+        item_fields=item_fields,
         status=Order.Status.SUBMITTED,
     )
     order.order_number = str(order.pk)
@@ -82,7 +146,7 @@ def create_order(user, product, items_data, memo=''):
         OrderItem(
             order=order,
             row_number=idx,
-            data=data,
+            cells=pack_item(item_fields, data),
             unit_price=unit_price,
         )
         for idx, data in enumerate(items_data, start=1)
@@ -92,24 +156,90 @@ def create_order(user, product, items_data, memo=''):
     return order
 
 
+# 주문 상태 전이표: 목표 상태 → 허용되는 현재 상태
+ORDER_TRANSITIONS = {
+    Order.Status.SUBMITTED: {Order.Status.PROCESSING, Order.Status.CANCELLED},
+    Order.Status.PROCESSING: {Order.Status.SUBMITTED, Order.Status.COMPLETED},
+    Order.Status.COMPLETED: {Order.Status.SUBMITTED, Order.Status.PROCESSING},
+    Order.Status.CANCELLED: {Order.Status.SUBMITTED, Order.Status.PROCESSING},
+}
+# 목표 상태별 항목 상태 동기화: (항목 상태, 그대로 둘 항목 상태)
+ITEM_STATUS_SYNC = {
+    Order.Status.PROCESSING: (OrderItem.Status.PROCESSING, [OrderItem.Status.COMPLETED]),
+    Order.Status.COMPLETED: (OrderItem.Status.COMPLETED, []),
+}
+TRANSITION_APPLIED = 'applied'
+TRANSITION_REJECTED = 'rejected'
+
+
+def next_statuses(status):
+    """status 에서 옮길 수 있는 상태 목록 (Order.Status 순서)."""
+    return [value for value in Order.Status.values if status in ORDER_TRANSITIONS[value]]
+
+
 @transaction.atomic
-def confirm_payment(order, confirmed_by):
-    """관리자의 입금 확인 처리."""
-    if order.status != Order.Status.SUBMITTED:
-        raise ValueError('접수완료 상태의 주문만 입금확인 처리할 수 있습니다.')
-
-    order.status = Order.Status.PAID
-    order.confirmed_at = timezone.now()
-    order.confirmed_by = confirmed_by
-    order.save(update_fields=['status', 'confirmed_at', 'confirmed_by', 'updated_at'])
+def transition_orders(orders, to_status, by=None, allowed_from=None, confirm=False):
+    """주문 queryset 을 to_status 로 옮긴다. 반환: {pk: (결과, 전이 전 상태)}.
+
+    - 전이표에서 허용된(allowed_from 을 주면 그 교집합) 상태의 주문만 조건부 UPDATE 1회로 바꾸고,
+      나머지는 TRANSITION_REJECTED 로 남긴다. 주문 수와 무관하게 쿼리 수가 일정하다.
+    - 주문 항목 상태 동기화, 상태 변경 이벤트(outbox) 기록까지 같은 트랜잭션에서 한다.
+    - confirm 이면 입금확인 시각/확인자를 (비어 있을 때만) 채운다.
+    """
+    if to_status not in ORDER_TRANSITIONS:
+        raise ValueError('올바르지 않은 주문 상태입니다.')
+    allowed = ORDER_TRANSITIONS[to_status]
+    if allowed_from is not None:
+        allowed = allowed & set(allowed_from)
+
+    # 전이 전 상태를 정확히 돌려주도록 대상 행을 잠근다 (PostgreSQL FOR UPDATE, SQLite 는 쓰기 트랜잭션)
+    rows = list(orders.select_for_update().values_list('pk', 'order_number', 'user_id', 'status'))
+    applied = [row for row in rows if row[3] in allowed]
+    if applied:
+        now = timezone.now()
+        changes = {'status': to_status, 'updated_at': now}
+        if confirm:
+            changes['confirmed_at'] = Coalesce(F('confirmed_at'), Value(now))
+            if by is not None:
+                changes['confirmed_by'] = Coalesce(
+                    F('confirmed_by'), Value(by.pk), output_field=Order._meta.get_field('confirmed_by'),
+                )
+        pks = [row[0] for row in applied]
+        Order.objects.filter(pk__in=pks, status__in=allowed).update(**changes)
+
+        if to_status in ITEM_STATUS_SYNC:
+            item_status, keep = ITEM_STATUS_SYNC[to_status]
+            OrderItem.objects.filter(order_id__in=pks).exclude(status__in=keep).update(status=item_status)
+        publish_order_status([(pk, number, user_id, to_status, status) for pk, number, user_id, status in applied])
+        bump_deadline_version()
+
+    return {
+        pk: (TRANSITION_APPLIED if status in allowed else TRANSITION_REJECTED, status)
+        for pk, _, _, status in rows
+    }
+
+
+def transition_order(order, to_status, by=None, allowed_from=None, confirm=False, error=None):
+    """주문 1건 전이 — 허용되지 않으면 ValueError, 성공하면 order 의 상태 필드를 갱신한다."""
+    outcome, status = transition_orders(
+        Order.objects.filter(pk=order.pk), to_status, by, allowed_from, confirm,
+    ).get(order.pk, (TRANSITION_REJECTED, order.status))
+    if outcome != TRANSITION_APPLIED:
+        labels = dict(Order.Status.choices)
+        if error is None and status == to_status:
+            error = f'이미 {labels[status]} 상태인 주문입니다.'
+        raise ValueError(error or f'{labels.get(status, status)} 상태의 주문은 {labels.get(to_status, to_status)}(으)로 변경할 수 없습니다.')
+    order.refresh_from_db(fields=['status', 'confirmed_at', 'confirmed_by', 'updated_at'])
     return order
 
 
-@transaction.atomic
-def cancel_order(order, cancelled_by):
-    if order.status == Order.Status.CANCELLED:
-        raise ValueError('이미 취소된 주문입니다.')
+def confirm_payment(order, confirmed_by):
+    """관리자의 입금 확인 처리 — 접수완료 → 작업중, 입금확인 시각/확인자 기록."""
+    return transition_order(
+        order, Order.Status.PROCESSING, by=confirmed_by, allowed_from={Order.Status.SUBMITTED}, confirm=True,
+        error='접수완료 상태의 주문만 입금확인 처리할 수 있습니다.',
+    )
 
-    order.status = Order.Status.CANCELLED
-    order.save(update_fields=['status', 'updated_at'])
-    return order
+
+def cancel_order(order, cancelled_by, allowed_from=None):
+    return transition_order(order, Order.Status.CANCELLED, by=cancelled_by, allowed_from=allowed_from)
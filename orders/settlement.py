@@ -0,0 +1,349 @@
+"""정산 금액 계산: 공급가/부가세/감은 타수/감은 수익을 DB 표현식으로 산출.
+
+마감된 정산월은 SettlementSnapshot 에 고정된 값을 읽고,
+마감되지 않은 기간만 주문 테이블에서 실시간으로 계산한다.
+"""
+from datetime import date, datetime
+from itertools import chain, islice
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    BigIntegerField, Case, CharField, Count, F, FilteredRelation, Max, Min, Q, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, Length, NullIf, Power
+from django.db.models.lookups import Exact, GreaterThan, LessThan
+from django.utils import timezone
+
+from .models import Order, SettlementPeriod, SettlementSnapshot
+
+SETTLEMENT_STATUSES = [Order.Status.PROCESSING, Order.Status.COMPLETED]
+SNAPSHOT_BATCH_SIZE = 1000
+# pg_advisory_xact_lock 키 (정산 마감 전용, orders.deadlines 의 스윕 키와 다르게)
+SETTLEMENT_CLOSE_LOCK_ID = 7_301_002
+
+
+# 감은 수익의 단가(공급가 / 총타수)는 기존 Decimal 코드처럼 유효숫자 28자리(ROUND_HALF_EVEN)로 반올림된다
+DECIMAL_PRECISION = 28
+
+
+def _reduced_profit(reduced_qty, supply, total_qty):
+    """int(Decimal(감은 타수) * (Decimal(공급가) / Decimal(총타수))) 를 정수 연산으로 재현한다.
+
+    감은 타수 * 공급가 / 총타수(n)가 정수가 아니면 28자리 반올림 오차로는 버림 값이 바뀌지 않아 n 을 버림한 값이다.
+    정수이면 단가가 28자리에서 내림 반올림되고 곱셈 반올림으로도 n 에 닿지 못할 때만 n - 1 이 된다
+    (예: 공급가 1000, 총타수 88, 감은 타수 22 → 249). annotate_settlement 는 같은 식을 SQL 로 계산한다.
+    """
+    if total_qty <= 0 or reduced_qty <= 0 or supply <= 0:
+        return 0
+    n, remainder = divmod(reduced_qty * supply, total_qty)
+    if remainder:
+        return n
+    # 단가의 지수 a (10^a <= 공급가 / 총타수 < 10^(a+1)) 와 남기는 소수 자릿수 k
+    if supply >= total_qty:
+        a = len(str(supply // total_qty)) - 1
+    else:
+        a = -len(str((total_qty + supply - 1) // supply - 1))
+    k = DECIMAL_PRECISION - 1 - a
+    # 단가 * 10^k 의 소수부 = g / 감은 타수, g2 로 몫의 홀짝(동률 반올림)을 판단
+    g2 = n * 10 ** k % (2 * reduced_qty)
+    g = g2 % reduced_qty
+    if g == 0 or 2 * g > reduced_qty or (2 * g == reduced_qty and g2 >= reduced_qty):
+        return n
+    # 단가가 내림되었다: 곱 n - g / 10^k 가 28자리 반올림으로 n 에 닿는지
+    c = len(str(n - 1)) - 1 - a if n > 1 else -1 - a
+    return n - 1 if c < 0 or 2 * g > 10 ** c else n
+
+
+def settlement_figures(total_amount, total_quantity, reduction_rate):
+    """주문 1건의 정산 수치 (annotate_settlement 와 동일한 정수 연산).
+
+    - 공급가: 총액 / 1.1 반올림
+    - 감은 타수: 총타수 * 감은% / 100 버림
+    - 감은 수익: 감은 타수 * (공급가 / 총타수) 버림 — 단가는 Decimal 28자리 반올림 (_reduced_profit)
+    """
+    total = int(total_amount)
+    supply = (20 * total + 11) // 22
+    total_qty = total_quantity or 0
+    rate = reduction_rate or 0
+    reduced_qty = total_qty * rate // 100
+    reduced_profit = _reduced_profit(reduced_qty, supply, total_qty)
+    return {
+        'supply': supply,
+        'vat': total - supply,
+        'reduction_rate': rate,
+        'total_qty': total_qty,
+        'reduced_qty': reduced_qty,
+        'actual_qty': total_qty - reduced_qty,
+        'reduced_profit': reduced_profit,
+    }
+
+
+def _pow10(exponent):
+    return Cast(Power(Value(10), exponent), BigIntegerField())
+
+
+def _digits(value):
+    return Length(Cast(value, CharField()))
+
+
+def _reduced_profit_expression():
+    """_reduced_profit 의 SQL 식 (supply/total_qty/reduced_qty annotate 기준).
+
+    10^k 는 BIGINT 를 넘으므로 g2 = n * 10^k mod 2*감은 타수 를 9자리 이하씩 곱해 가며 구한다.
+    나눗셈/나머지는 0 을 만나지 않도록 바깥 Case 의 THEN 안에서만 계산된다.
+    """
+    supply, total_qty, reduced_qty = F('supply'), F('total_qty'), F('reduced_qty')
+    # 감은 타수 * 공급가 는 BIGINT 를 넘을 수 있어 공급가를 몫/나머지로 나눠 곱한다
+    part = reduced_qty * (supply % total_qty)
+    n = reduced_qty * (supply / total_qty) + part / total_qty
+    a = Case(
+        When(supply__gte=total_qty, then=_digits(supply / total_qty) - Value(1)),
+        default=Value(0) - _digits((total_qty + supply - Value(1)) / NullIf(supply, Value(0)) - Value(1)),
+    )
+    k = Value(DECIMAL_PRECISION - 1) - a
+    modulus = Value(2) * reduced_qty
+    # 공급가 < 10^12 → a <= 11 → k >= 16, 총타수 < 2^31 → a >= -10 → k <= 37
+    g2 = n % modulus
+    for exponent in (
+        Value(9), Value(7), Greatest(Least(k - Value(16), Value(9)), Value(0)),
+        Greatest(Least(k - Value(25), Value(9)), Value(0)), Greatest(k - Value(34), Value(0)),
+    ):
+        g2 = g2 * _pow10(exponent) % modulus
+    g = g2 % reduced_qty
+    c = Case(
+        When(GreaterThan(n, Value(1)), then=_digits(n - Value(1)) - Value(1) - a),
+        default=Value(-1) - a,
+    )
+    rounded_down = (
+        Q(GreaterThan(g, Value(0)))
+        & (Q(LessThan(Value(2) * g, reduced_qty)) | Q(Exact(Value(2) * g, reduced_qty), LessThan(g2, reduced_qty)))
+        & (Q(LessThan(c, Value(0))) | Q(GreaterThan(Value(2) * g, _pow10(c))))
+    )
+    return Case(
+        When(
+            Q(total_qty__gt=0, reduced_qty__gt=0, supply__gt=0),
+            then=Case(
+                When(Q(Exact(part % total_qty, Value(0))) & rounded_down, then=n - Value(1)),
+                default=n,
+            ),
+        ),
+        default=Value(0),
+        output_field=BigIntegerField(),
+    )
+
+
+def annotate_settlement(orders):
+    """주문 queryset 에 정산 수치를 annotate 한다.
+
+    업체별 감은 비율(PricePolicy)이 없으면 상품 기본 감은 비율을 사용한다.
+    """
+    int_field = BigIntegerField()
+    total = Cast('total_amount', int_field)
+
+    # (product, user) 는 unique 이므로 LEFT JOIN 결과는 주문당 최대 1행
+    return orders.annotate(
+        user_policy=FilteredRelation(
+            'product__price_policies',
+            condition=Q(product__price_policies__user=F('user')),
+        ),
+    ).annotate(
+        total_qty=Coalesce(F('total_quantity'), Value(0), output_field=int_field),
+        reduction_rate=Coalesce(
+            F('user_policy__reduction_rate'),
+            F('product__reduction_rate'),
+            Value(0),
+            output_field=int_field,
+        ),
+        supply=(Value(20) * total + Value(11)) / Value(22),
+    ).annotate(
+        vat=total - F('supply'),
+        reduced_qty=F('total_qty') * F('reduction_rate') / Value(100),
+    ).annotate(
+        actual_qty=F('total_qty') - F('reduced_qty'),
+        reduced_profit=_reduced_profit_expression(),
+    )
+
+
+def settlement_summary(orders):
+    """annotate_settlement 가 적용된 queryset 의 합계를 aggregate 1회로 계산."""
+    sums = orders.order_by().aggregate(
+        total_count=Count('id'),
+        total_amount=Sum('total_amount'),
+        total_qty=Sum('total_qty'),
+        total_supply=Sum('supply'),
+        total_vat=Sum('vat'),
+        total_reduced_qty=Sum('reduced_qty'),
+        total_actual_qty=Sum('actual_qty'),
+        total_reduced_profit=Sum('reduced_profit'),
+    )
+    return {key: int(value or 0) for key, value in sums.items()}
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_start(month):
+    return timezone.make_aware(datetime(month.year, month.month, 1))
+
+
+def filter_settlement_period(queryset, date_from=None, date_to=None, period='month'):
+    """정산 화면의 기간 필터 (confirmed_at 기준)."""
+    if date_from:
+        queryset = queryset.filter(confirmed_at__date__gte=date_from)
+    elif period == 'month' and not date_to:
+        now = timezone.now()
+        first_day = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        queryset = queryset.filter(confirmed_at__gte=first_day)
+
+    if date_to:
+        queryset = queryset.filter(confirmed_at__date__lte=date_to)
+    return queryset
+
+
+def get_closed_month():
+    """마지막으로 마감된 정산월(1일) — 마감 이력이 없으면 None."""
+    return SettlementPeriod.objects.aggregate(m=Max('month'))['m']
+
+
+def _lock_close():
+    """동시/중복 마감 방지 — 잠금을 얻은 뒤에 마지막 마감월을 읽어야 앞선 마감이 보인다.
+
+    PostgreSQL 은 advisory lock, SQLite 는 IMMEDIATE 트랜잭션의 쓰기 잠금으로 직렬화된다.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SETTLEMENT_CLOSE_LOCK_ID])
+
+
+@transaction.atomic
+def close_settlement_period(month, closed_by=None):
+    """month 까지의 미마감 정산월을 순서대로 마감하고 주문별 정산 수치를 고정한다.
+
+    마감은 항상 과거 월부터 연속으로 진행되므로, 마지막 마감월 이전의
+    정산은 전부 스냅샷에서 읽을 수 있다.
+    """
+    month = month.replace(day=1)
+    if month >= timezone.localdate().replace(day=1):
+        raise ValueError('진행 중인 월은 마감할 수 없습니다.')
+
+    _lock_close()
+    last_closed = get_closed_month()
+    if last_closed and month <= last_closed:
+        raise ValueError(f'{month:%Y-%m}월은 이미 마감되었습니다.')
+
+    if last_closed:
+        start = _next_month(last_closed)
+    else:
+        first_confirmed = Order.objects.filter(
+            status__in=SETTLEMENT_STATUSES, confirmed_at__isnull=False,
+        ).aggregate(m=Min('confirmed_at'))['m']
+        start = min(month, timezone.localtime(first_confirmed).date().replace(day=1)) if first_confirmed else month
+
+    periods = []
+    while start <= month:
+        end = _next_month(start)
+        try:
+            with transaction.atomic():
+                period = SettlementPeriod.objects.create(month=start, closed_by=closed_by)
+        except IntegrityError:
+            # 잠금을 거치지 않은 동시 마감이 먼저 기록한 경우
+            raise ValueError(f'{start:%Y-%m}월은 이미 마감되었습니다.')
+        orders = annotate_settlement(Order.objects.filter(
+            status__in=SETTLEMENT_STATUSES,
+            confirmed_at__gte=_month_start(start),
+            confirmed_at__lt=_month_start(end),
+        ))
+        snapshots = (
+            SettlementSnapshot(
+                period=period,
+                order_id=o.pk,
+                order_number=o.order_number,
+                user_id=o.user_id,
+                product_id=o.product_id,
+                status=o.status,
+                item_count=o.item_count,
+                total_amount=o.total_amount,
+                supply=o.supply,
+                vat=o.vat,
+                total_qty=o.total_qty,
+                reduction_rate=o.reduction_rate,
+                reduced_qty=o.reduced_qty,
+                actual_qty=o.actual_qty,
+                reduced_profit=o.reduced_profit,
+                confirmed_at=o.confirmed_at,
+                confirmed_by_id=o.confirmed_by_id,
+            )
+            for o in orders.iterator(chunk_size=SNAPSHOT_BATCH_SIZE)
+        )
+        while batch := list(islice(snapshots, SNAPSHOT_BATCH_SIZE)):
+            SettlementSnapshot.objects.bulk_create(batch)
+        periods.append(period)
+        start = end
+    return periods
+
+
+class SettlementRows:
+    """실시간(미마감) 주문과 마감 스냅샷을 하나의 목록처럼 다루는 Paginator 용 시퀀스.
+
+    마감은 과거 월부터 연속으로 이뤄지므로 최신순 정렬에서
+    실시간 구간이 항상 스냅샷 구간보다 앞에 온다.
+    """
+
+    def __init__(self, live, closed):
+        self.live = live
+        self.closed = closed
+        self._live_count = None
+
+    def _get_live_count(self):
+        if self._live_count is None:
+            self._live_count = self.live.count()
+        return self._live_count
+
+    def count(self):
+        return self._get_live_count() + self.closed.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('SettlementRows supports slicing only.')
+        start, stop = index.start or 0, index.stop
+        live_count = self._get_live_count()
+        rows = list(self.live[start:min(stop, live_count)]) if start < live_count else []
+        if stop > live_count:
+            rows += list(self.closed[max(start - live_count, 0):stop - live_count])
+        return rows
+
+    def __iter__(self):
+        return chain(self.live.iterator(chunk_size=2000), self.closed.iterator(chunk_size=2000))
+
+    def summary(self):
+        live = settlement_summary(self.live)
+        closed = settlement_summary(self.closed)
+        return {key: live[key] + closed[key] for key in live}
+
+
+def settlement_rows(user_ids, date_from=None, date_to=None, period='month'):
+    """정산 화면/엑셀 공용 행 목록 (마감월은 스냅샷, 그 이후는 실시간 계산)."""
+    live = Order.objects.select_related('user', 'product', 'confirmed_by').filter(
+        status__in=SETTLEMENT_STATUSES, user_id__in=user_ids,
+    )
+    live = filter_settlement_period(live, date_from, date_to, period)
+    closed = SettlementSnapshot.objects.none()
+
+    closed_month = get_closed_month()
+    if closed_month:
+        # 입금확인 시각이 없는 주문은 스냅샷에 들어가지 않으므로 계속 실시간으로 보여준다
+        live = live.filter(
+            Q(confirmed_at__gte=_month_start(_next_month(closed_month))) | Q(confirmed_at__isnull=True),
+        )
+        closed = SettlementSnapshot.objects.select_related('user', 'product', 'confirmed_by').filter(
+            user_id__in=user_ids,
+        )
+        closed = filter_settlement_period(closed, date_from, date_to, period)
+
+    live = annotate_settlement(live).order_by('-confirmed_at', '-pk')
+    closed = closed.order_by('-confirmed_at', '-pk')
+    return SettlementRows(live, closed)
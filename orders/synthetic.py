@@ -0,0 +1,282 @@
+"""성능 재현용 합성 데이터 생성.
+
+운영 규모(책임자/대행사/셀러 계층, 다양한 스키마의 상품, 업체별 단가, 수백만 건의 주문/항목)를
+bulk_create 로 만든다. 모든 계정/상품/주문은 prefix 로 시작하므로 기존 데이터와 섞이지 않으며,
+같은 seed 로 다시 만들면 같은 분포가 나온다.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import count, islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User, bump_hierarchy_version
+from dashboard.models import Notification
+from products.models import Category, PricePolicy, Product
+
+from .models import Order, OrderItem, OrderSchema, bump_deadline_version, item_fields_for, pack_item
+
+DEFAULT_PASSWORD = 'bench1234'
+ORDER_BATCH_SIZE = 2000
+
+CATEGORY_NAMES = ['블로그', '플레이스', '쇼핑', '인스타그램', '유튜브']
+
+# 상품 스키마 견본 — 실제 상품처럼 URL/키워드/수량/날짜/계산 필드를 섞는다
+SCHEMA_TEMPLATES = [
+    [
+        {'name': 'url', 'label': '블로그 URL', 'type': 'url', 'required': True},
+        {'name': 'keyword', 'label': '검색 키워드', 'type': 'text', 'required': True},
+        {'name': 'count', 'label': '방문수', 'type': 'number', 'required': True, 'is_quantity': True},
+    ],
+    [
+        {'name': 'place_url', 'label': '플레이스 URL', 'type': 'url', 'required': True},
+        {'name': 'keyword', 'label': '키워드', 'type': 'text', 'required': True},
+        {'name': 'daily', 'label': '일 타수', 'type': 'number', 'required': True},
+        {'name': 'days', 'label': '작업일수', 'type': 'number', 'required': True},
+        {'name': 'total', 'label': '총 타수', 'type': 'calc', 'is_quantity': True,
+         'formula': {'fieldA': 'daily', 'fieldB': 'days', 'operator': '*'}},
+        {'name': 'start', 'label': '시작일', 'type': 'date', 'required': True},
+        {'name': 'end', 'label': '종료일', 'type': 'date_calc',
+         'formula': {'dateField': 'start', 'daysField': 'days'}},
+    ],
+    [
+        {'name': 'product_url', 'label': '상품 URL', 'type': 'url', 'required': True},
+        {'name': 'store', 'label': '스토어명', 'type': 'text', 'required': True},
+        {'name': 'option', 'label': '옵션', 'type': 'select', 'options': ['찜', '장바구니', '구매']},
+        {'name': 'qty', 'label': '수량', 'type': 'number', 'required': True, 'is_quantity': True},
+        {'name': 'memo', 'label': '비고', 'type': 'text'},
+    ],
+    [
+        {'name': 'post_url', 'label': '게시물 URL', 'type': 'url', 'required': True},
+        {'name': 'likes', 'label': '좋아요 수', 'type': 'number', 'required': True, 'is_quantity': True},
+    ],
+]
+
+# (상태, 비율) — 오래된 주문일수록 완료 비중이 높도록 _order_status 에서 보정
+STATUS_WEIGHTS = [
+    (Order.Status.COMPLETED, 70),
+    (Order.Status.PROCESSING, 15),
+    (Order.Status.SUBMITTED, 10),
+    (Order.Status.CANCELLED, 5),
+]
+KEYWORDS = ['맛집', '카페', '네일', '헬스', '필라테스', '꽃집', '미용실', '치과', '학원', '캠핑']
+
+
+@contextmanager
+def _explicit_timestamps():
+    """생성일/수정일을 과거 날짜로 넣을 수 있도록 auto_now(_add) 를 잠시 끈다."""
+    fields = [
+        Order._meta.get_field('created_at'), Order._meta.get_field('updated_at'),
+        OrderItem._meta.get_field('created_at'),
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _bulk_users(prefix, role, parents, per_parent, password, rng, seq):
+    users = [
+        User(
+            username=f'{prefix}{role}{next(seq)}',
+            company_name=f'{prefix}{User.Role(role).label}{rng.randint(1000, 9999)}',
+            role=role, parent=parent, password=password,
+        )
+        for parent in parents
+        for _ in range(per_parent)
+    ]
+    return User.objects.bulk_create(users, batch_size=ORDER_BATCH_SIZE)
+
+
+def _field_value(field, rng, created):
+    kind = field.get('type', 'text')
+    if kind == 'url':
+        return f'https://example.com/{rng.getrandbits(40):x}'
+    if kind == 'number':
+        return str(rng.choice([1, 1, 1, 5, 10, 10, 30, 50, 100]))
+    if kind == 'date':
+        return (created + timedelta(days=rng.randint(0, 3))).strftime('%Y-%m-%d')
+    if kind == 'select':
+        return rng.choice(field.get('options') or [''])
+    return rng.choice(KEYWORDS)
+
+
+def _item_data(schema, rng, created):
+    data = {f['name']: _field_value(f, rng, created) for f in schema if f.get('type') not in ('calc', 'date_calc')}
+    for f in schema:
+        formula = f.get('formula') or {}
+        if f.get('type') == 'calc':
+            data[f['name']] = str(int(data.get(formula.get('fieldA'), 0)) * int(data.get(formula.get('fieldB'), 0)))
+        elif f.get('type') == 'date_calc':
+            start = datetime.strptime(data[formula['dateField']], '%Y-%m-%d')
+            days = int(data.get(formula.get('daysField')) or 1)
+            data[f['name']] = (start + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    return data
+
+
+def _quantity(schema, data):
+    for f in schema:
+        if f.get('is_quantity'):
+            return int(data.get(f['name']) or 0)
+    return 1
+
+
+def _order_status(rng, age_days):
+    # 최근 2주 주문은 아직 접수/작업 중인 비중이 높다
+    if age_days <= 14:
+        return rng.choices(
+            [Order.Status.SUBMITTED, Order.Status.PROCESSING, Order.Status.COMPLETED, Order.Status.CANCELLED],
+            weights=[35, 35, 25, 5],
+        )[0]
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    return rng.choices(statuses, weights=weights)[0]
+
+
+def _orders(prefix, start, total, sellers, products, snapshots, prices, months, max_items, admin, rng, now):
+    """(Order, [OrderItem...]) 를 하나씩 만든다 — 최근 주문일수록 많이 생성."""
+    span_days = max(months * 30, 1)
+    for seq in range(start, start + total):
+        # 제곱 분포: 최근 날짜 쪽에 주문이 몰린다
+        age_days = int(span_days * rng.random() ** 2)
+        created = now - timedelta(days=age_days, seconds=rng.randint(0, 86399))
+        seller = rng.choice(sellers)
+        product = rng.choice(products)
+        unit_price = prices.get((product.pk, seller.pk), product.base_price)
+        status = _order_status(rng, age_days)
+
+        item_count = min(max_items, max(1, int(rng.paretovariate(1.2))))
+        fields = item_fields_for(product.schema, [])
+        items = []
+        total_qty = 0
+        for row in range(1, item_count + 1):
+            data = _item_data(product.schema, rng, created)
+            total_qty += _quantity(product.schema, data)
+            items.append(OrderItem(
+                row_number=row, cells=pack_item(fields, data), unit_price=unit_price, created_at=created,
+                status={
+                    Order.Status.COMPLETED: OrderItem.Status.COMPLETED,
+                    Order.Status.PROCESSING: OrderItem.Status.PROCESSING,
+                }.get(status, OrderItem.Status.PENDING),
+            ))
+
+        supply = unit_price * total_qty
+        confirmed = status in (Order.Status.PROCESSING, Order.Status.COMPLETED)
+        order = Order(
+            order_number=f'{prefix}{seq:09d}', user=seller, product=product, status=status,
+            total_amount=supply + (supply * Decimal('0.1')).quantize(Decimal('1')),
+            item_count=item_count, total_quantity=total_qty, item_fields=fields,
+            schema_snapshot=snapshots[product.pk],
+            deadline=(created + timedelta(days=product.max_work_days)).date(),
+            created_at=created, updated_at=created,
+            confirmed_at=created + timedelta(hours=rng.randint(1, 48)) if confirmed else None,
+            confirmed_by=admin if confirmed else None,
+        )
+        yield order, items
+
+
+def generate_dataset(prefix='syn-', managers=5, agencies=10, sellers=20, products=30, orders=100_000,
+                     max_items=50, months=12, policy_ratio=0.2, notifications=20, seed=0, log=None):
+    """합성 데이터를 만들고 생성 건수를 반환한다.
+
+    agencies 는 책임자당, sellers 는 대행사당 개수. orders 건수만큼 주문을 만들고,
+    주문당 항목 수는 1..max_items 의 롱테일 분포를 따른다.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    now = timezone.now()
+    password = make_password(DEFAULT_PASSWORD)
+
+    with transaction.atomic():
+        admin = User.objects.filter(role=User.Role.ADMIN, username=f'{prefix}admin').first()
+        if admin is None:
+            admin = User.objects.create(
+                username=f'{prefix}admin', company_name=f'{prefix}본사', role=User.Role.ADMIN, password=password,
+            )
+            User.objects.create(
+                username=f'{prefix}accountant', role=User.Role.ACCOUNTANT, parent=admin, password=password,
+            )
+        # 재실행해도 아이디가 겹치지 않도록 기존 계정 수부터 번호를 이어간다
+        seq = count(User.objects.filter(username__startswith=prefix).count())
+        manager_rows = _bulk_users(prefix, User.Role.MANAGER, [admin], managers, password, rng, seq)
+        agency_rows = _bulk_users(prefix, User.Role.AGENCY, manager_rows, agencies, password, rng, seq)
+        seller_rows = _bulk_users(prefix, User.Role.SELLER, agency_rows, sellers, password, rng, seq)
+        log(f'계정: 책임자 {len(manager_rows)}, 대행사 {len(agency_rows)}, 셀러 {len(seller_rows)}')
+
+        categories = [
+            Category.objects.get_or_create(name=name, defaults={'display_order': i})[0]
+            for i, name in enumerate(CATEGORY_NAMES)
+        ]
+        product_rows = Product.objects.bulk_create([
+            Product(
+                name=f'{prefix}상품{i}', category=rng.choice(categories),
+                schema=rng.choice(SCHEMA_TEMPLATES),
+                cost_price=Decimal(rng.choice([5, 10, 20, 50, 100])),
+                base_price=Decimal(rng.choice([10, 20, 30, 80, 150])),
+                reduction_rate=rng.choice([0, 0, 10, 20, 30]),
+                max_work_days=rng.choice([1, 3, 7, 14, 30]),
+            )
+            for i in range(products)
+        ])
+
+        policies = [
+            PricePolicy(
+                product=product, user=seller,
+                price=product.base_price - rng.choice([0, 1, 2, 5]),
+                reduction_rate=rng.choice([None, None, 10, 20]),
+            )
+            for seller in seller_rows + agency_rows
+            if rng.random() < policy_ratio
+            for product in rng.sample(product_rows, k=max(1, len(product_rows) // 5))
+        ]
+        PricePolicy.objects.bulk_create(policies, batch_size=ORDER_BATCH_SIZE)
+        log(f'상품 {len(product_rows)}개, 단가 정책 {len(policies)}건')
+
+    prices = {(p.product_id, p.user_id): p.price for p in policies if p.price is not None}
+    start = Order.objects.filter(order_number__startswith=prefix).count()
+    snapshots = {product.pk: OrderSchema.for_schema(product.schema) for product in product_rows}
+    rows = _orders(
+        prefix, start, orders, seller_rows, product_rows, snapshots, prices, months, max_items, admin, rng, now,
+    )
+    order_count = item_count = 0
+    with _explicit_timestamps():
+        while batch := list(islice(rows, ORDER_BATCH_SIZE)):
+            with transaction.atomic():
+                created = Order.objects.bulk_create([order for order, _ in batch])
+                items = []
+                for order, (_, order_items) in zip(created, batch):
+                    for item in order_items:
+                        item.order = order
+                    items.extend(order_items)
+                OrderItem.objects.bulk_create(items, batch_size=ORDER_BATCH_SIZE)
+            order_count += len(batch)
+            item_count += len(items)
+            log(f'주문 {order_count:,}/{orders:,} (항목 {item_count:,})')
+
+    notification_rows = [
+        Notification(user=seller, message=f'{prefix}알림 {i}', link='/orders/', is_read=rng.random() < 0.7)
+        for seller in seller_rows
+        for i in range(notifications)
+    ]
+    Notification.objects.bulk_create(notification_rows, batch_size=ORDER_BATCH_SIZE)
+
+    # bulk_create 는 save() 를 거치지 않으므로 캐시 버전을 직접 갱신
+    bump_hierarchy_version()
+    bump_deadline_version()
+    return {
+        'managers': len(manager_rows),
+        'agencies': len(agency_rows),
+        'sellers': len(seller_rows),
+        'products': len(product_rows),
+        'price_policies': len(policies),
+        'orders': order_count,
+        'order_items': item_count,
+        'notifications': len(notification_rows),
+    }
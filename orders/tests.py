@@ -1,12 +1,52 @@
+import json
+import random
+import time
+from datetime import date, timedelta
 from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
 from unittest.mock import patch
 
-from django.test import TestCase
-from django.urls import reverse
+import openpyxl
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
 
 from accounts.models import User
-from orders.services import create_order
-from products.models import Product
+from config.db import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware, read_from_replica
+from config.partitioning import (
+    create_partitions, list_partitions, month_bound, partition_name, partitioning_enabled, shift_month,
+)
+from dashboard.models import Notice, Notification
+from loadtest.payloads import XLSX_CONTENT_TYPE, order_rows, upload_workbook
+from orders import analytics
+from orders.benchmarks import compare_results
+from orders.deadlines import sweep_deadlines
+from orders.archive import archive_orders
+from orders.models import (
+    ArchivedOrder, BalanceTransaction, DeadlineSweep, Order, OrderArchiveRollup, OrderItem, OrderSchema,
+    OrderSubmission, OutboxEvent, SettlementPeriod, SettlementSnapshot, pack_item, unpack_item,
+)
+from orders.outbox import dispatch, publish_order_status
+from orders.services import (
+    TRANSITION_APPLIED, TRANSITION_REJECTED, cancel_order, confirm_payment, create_order, next_statuses,
+    submission_hash, transition_order, transition_orders,
+)
+from orders.settlement import (
+    annotate_settlement, close_settlement_period, settlement_figures, settlement_rows, settlement_summary,
+)
+from orders.synthetic import SCHEMA_TEMPLATES, generate_dataset
+from products.models import Category, PricePolicy, Product
 
 
 class OrderServiceTests(TestCase):
@@ -36,6 +76,53 @@ class OrderServiceTests(TestCase):
         self.assertEqual(order.item_count, 2)
         self.assertEqual(int(order.total_amount), 5500)
 
+    def test_items_are_stored_as_positional_cells(self):
+        order = create_order(
+            self.user, self.product,
+            [{'url': 'https://a.test', 'qty': '2', 'note': '메모'}, {'qty': '1', 'url': 'https://b.test'}],
+        )
+        self.assertEqual(order.item_fields, ['url', 'qty', 'note'])
+        first, second = order.items.order_by('row_number')
+        self.assertEqual(first.cells, ['https://a.test', '2', '메모'])
+        self.assertEqual(second.cells, ['https://b.test', '1'])
+        self.assertEqual(second.data, {'url': 'https://b.test', 'qty': '1'})
+        self.assertEqual(order.item_reader(['note', 'qty', 'missing'])(second.cells), ['', '1', ''])
+
+        second.data = {'url': 'https://c.test', 'note': 'x'}
+        self.assertEqual(second.cells, ['https://c.test', {}, 'x'])
+        # 한글은 이스케이프 없이, 구분자 공백 없이 저장
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT cells FROM orders_orderitem WHERE id = %s', [first.pk])
+            self.assertEqual(cursor.fetchone()[0], '["https://a.test","2","메모"]')
+
+    def test_item_cells_round_trip_none_and_missing_keys(self):
+        fields = ['url', 'qty', 'note', 'extra']
+        rows = [
+            {'url': 'https://a.test', 'qty': None, 'note': None},
+            {'qty': '1', 'extra': {'k': 1}},
+            {'url': None},
+            {},
+        ]
+        for row in rows:
+            self.assertEqual(unpack_item(fields, pack_item(fields, row)), row)
+        self.assertEqual(pack_item(fields, rows[0]), ['https://a.test', None, None])
+        self.assertEqual(pack_item(fields, rows[1]), [{}, '1', {}, {'v': {'k': 1}}])
+
+        order = create_order(self.user, self.product, [{'url': 'https://a.test', 'qty': '1', 'note': None}])
+        item = order.items.get()
+        self.assertEqual(item.data, {'url': 'https://a.test', 'qty': '1', 'note': None})
+        self.assertEqual(order.item_reader(['note', 'url'])(item.cells), ['', 'https://a.test'])
+
+    def test_item_data_setter_accepts_new_keys(self):
+        order = create_order(self.user, self.product, [{'url': 'https://a.test', 'qty': '1'}])
+        item = order.items.get()
+        item.data = {'url': 'https://b.test', 'qty': '2', 'memo': '추가'}
+        item.save()
+
+        item = OrderItem.objects.select_related('order').get(pk=item.pk)
+        self.assertEqual(item.order.item_fields, ['url', 'qty', 'memo'])
+        self.assertEqual(item.data, {'url': 'https://b.test', 'qty': '2', 'memo': '추가'})
+
     def test_create_order_rejects_non_positive_quantity(self):
         with self.assertRaisesMessage(ValueError, '1행 수량 값은 1 이상이어야 합니다.'):
             create_order(self.user, self.product, [{'url': 'https://a.test', 'qty': '0'}])
@@ -53,9 +140,1239 @@ class OrderServiceTests(TestCase):
                 )
 
 
+class OrderSubmitIdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seller1', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'), cost_price=Decimal('800'),
+            schema=[{'name': 'url', 'type': 'url', 'required': True}],
+        )
+        self.client.force_login(self.user)
+
+    def _submit(self, rows, key=None):
+        headers = {'Idempotency-Key': key} if key else {}
+        return self.client.post(
+            reverse('orders:api_order_submit'),
+            json.dumps({'product_id': self.product.pk, 'rows': rows}),
+            content_type='application/json', headers=headers,
+        )
+
+    def test_same_key_replays_stored_response_without_creating_order(self):
+        rows = [{'url': 'https://a.test'}, {'url': 'https://b.test'}]
+        first = self._submit(rows, key='k1')
+        self.assertEqual(first.status_code, 200)
+        with patch('orders.views.create_order') as create:
+            second = self._submit(rows, key='k1')
+        create.assert_not_called()
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_different_payload_is_rejected(self):
+        self._submit([{'url': 'https://a.test'}], key='k1')
+        response = self._submit([{'url': 'https://other.test'}], key='k1')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_without_key_or_after_ttl_orders_are_created_again(self):
+        rows = [{'url': 'https://a.test'}]
+        self._submit(rows)
+        self._submit(rows)
+        self.assertEqual(Order.objects.count(), 2)
+
+        self._submit(rows, key='k1')
+        OrderSubmission.objects.update(created_at=timezone.now() - timedelta(days=2))
+        response = self._submit(rows, key='k1')
+        self.assertNotIn('Idempotent-Replayed', response.headers)
+        self.assertEqual(Order.objects.count(), 4)
+        self.assertEqual(OrderSubmission.objects.count(), 1)
+
+    def _reserve(self, rows, key, age=timedelta(0)):
+        """다른 요청이 먼저 예약하고 아직 접수 중인 상태."""
+        submission = OrderSubmission.objects.create(
+            user=self.user, key=key, payload_hash=submission_hash(self.product.pk, rows, ''),
+        )
+        OrderSubmission.objects.filter(pk=submission.pk).update(created_at=timezone.now() - age)
+
+    def test_concurrent_duplicate_does_not_create_order(self):
+        rows = [{'url': 'https://a.test'}]
+        self._reserve(rows, 'k1')
+        with patch('orders.views.create_order') as create:
+            response = self._submit(rows, key='k1')
+        create.assert_not_called()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.headers['Retry-After'], '2')
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_abandoned_reservation_is_taken_over(self):
+        rows = [{'url': 'https://a.test'}]
+        self._reserve(rows, 'k1', age=timedelta(hours=1))
+        response = self._submit(rows, key='k1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OrderSubmission.objects.get().order.order_number, response.json()['order_number'])
+
+    def test_failed_submission_releases_key(self):
+        rows = [{'url': 'https://a.test'}]
+        with patch('orders.views.create_order', side_effect=ValueError('접수 실패')):
+            self.assertEqual(self._submit(rows, key='k1').status_code, 400)
+        self.assertFalse(OrderSubmission.objects.exists())
+        self.assertEqual(self._submit(rows, key='k1').status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+def failing_handler(payloads):
+    raise RuntimeError('연동 실패')
+
+
+def cancelled_failing_handler(payloads):
+    if any(payload['status'] == 'cancelled' for payload in payloads):
+        raise RuntimeError('취소 연동 실패')
+
+
+def unchecked_notify_handler(payloads):
+    """주문자 존재 여부를 확인하지 않는 핸들러 — 지연 외래키 위반을 만든다."""
+    Notification.objects.bulk_create([
+        Notification(user_id=payload['user_id'], message='알림', link='/orders/') for payload in payloads
+    ])
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.admin,
+        )
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'),
+            schema=[{'name': 'url', 'type': 'url', 'required': True}],
+        )
+        self.order = create_order(self.seller, self.product, [{'url': 'https://a.test'}])
+        self.client.force_login(self.admin)
+
+    def test_status_change_writes_event_and_dispatcher_notifies(self):
+        self.client.post(reverse('orders:order_status_update', args=[self.order.pk]), {'status': 'processing'})
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(
+            [(e.topic, e.payload['status'], e.payload['previous']) for e in OutboxEvent.objects.all()],
+            [('order.status_changed', 'processing', 'submitted')],
+        )
+
+        out = StringIO()
+        call_command('dispatch_outbox', stdout=out)
+        self.assertIn('1건 전달', out.getvalue())
+        self.assertFalse(OutboxEvent.objects.exists())
+        notification = Notification.objects.get()
+        self.assertEqual((notification.user, notification.message), (self.seller, f'주문 {self.order.order_number} 상태: 작업중'))
+        self.assertEqual(notification.link, f'/orders/{self.order.pk}/')
+
+    def test_rolled_back_change_leaves_no_event(self):
+        with transaction.atomic():
+            cancel_order(self.order, self.admin)
+            self.assertEqual(OutboxEvent.objects.count(), 1)
+            transaction.set_rollback(True)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failed_handler_is_retried_with_backoff(self):
+        cancel_order(self.order, self.admin)
+        handlers = {'order.status_changed': ['orders.outbox.notify_order_status', 'orders.tests.failing_handler']}
+        with override_settings(OUTBOX_HANDLERS=handlers), self.assertLogs('orders.outbox', 'ERROR'):
+            self.assertEqual(dispatch(), (0, 1))
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('연동 실패', event.last_error)
+        self.assertGreater(event.available_at, timezone.now())
+        # 같은 배치의 알림도 함께 롤백되고, 백오프 동안은 다시 꺼내지 않는다
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(dispatch(), (0, 0))
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(dispatch(), (1, 0))
+        self.assertEqual(Notification.objects.get().message, f'주문 {self.order.order_number} 상태: 취소')
+
+    def test_failed_event_does_not_hold_back_batch(self):
+        other = create_order(self.seller, self.product, [{'url': 'https://b.test'}])
+        cancel_order(self.order, self.admin)
+        confirm_payment(other, self.admin)
+        handlers = {'order.status_changed': ['orders.outbox.notify_order_status', 'orders.tests.cancelled_failing_handler']}
+        with override_settings(OUTBOX_HANDLERS=handlers), self.assertLogs('orders.outbox', 'ERROR'):
+            self.assertEqual(dispatch(), (1, 1))
+        # 실패한 취소 이벤트만 재시도 대상으로 남는다
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.payload['order_id'], event.attempts), (self.order.pk, 1))
+        self.assertEqual(Notification.objects.get().message, f'주문 {other.order_number} 상태: 작업중')
+
+    def test_deleted_recipient_is_skipped(self):
+        cancel_order(self.order, self.admin)
+        self.seller.delete()
+        self.assertEqual(dispatch(), (1, 0))
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+
+class OutboxCommitFailureTests(TransactionTestCase):
+    """배치 커밋 시점의 지연 외래키 위반 — 실제 커밋이 필요하므로 TransactionTestCase."""
+
+    @override_settings(OUTBOX_HANDLERS={'order.status_changed': ['orders.tests.unchecked_notify_handler']})
+    def test_commit_failure_only_retries_bad_event(self):
+        live = User.objects.create_user(username='seller1', password='pw', role=User.Role.SELLER)
+        gone = User.objects.create_user(username='seller2', password='pw', role=User.Role.SELLER)
+        gone_id = gone.pk
+        publish_order_status([(1, '1', gone_id, 'processing', 'submitted'), (2, '2', live.pk, 'processing', 'submitted')])
+        gone.delete()
+
+        with self.assertLogs('orders.outbox', 'ERROR'):
+            self.assertEqual(dispatch(), (1, 1))
+        self.assertEqual(list(Notification.objects.values_list('user_id', flat=True)), [live.pk])
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.payload['user_id'], event.attempts), (gone_id, 1))
+        # 백오프 중에는 다시 꺼내지 않고, 다음 실행도 막히지 않는다
+        self.assertEqual(dispatch(), (0, 0))
+
+
+class OrderTransitionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.admin,
+        )
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'),
+            schema=[{'name': 'url', 'type': 'url', 'required': True}],
+        )
+
+    def _orders(self, *statuses):
+        orders = [create_order(self.seller, self.product, [{'url': 'https://a.test'}]) for _ in statuses]
+        for order, status in zip(orders, statuses):
+            Order.objects.filter(pk=order.pk).update(status=status)
+        return orders
+
+    def test_transition_table(self):
+        self.assertEqual(next_statuses(Order.Status.SUBMITTED), [
+            Order.Status.PROCESSING, Order.Status.COMPLETED, Order.Status.CANCELLED,
+        ])
+        self.assertEqual(next_statuses(Order.Status.CANCELLED), [Order.Status.SUBMITTED])
+        completed, = self._orders(Order.Status.COMPLETED)
+        with self.assertRaisesMessage(ValueError, '완료 상태의 주문은 취소(으)로 변경할 수 없습니다.'):
+            cancel_order(completed, self.admin)
+        with self.assertRaisesMessage(ValueError, '이미 완료 상태인 주문입니다.'):
+            transition_order(completed, Order.Status.COMPLETED)
+        completed.refresh_from_db()
+        self.assertEqual(completed.status, Order.Status.COMPLETED)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_bulk_transition_reports_outcome_per_order(self):
+        orders = self._orders(
+            Order.Status.SUBMITTED, Order.Status.PROCESSING, Order.Status.COMPLETED, Order.Status.CANCELLED,
+        )
+        OrderItem.objects.filter(order=orders[1]).update(status=OrderItem.Status.COMPLETED)
+        with CaptureQueriesContext(connection) as ctx:
+            outcomes = transition_orders(
+                Order.objects.filter(pk__in=[o.pk for o in orders]), Order.Status.PROCESSING, by=self.admin,
+            )
+        self.assertEqual(outcomes, {
+            orders[0].pk: (TRANSITION_APPLIED, Order.Status.SUBMITTED),
+            orders[1].pk: (TRANSITION_REJECTED, Order.Status.PROCESSING),
+            orders[2].pk: (TRANSITION_APPLIED, Order.Status.COMPLETED),
+            orders[3].pk: (TRANSITION_REJECTED, Order.Status.CANCELLED),
+        })
+        # 잠금 조회, 조건부 UPDATE, 항목 동기화, 이벤트 INSERT (+ 트랜잭션)
+        self.assertLessEqual(len(ctx.captured_queries), 6)
+        self.assertEqual(
+            dict(Order.objects.values_list('pk', 'status')),
+            {orders[0].pk: 'processing', orders[1].pk: 'processing', orders[2].pk: 'processing', orders[3].pk: 'cancelled'},
+        )
+        self.assertEqual(OrderItem.objects.get(order=orders[0]).status, OrderItem.Status.PROCESSING)
+        self.assertEqual(OrderItem.objects.get(order=orders[1]).status, OrderItem.Status.COMPLETED)
+        # 일반 상태 변경은 입금확인 정보를 건드리지 않는다
+        self.assertFalse(Order.objects.filter(confirmed_at__isnull=False).exists())
+        self.assertEqual(
+            sorted(e.payload['order_id'] for e in OutboxEvent.objects.all()), sorted([orders[0].pk, orders[2].pk]),
+        )
+
+    def test_confirm_payment_records_confirmation(self):
+        order, = self._orders(Order.Status.SUBMITTED)
+        confirm_payment(order, self.admin)
+        self.assertEqual((order.status, order.confirmed_by), (Order.Status.PROCESSING, self.admin))
+        self.assertIsNotNone(order.confirmed_at)
+        self.assertEqual(order.items.get().status, OrderItem.Status.PROCESSING)
+        with self.assertRaisesMessage(ValueError, '접수완료 상태의 주문만 입금확인 처리할 수 있습니다.'):
+            confirm_payment(order, self.admin)
+
+    def test_bulk_view_reports_skipped_orders(self):
+        orders = self._orders(Order.Status.SUBMITTED, Order.Status.CANCELLED)
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('orders:order_bulk_status_update'), {
+            'order_ids': [o.pk for o in orders], 'status': Order.Status.COMPLETED,
+        }, follow=True)
+        self.assertEqual(
+            [str(m) for m in response.context['messages']],
+            ['1건의 주문이 완료(으)로 변경되었습니다.', '1건은 현재 상태에서 완료(으)로 변경할 수 없어 제외되었습니다.'],
+        )
+
+
+class OrderItemsApiTests(TestCase):
+    def setUp(self):
+        self.agency = User.objects.create_user(username='agency1', password='pw', role=User.Role.AGENCY)
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.agency,
+        )
+        self.other = User.objects.create_user(username='seller2', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='테스트 상품',
+            base_price=Decimal('1000'),
+            cost_price=Decimal('800'),
+            schema=[
+                {'name': 'url', 'type': 'url', 'required': True},
+                {'name': 'qty', 'type': 'number', 'required': True, 'is_quantity': True},
+            ],
+            max_work_days=3,
+        )
+        self.order = create_order(
+            self.seller, self.product, [{'url': f'https://{i}.test', 'qty': '1'} for i in range(5)],
+        )
+
+    def _get(self, **params):
+        return self.client.get(reverse('orders:api_order_items', args=[self.order.pk]), params)
+
+    def test_detail_page_does_not_load_items(self):
+        self.client.force_login(self.seller)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('orders:order_detail', args=[self.order.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if 'orders_orderitem' in q['sql']])
+        self.assertNotContains(response, 'https://0.test')
+
+    def test_pages_follow_row_number(self):
+        self.client.force_login(self.agency)
+        first = self._get(limit=2).json()
+        self.assertEqual([r[0] for r in first['rows']], [1, 2])
+        self.assertEqual(first['rows'][0][1], ['https://0.test', '1'])
+        self.assertEqual(len(first['rows'][0]), 4)
+        rest = self._get(after=first['next'], limit=10).json()
+        self.assertEqual([r[0] for r in rest['rows']], [3, 4, 5])
+        self.assertIsNone(rest['next'])
+
+    def test_seller_rows_omit_price_and_scope_is_enforced(self):
+        self.client.force_login(self.seller)
+        rows = self._get().json()['rows']
+        self.assertEqual(len(rows[0]), 3)
+        self.client.force_login(self.other)
+        self.assertEqual(self._get().status_code, 403)
+
+    def test_items_render_with_schema_snapshot_from_submission(self):
+        second = create_order(self.seller, self.product, [{'url': 'https://x.test', 'qty': '1'}])
+        self.assertEqual(second.schema_snapshot_id, self.order.schema_snapshot_id)
+        self.assertEqual(OrderSchema.objects.count(), 1)
+
+        # 상품 스키마를 바꿔도 기존 주문은 접수 당시 열 그대로
+        self.product.schema = [{'name': 'qty', 'label': '새 수량', 'type': 'number', 'is_quantity': True}]
+        self.product.save()
+        self.client.force_login(self.agency)
+        with CaptureQueriesContext(connection) as ctx:
+            rows = self._get().json()['rows']
+        self.assertEqual(rows[0][1], ['https://0.test', '1'])
+        self.assertFalse([q for q in ctx.captured_queries if 'products_product' in q['sql']])
+
+        response = self.client.get(reverse('orders:order_detail', args=[self.order.pk]))
+        self.assertEqual(response.context['columns'], ['url', 'qty'])
+        workbook = openpyxl.load_workbook(
+            BytesIO(self.client.get(reverse('orders:order_items_export', args=[self.order.pk])).content),
+        )
+        sheet = workbook.active
+        self.assertEqual([c.value for c in sheet[1]], ['url', 'qty'])
+        self.assertEqual(sheet.column_dimensions['A'].width, 30)
+
+        third = create_order(self.seller, self.product, [{'qty': '2'}])
+        self.assertNotEqual(third.schema_snapshot_id, self.order.schema_snapshot_id)
+        self.assertEqual(third.columns[0]['label'], '새 수량')
+
+
+def _legacy_settlement_figures(total, total_qty, rate):
+    supply = int(round(Decimal(total) / Decimal('1.1')))
+    reduced_qty = int(total_qty * rate / 100)
+    per_unit = Decimal(supply) / Decimal(total_qty) if total_qty > 0 else Decimal('0')
+    return supply, total - supply, reduced_qty, int(Decimal(reduced_qty) * per_unit)
+
+
+class SettlementComputationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.admin,
+        )
+        self.other = User.objects.create_user(
+            username='seller2', password='pw', role=User.Role.SELLER, parent=self.admin,
+        )
+        self.product = Product.objects.create(name='감은 상품', base_price=Decimal('120'), reduction_rate=30)
+        PricePolicy.objects.create(product=self.product, user=self.other, price=Decimal('100'), reduction_rate=45)
+        cases = [
+            (self.seller, 132000, 1000),
+            (self.seller, 1, 0),
+            (self.seller, 7, 3),
+            (self.other, 110, 1),
+            (self.other, 366663, 3333),
+        ]
+        for idx, (user, total, qty) in enumerate(cases, start=1):
+            Order.objects.create(
+                order_number=str(idx), user=user, product=self.product,
+                total_amount=Decimal(total), total_quantity=qty, status=Order.Status.COMPLETED,
+                confirmed_at=timezone.now(),
+            )
+
+    def test_annotations_match_python_rounding(self):
+        for order in annotate_settlement(Order.objects.all()):
+            rate = 45 if order.user_id == self.other.id else 30
+            figures = settlement_figures(order.total_amount, order.total_quantity, rate)
+            self.assertEqual(order.reduction_rate, rate)
+            for key, value in figures.items():
+                self.assertEqual(getattr(order, key), value, (order.order_number, key))
+            self.assertEqual(
+                (order.supply, order.vat, order.reduced_qty, order.reduced_profit),
+                _legacy_settlement_figures(int(order.total_amount), order.total_quantity, rate),
+            )
+
+    def test_rounding_matches_legacy_decimal_over_grid(self):
+        """단가 28자리 반올림 때문에 정확히 나눠떨어지는 경우 버림 결과가 1 작아지는 것까지 재현한다."""
+        Order.objects.all().delete()
+        products = {
+            rate: Product.objects.create(name=f'감은 {rate}', base_price=Decimal('100'), reduction_rate=rate)
+            for rate in (0, 25, 33, 50, 100)
+        }
+        rng = random.Random(26)
+        cases = [
+            (total, qty, rate)
+            for total in (1, 7, 1100, 132000) for qty in range(1, 101) for rate in products
+        ] + [
+            (rng.randrange(10 ** 12), rng.randrange(1, 2 ** 31), rng.choice(list(products))) for _ in range(500)
+        ]
+        Order.objects.bulk_create([
+            Order(
+                order_number=str(idx), user=self.seller, product=products[rate],
+                total_amount=Decimal(total), total_quantity=qty, status=Order.Status.COMPLETED,
+            )
+            for idx, (total, qty, rate) in enumerate(cases)
+        ])
+        rows = annotate_settlement(Order.objects.all()).values_list(
+            'total_amount', 'total_qty', 'reduction_rate', 'supply', 'vat', 'reduced_qty', 'reduced_profit',
+        )
+        diverging = 0
+        for total, qty, rate, *figures in rows:
+            legacy = _legacy_settlement_figures(int(total), qty, rate)
+            python = settlement_figures(total, qty, rate)
+            self.assertEqual(tuple(figures), legacy, (total, qty, rate))
+            self.assertEqual((python['supply'], python['vat'], python['reduced_qty'], python['reduced_profit']), legacy)
+            diverging += legacy[3] != legacy[2] * legacy[0] // qty
+        # 공급가 1000, 총타수 88, 25% → 감은 타수 22, 정확한 값 250 이지만 기존 코드는 249
+        self.assertEqual(settlement_figures(1100, 88, 25)['reduced_profit'], 249)
+        self.assertGreater(diverging, 0)
+
+    def test_summary_is_single_aggregate(self):
+        orders = annotate_settlement(Order.objects.all())
+        with self.assertNumQueries(1):
+            summary = settlement_summary(orders)
+        rows = list(orders)
+        self.assertEqual(summary['total_count'], 5)
+        self.assertEqual(summary['total_amount'], sum(int(o.total_amount) for o in rows))
+        self.assertEqual(summary['total_supply'], sum(o.supply for o in rows))
+        self.assertEqual(summary['total_vat'], sum(o.vat for o in rows))
+        self.assertEqual(summary['total_reduced_qty'], sum(o.reduced_qty for o in rows))
+        self.assertEqual(summary['total_reduced_profit'], sum(o.reduced_profit for o in rows))
+
+    def test_settlement_secret_renders_page_and_excel(self):
+        self.client.login(username='admin1', password='pw')
+        with patch('orders.views.SETTLEMENT_SECRET_PASSWORD', 'secret'):
+            response = self.client.post(
+                reverse('orders:settlement_secret') + '?period=all', {'password': 'secret'},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['summary'], settlement_summary(annotate_settlement(Order.objects.all())))
+            self.assertEqual(len(response.context['orders']), 5)
+            response = self.client.get(reverse('orders:settlement_secret') + '?period=all&export=excel')
+            self.assertEqual(response.status_code, 200)
+
+
+class SettlementSnapshotTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.admin,
+        )
+        self.product = Product.objects.create(name='감은 상품', base_price=Decimal('100'), reduction_rate=30)
+        this_month = timezone.localdate().replace(day=1)
+        self.last_month = this_month - timedelta(days=1)
+        self.old_order = Order.objects.create(
+            order_number='1', user=self.seller, product=self.product, status=Order.Status.COMPLETED,
+            total_amount=Decimal('11000'), total_quantity=100,
+            confirmed_at=timezone.now() - timedelta(days=70),
+        )
+        self.new_order = Order.objects.create(
+            order_number='2', user=self.seller, product=self.product, status=Order.Status.PROCESSING,
+            total_amount=Decimal('5500'), total_quantity=50, confirmed_at=timezone.now(),
+        )
+
+    def test_closed_periods_read_frozen_snapshot(self):
+        periods = close_settlement_period(self.last_month, closed_by=self.admin)
+        self.assertEqual(periods[-1].month, self.last_month.replace(day=1))
+        self.assertEqual(sum(p.snapshots.count() for p in periods), 1)
+
+        Product.objects.filter(pk=self.product.pk).update(reduction_rate=50)
+        Order.objects.filter(pk=self.old_order.pk).update(status=Order.Status.CANCELLED)
+
+        rows = settlement_rows(self.admin.get_all_order_user_ids(), period='all')
+        self.assertEqual(rows.count(), 2)
+        new_row, old_row = rows[0:2]
+        self.assertEqual(new_row.pk, self.new_order.pk)
+        self.assertEqual(new_row.reduction_rate, 50)
+        self.assertEqual(old_row.order_id, self.old_order.pk)
+        self.assertEqual(old_row.reduction_rate, 30)
+        self.assertEqual(old_row.reduced_profit, 3000)
+        self.assertEqual(rows.summary()['total_count'], 2)
+        self.assertEqual(rows.summary()['total_reduced_profit'], 3000 + 2500)
+
+        current = settlement_rows(self.admin.get_all_order_user_ids(), period='month')
+        self.assertEqual([o.pk for o in current[0:20]], [self.new_order.pk])
+
+    def test_racing_close_reports_already_closed(self):
+        close_settlement_period(self.last_month, closed_by=self.admin)
+        closed = SettlementPeriod.objects.count()
+        # 두 번째 마감이 첫 마감 커밋 전에 마지막 마감월을 읽은 경우
+        with patch('orders.settlement.get_closed_month', return_value=None):
+            with self.assertRaisesMessage(ValueError, '이미 마감되었습니다.'):
+                close_settlement_period(self.last_month, closed_by=self.admin)
+        self.assertEqual(SettlementPeriod.objects.count(), closed)
+
+        self.client.login(username='admin1', password='pw')
+        with patch('orders.settlement.get_closed_month', return_value=None):
+            response = self.client.post(reverse('orders:settlement_close'))
+        self.assertRedirects(response, reverse('orders:settlement_list'))
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL advisory lock')
+    def test_close_takes_advisory_lock(self):
+        with CaptureQueriesContext(connection) as ctx:
+            close_settlement_period(self.last_month)
+        sql = [q['sql'] for q in ctx.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if 'pg_advisory_xact_lock' in q)
+        self.assertLess(lock, next(i for i, q in enumerate(sql) if 'orders_settlementperiod' in q))
+
+    def test_unconfirmed_orders_stay_live_after_close(self):
+        """상태 변경만으로 작업중이 된(입금확인 시각 없는) 주문은 스냅샷에 없으므로 실시간 목록에 남는다."""
+        unconfirmed = Order.objects.create(
+            order_number='3', user=self.seller, product=self.product, status=Order.Status.PROCESSING,
+            total_amount=Decimal('1100'), total_quantity=10,
+        )
+        close_settlement_period(self.last_month)
+        rows = settlement_rows(self.admin.get_all_order_user_ids(), period='all')
+        self.assertEqual(rows.count(), 3)
+        self.assertIn(unconfirmed.pk, [row.pk for row in rows[0:20]])
+
+        self.client.login(username='admin1', password='pw')
+        with patch('orders.views.SETTLEMENT_SECRET_PASSWORD', 'secret'):
+            self.client.post(reverse('orders:settlement_secret') + '?period=all', {'password': 'secret'})
+            response = self.client.get(reverse('orders:settlement_secret') + '?period=all&export=excel')
+        self.assertEqual(openpyxl.load_workbook(BytesIO(response.content)).active.max_row, 3 + 2)
+
+    def test_close_rejects_open_and_closed_months(self):
+        with self.assertRaises(ValueError):
+            close_settlement_period(timezone.localdate())
+        close_settlement_period(self.last_month)
+        with self.assertRaises(ValueError):
+            close_settlement_period(self.last_month)
+
+    def test_command_and_button_close_last_month(self):
+        call_command('close_settlement_period', stdout=StringIO())
+        self.assertEqual(SettlementPeriod.objects.order_by('-month').first().month, self.last_month.replace(day=1))
+
+        self.client.login(username='admin1', password='pw')
+        response = self.client.post(reverse('orders:settlement_close'))
+        self.assertRedirects(response, reverse('orders:settlement_list'))
+        response = self.client.get(reverse('orders:settlement_list') + '?period=all')
+        self.assertEqual(response.context['summary']['total_count'], 2)
+
+
 class SettlementSecretTests(TestCase):
     def test_settlement_secret_is_blocked_when_password_not_configured(self):
         admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
         self.client.login(username='admin1', password='pw')
         response = self.client.get(reverse('orders:settlement_secret'))
         self.assertRedirects(response, reverse('orders:settlement_list'))
+
+
+class OrderArchiveTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.agency = User.objects.create_user(
+            username='agency1', password='pw', role=User.Role.AGENCY, parent=self.admin,
+        )
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.agency,
+        )
+        self.other = User.objects.create_user(username='seller2', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'),
+            schema=[
+                {'name': 'url', 'type': 'url', 'required': True},
+                {'name': 'qty', 'type': 'number', 'required': True, 'is_quantity': True},
+            ],
+        )
+        old = timezone.now() - timedelta(days=400)
+        self.old = self._order(Order.Status.COMPLETED, old, confirmed_at=old)
+        self.old_cancelled = self._order(Order.Status.CANCELLED, old)
+        self.old_processing = self._order(Order.Status.PROCESSING, old, confirmed_at=old)
+        self.recent = self._order(Order.Status.COMPLETED, timezone.now(), confirmed_at=timezone.now())
+
+    def _order(self, status, created_at, confirmed_at=None):
+        order = create_order(
+            self.seller, self.product, [{'url': f'https://{i}.test', 'qty': '2'} for i in range(3)],
+        )
+        Order.objects.filter(pk=order.pk).update(status=status, created_at=created_at, confirmed_at=confirmed_at)
+        return order
+
+    def _dashboard(self):
+        self.client.force_login(self.admin)
+        start = timezone.localdate() - timedelta(days=500)
+        response = self.client.get(reverse('dashboard:index'), {
+            'date_from': start.isoformat(), 'date_to': timezone.localdate().isoformat(),
+        })
+        keys = ['period_orders', 'period_amount', 'period_items', 'status_completed', 'total_items']
+        return {key: response.context[key] for key in keys}
+
+    def test_archive_moves_settled_orders_and_keeps_dashboard_totals(self):
+        # 입금확인 월이 정산 마감되기 전에는 미입금(취소) 주문만 옮긴다
+        self.assertEqual(archive_orders(12), (1, 3))
+        self.assertFalse(Order.objects.filter(pk=self.old_cancelled.pk).exists())
+
+        close_settlement_period(timezone.localdate().replace(day=1) - timedelta(days=1))
+        before = self._dashboard()
+        self.assertEqual(archive_orders(12, dry_run=True), (1, 3))
+        self.assertEqual(archive_orders(12, batch_size=1), (1, 3))
+
+        self.assertEqual(
+            set(Order.objects.values_list('pk', flat=True)), {self.old_processing.pk, self.recent.pk},
+        )
+        self.assertFalse(OrderItem.objects.filter(order_id=self.old.pk).exists())
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+        self.assertEqual(OrderArchiveRollup.objects.count(), 2)
+        self.assertEqual(self._dashboard(), before)
+        self.assertEqual(before['status_completed'], 2)
+        self.assertEqual(before['total_items'], 18)
+        # 정산은 마감 스냅샷으로 계속 계산된다
+        rows = settlement_rows(self.admin.get_all_order_user_ids(), period='all')
+        self.assertEqual(rows.summary()['total_count'], 3)
+
+    def test_archive_keeps_ledger_and_snapshot_links(self):
+        tx = BalanceTransaction.objects.create(
+            user=self.seller, tx_type=BalanceTransaction.TxType.WITHDRAW, amount=Decimal('3300'),
+            balance_after=Decimal('0'), order=self.old,
+        )
+        close_settlement_period(timezone.localdate().replace(day=1) - timedelta(days=1))
+        snapshot = SettlementSnapshot.objects.get(order=self.old)
+        archive_orders(12)
+
+        archived = ArchivedOrder.objects.get(pk=self.old.pk)
+        tx.refresh_from_db()
+        snapshot.refresh_from_db()
+        self.assertIsNone(tx.order_id)
+        self.assertEqual(tx.archived_order, archived)
+        self.assertEqual(snapshot.archived_order, archived)
+        self.assertEqual(list(archived.transactions.all()), [tx])
+        self.assertEqual(list(archived.settlement_snapshots.all()), [snapshot])
+
+    def test_archived_order_reads_through(self):
+        close_settlement_period(timezone.localdate().replace(day=1) - timedelta(days=1))
+        archive_orders(12)
+        archived = ArchivedOrder.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.item_values('row_number', 'status'), [(1, 'pending'), (2, 'pending'), (3, 'pending')])
+
+        self.client.force_login(self.agency)
+        response = self.client.get(reverse('orders:order_detail', args=[self.old.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['order'].archive, archived)
+        self.assertNotContains(response, reverse('orders:order_status_update', args=[self.old.pk]))
+
+        data = self.client.get(reverse('orders:api_order_items', args=[self.old.pk]), {'after': 1, 'limit': 1}).json()
+        self.assertEqual(data['rows'], [[2, ['https://1.test', '2'], 'pending', 1000]])
+        self.assertEqual(data['next'], 2)
+
+        response = self.client.get(reverse('orders:order_items_export', args=[self.old.pk]))
+        ws = openpyxl.load_workbook(BytesIO(response.content)).active
+        self.assertEqual([row[0] for row in ws.iter_rows(min_row=2, values_only=True)], [
+            'https://0.test', 'https://1.test', 'https://2.test',
+        ])
+
+        renew = self.client.get(reverse('orders:api_order_renew_data', args=[self.old.pk])).json()
+        self.assertEqual(renew['rows'][0], {'url': 'https://0.test', 'qty': '2'})
+
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('orders:order_detail', args=[self.old.pk]))
+        self.assertRedirects(response, reverse('orders:order_list'), fetch_redirect_response=False)
+        response = self.client.get(reverse('orders:api_order_items', args=[self.old.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+@skipUnless(analytics.pa, 'pyarrow is not installed')
+class AnalyticsStoreTests(TestCase):
+    def setUp(self):
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(ANALYTICS_ROOT=Path(tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin = User.objects.create_user(username='admin1', password='pw', role=User.Role.ADMIN)
+        self.agency = User.objects.create_user(
+            username='agency1', password='pw', role=User.Role.AGENCY, parent=self.admin, company_name='대행사A',
+        )
+        self.seller = User.objects.create_user(
+            username='seller1', password='pw', role=User.Role.SELLER, parent=self.agency,
+        )
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'),
+            schema=[{'name': 'qty', 'type': 'number', 'required': True, 'is_quantity': True}],
+        )
+        create_order(self.seller, self.product, [{'qty': '2'}, {'qty': '3'}])
+        create_order(self.agency, self.product, [{'qty': '4'}])
+        cancelled = create_order(self.seller, self.product, [{'qty': '9'}])
+        Order.objects.filter(pk=cancelled.pk).update(status=Order.Status.CANCELLED)
+
+    def test_export_and_query_totals(self):
+        month = timezone.localdate().replace(day=1)
+        self.assertEqual(analytics.export_month(month), (3, 4))
+
+        with self.assertNumQueries(0):
+            by_agency = analytics.query_order_totals(group_by='agency')
+        self.assertEqual(len(by_agency), 1)
+        self.assertEqual(by_agency[0]['agency_name'], '대행사A')
+        self.assertEqual(by_agency[0]['order_count'], 2)
+        self.assertEqual(by_agency[0]['total_quantity'], 9)
+        self.assertEqual(by_agency[0]['total_amount'], 9900)
+
+        by_month = analytics.query_order_totals(group_by='month', month_from=f'{month:%Y-%m}')
+        self.assertEqual(by_month[0]['month'], f'{month:%Y-%m}')
+        self.assertEqual(analytics.query_order_totals(user_ids=[self.admin.id]), [])
+
+    def test_command_and_report_page(self):
+        call_command('export_order_analytics', stdout=StringIO())
+        self.client.login(username='admin1', password='pw')
+        response = self.client.get(reverse('orders:analytics_report') + '?group_by=product')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['totals']['order_count'], 2)
+        self.assertEqual(response.context['rows'][0]['product_name'], '테스트 상품')
+
+
+class DeadlineSweepTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller1', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='리워드', base_price=Decimal('1000'), cost_price=Decimal('800'), schema=[], max_work_days=3,
+        )
+        self.today = date(2026, 3, 10)
+
+    def _order(self, number, days_left, status=Order.Status.SUBMITTED):
+        return Order.objects.create(
+            order_number=number, user=self.seller, product=self.product, status=status,
+            deadline=self.today + timedelta(days=days_left),
+        )
+
+    def _messages(self):
+        return sorted(Notification.objects.values_list('message', flat=True))
+
+    def test_first_run_notifies_only_todays_crossings(self):
+        self._order('D7', 7)
+        self._order('D3', 3)
+        self._order('D0', 0)
+        self._order('D5', 5)
+        self._order('X3', 3, status=Order.Status.CANCELLED)
+        self.assertEqual(sweep_deadlines(self.today), 3)
+        self.assertEqual(self._messages(), ['주문 D0 마감일입니다 (D-Day)', '주문 D3 마감 D-3', '주문 D7 마감 D-7'])
+        # 같은 날 재실행은 중복 알림 없음
+        self.assertEqual(sweep_deadlines(self.today), 0)
+
+    def test_incremental_runs_use_watermark(self):
+        order = self._order('A', 8)
+        sweep_deadlines(self.today)
+        self.assertEqual(Notification.objects.count(), 0)
+
+        sweep_deadlines(self.today + timedelta(days=1))
+        self.assertEqual(self._messages(), ['주문 A 마감 D-7'])
+
+        # 공백 후 실행: D-3 과 D-0 을 모두 넘었으면 가장 임박한 기준만 알림
+        call_command('sweep_deadlines', date=str(order.deadline), stdout=StringIO())
+        self.assertEqual(self._messages(), ['주문 A 마감 D-7', '주문 A 마감일입니다 (D-Day)'])
+        self.assertEqual(DeadlineSweep.objects.first().swept_through, order.deadline)
+
+    def test_stale_watermark_run_rolls_back(self):
+        """잠금 없이 같은 기준일을 읽은 두 번째 실행 — 고유 제약으로 알림까지 롤백된다."""
+        self._order('D3', 3)
+        self.assertEqual(sweep_deadlines(self.today), 1)
+        with patch('orders.deadlines._last_swept', return_value=None), self.assertRaises(IntegrityError):
+            sweep_deadlines(self.today)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_sweep_locks_before_reading_watermark(self):
+        if connection.vendor == 'sqlite':
+            # BEGIN IMMEDIATE 가 쓰기 잠금을 먼저 잡는다
+            self.assertEqual(connection.settings_dict['OPTIONS'].get('transaction_mode'), 'IMMEDIATE')
+            return
+        with CaptureQueriesContext(connection) as ctx:
+            sweep_deadlines(self.today)
+        sql = [q['sql'] for q in ctx.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if 'pg_advisory_xact_lock' in q)
+        self.assertLess(lock, next(i for i, q in enumerate(sql) if 'orders_deadlinesweep' in q))
+
+
+class SyntheticDataTests(TestCase):
+    def test_generate_dataset_builds_hierarchy_and_orders(self):
+        counts = generate_dataset(
+            managers=1, agencies=2, sellers=3, products=4, orders=50, max_items=5, notifications=1, seed=1,
+        )
+        self.assertEqual((counts['agencies'], counts['sellers'], counts['orders']), (2, 6, 50))
+        sellers = User.objects.filter(role=User.Role.SELLER, username__startswith='syn-')
+        self.assertFalse(sellers.exclude(parent__role=User.Role.AGENCY).exists())
+        orders = Order.objects.filter(order_number__startswith='syn-')
+        self.assertEqual(OrderItem.objects.filter(order__in=orders).count(), counts['order_items'])
+        # 생성일은 과거로 분산되고, 항목 수/수량 합계가 주문과 일치
+        self.assertLess(orders.order_by('created_at').first().created_at, timezone.now() - timedelta(days=1))
+        order = orders.first()
+        self.assertEqual(order.items.count(), order.item_count)
+
+        # 재실행해도 아이디/주문번호가 겹치지 않는다
+        generate_dataset(managers=1, agencies=1, sellers=1, products=1, orders=5, notifications=0, seed=1)
+        self.assertEqual(Order.objects.filter(order_number__startswith='syn-').count(), 55)
+
+    def test_benchmark_command_writes_json(self):
+        generate_dataset(managers=1, agencies=1, sellers=2, products=2, orders=20, max_items=3, notifications=1)
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'result.json'
+            call_command(
+                'run_benchmarks', repeat=1, warmup=0, only=['orders.list', 'services.settlement'],
+                output=str(path), stdout=StringIO(),
+            )
+            result = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual(result['dataset']['orders'], 20)
+        self.assertIn('orders.list.admin', result['results'])
+        self.assertNotIn('dashboard.index.admin', result['results'])
+        self.assertGreater(result['results']['orders.list.admin']['queries'], 0)
+        self.assertEqual(compare_results(result, result)[0][3], 0.0)
+
+
+class LoadTestPayloadTests(TestCase):
+    """loadtest 가 만드는 접수 행/엑셀 파일이 실제 뷰를 통과하는지."""
+
+    def setUp(self):
+        generate_dataset(managers=1, agencies=1, sellers=1, products=len(SCHEMA_TEMPLATES), orders=0, notifications=0)
+        self.seller = User.objects.get(role=User.Role.SELLER, username__startswith='syn-')
+        self.client.force_login(self.seller)
+
+    def test_generated_rows_are_accepted_by_submit(self):
+        for product in Product.objects.filter(name__startswith='syn-'):
+            rows = order_rows(product.schema, 3, random.Random(0))
+            response = self.client.post(
+                reverse('orders:api_order_submit'),
+                json.dumps({'product_id': product.pk, 'rows': rows}), content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(response.json()['item_count'], 3)
+
+    def test_generated_workbook_is_parsed_by_excel_upload(self):
+        for product in Product.objects.filter(name__startswith='syn-'):
+            upload = SimpleUploadedFile(
+                'orders.xlsx', upload_workbook(product.schema, 4), content_type=XLSX_CONTENT_TYPE,
+            )
+            response = self.client.post(reverse('orders:api_excel_upload'), {'product_id': product.pk, 'file': upload})
+            self.assertEqual(response.json()['count'], 4, response.content)
+            rows = response.json()['rows']
+            self.assertEqual(set(rows[0]), {f['name'] for f in product.schema})
+
+
+@override_settings(REPLICA_DATABASE_ALIAS='replica')
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.routed = []
+
+        @read_from_replica
+        def view(request):
+            self.routed.append(router.db_for_read(Order))
+            return HttpResponse()
+        self.view = view
+
+    def test_get_reads_from_replica_and_writes_stay_on_primary(self):
+        self.view(self.factory.get('/'))
+        self.view(self.factory.post('/'))
+        self.assertEqual(self.routed, ['replica', 'default'])
+        self.assertEqual(router.db_for_read(Order), 'default')
+        self.assertEqual(router.db_for_write(Order), 'default')
+
+    def test_recent_write_pins_reads_to_primary(self):
+        middleware = ReadYourWritesMiddleware(lambda request: HttpResponse())
+        response = middleware(self.factory.post('/'))
+        cookie = response.cookies[READ_YOUR_WRITES_COOKIE].value
+
+        request = self.factory.get('/')
+        request.COOKIES[READ_YOUR_WRITES_COOKIE] = cookie
+        self.view(request)
+        request.COOKIES[READ_YOUR_WRITES_COOKIE] = str(int(time.time()) - 1)
+        self.view(request)
+        self.assertEqual(self.routed, ['default', 'replica'])
+
+    def test_middleware_stays_async_for_async_views(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = ReadYourWritesMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(self.factory.post('/'))
+        self.assertIn(READ_YOUR_WRITES_COOKIE, response.cookies)
+
+
+@skipUnless(settings.REPLICA_DATABASE_ALIAS, 'set SQLITE_REPLICA_PATH or DB_REPLICA_HOST to test a replica alias')
+class ReplicaAliasTests(TransactionTestCase):
+    """replica alias 통합 테스트 — 다른 TestCase 는 replica 를 허용하지 않으므로 단독 실행:
+
+    SQLITE_REPLICA_PATH=/tmp/replica.sqlite3 python manage.py test orders.tests.ReplicaAliasTests
+    """
+    databases = '__all__'
+
+    def test_export_queries_run_on_replica(self):
+        user = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.client.force_login(user)
+        with CaptureQueriesContext(connections[settings.REPLICA_DATABASE_ALIAS]) as ctx:
+            response = self.client.get(reverse('orders:order_export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue([q for q in ctx.captured_queries if 'orders_order' in q['sql']])
+
+
+QUERY_COUNT_NAMESPACES = ('orders', 'dashboard', 'products', 'accounts')
+# bulk_create/bulk_update 는 DB 파라미터 한도(SQLite 999개)만큼 나눠 실행되므로 배치 수만큼의 증가는 허용
+BULK_WRITE_QUERY_ALLOWANCE = 10
+
+
+class PartitioningTests(TestCase):
+    def test_month_partition_names_and_bounds(self):
+        self.assertEqual(partition_name('orders_orderitem', date(2026, 1, 1)), 'orders_orderitem_p202601')
+        self.assertEqual(shift_month(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(shift_month(date(2025, 11, 1), 3), date(2026, 2, 1))
+        bound = month_bound(date(2026, 3, 1))
+        self.assertEqual((bound.year, bound.month, bound.day, bound.hour), (2026, 3, 1, 0))
+        self.assertEqual(bound.utcoffset(), timedelta(hours=9))
+
+    @skipUnless(not partitioning_enabled(connection), 'partitioning is enabled')
+    def test_maintenance_is_noop_without_partitioning(self):
+        out = StringIO()
+        call_command('maintain_partitions', '--retain-months', '1', '--drop', stdout=out)
+        self.assertIn('꺼져 있습니다', out.getvalue())
+
+
+@skipUnless(partitioning_enabled(connection), 'PostgreSQL with DB_PARTITIONING=1 required')
+class PostgresPartitionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seller1', password='pw', role=User.Role.SELLER)
+        self.product = Product.objects.create(
+            name='테스트 상품', base_price=Decimal('1000'),
+            schema=[{'name': 'url', 'type': 'url', 'required': True}],
+        )
+        self.this_month = timezone.localdate().replace(day=1)
+        self.last_month = shift_month(self.this_month, -1)
+        create_partitions(connection, 'orders_orderitem', self.last_month, self.last_month)
+        create_partitions(connection, 'dashboard_notification', self.last_month, self.last_month)
+
+    def _plan(self, queryset):
+        return queryset.filter(
+            created_at__gte=month_bound(self.this_month),
+            created_at__lt=month_bound(shift_month(self.this_month, 1)),
+        ).explain()
+
+    def test_created_at_range_reads_only_that_month(self):
+        order = create_order(self.user, self.product, [{'url': f'https://{i}.test'} for i in range(4)])
+        OrderItem.objects.filter(order=order, row_number__lte=2).update(created_at=month_bound(self.last_month))
+        Notification.objects.create(user=self.user, message='이번 달')
+        Notification.objects.filter(
+            pk=Notification.objects.create(user=self.user, message='지난달').pk,
+        ).update(created_at=month_bound(self.last_month))
+
+        for table, queryset in (('orders_orderitem', OrderItem.objects.all()),
+                                ('dashboard_notification', Notification.objects.all())):
+            plan = self._plan(queryset)
+            self.assertIn(partition_name(table, self.this_month), plan)
+            self.assertNotIn(partition_name(table, self.last_month), plan)
+            self.assertNotIn(f'{table}_default', plan)
+        self.assertEqual(OrderItem.objects.filter(created_at__lt=month_bound(self.this_month)).count(), 2)
+
+    def test_maintenance_adds_future_months_and_detaches_old_ones(self):
+        order = create_order(self.user, self.product, [{'url': 'https://a.test'}])
+        OrderItem.objects.filter(order=order).update(created_at=month_bound(self.last_month))
+
+        call_command('maintain_partitions', '--ahead', '6', '--retain-months', '0', stdout=StringIO())
+        months = [month for month, _ in list_partitions(connection, 'dashboard_notification')]
+        self.assertIn(shift_month(self.this_month, 6), months)
+
+        out = StringIO()
+        call_command('maintain_partitions', '--retain-months', '1', '--drop', stdout=out)
+        self.assertNotIn(self.last_month, [m for m, _ in list_partitions(connection, 'dashboard_notification')])
+        # 주문이 남아 있는 항목 파티션은 떼어내지 않는다
+        self.assertIn(self.last_month, [m for m, _ in list_partitions(connection, 'orders_orderitem')])
+        self.assertIn(partition_name('orders_orderitem', self.last_month), out.getvalue())
+        self.assertTrue(OrderItem.objects.filter(order=order).exists())
+
+    def test_missing_month_rows_move_out_of_default_partition(self):
+        table = 'dashboard_notification'
+        later = shift_month(self.this_month, settings.DB_PARTITION_MONTHS_AHEAD + 3)
+        notification = Notification.objects.create(user=self.user, message='먼 미래')
+        Notification.objects.filter(pk=notification.pk).update(created_at=month_bound(later))
+
+        def count_in(name):
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(name)}')
+                return cursor.fetchone()[0]
+
+        self.assertEqual(count_in(f'{table}_default'), 1)
+        # 기본 파티션에 그 달 행이 있어도 파티션 생성이 실패하지 않고 행을 옮긴다
+        self.assertEqual(create_partitions(connection, table, later, later), [partition_name(table, later)])
+        self.assertEqual(count_in(f'{table}_default'), 0)
+        self.assertEqual(count_in(partition_name(table, later)), 1)
+        self.assertTrue(Notification.objects.filter(pk=notification.pk).exists())
+        call_command('maintain_partitions', stdout=StringIO())
+
+
+class QueryCountRegressionTests(TestCase):
+    """모든 URL 의 쿼리 수가 데이터 규모(10행 / 1,000행)와 무관한지 확인 (N+1 회귀 방지).
+
+    새 URL 을 추가하면 _requests 에도 추가해야 test_every_url_is_covered 가 통과한다.
+    요청 옵션 bulk=True 는 대량 쓰기 요청으로, BULK_WRITE_QUERY_ALLOWANCE 까지의 배치 증가를 허용한다.
+    """
+    SIZES = (10, 1000)
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.accountant = User.objects.create_user(
+            username='accountant', password='pw', role=User.Role.ACCOUNTANT, parent=self.admin,
+        )
+        self.manager = User.objects.create_user(
+            username='manager', password='pw', role=User.Role.MANAGER, parent=self.admin,
+        )
+        self.agency = User.objects.create_user(
+            username='agency', password='pw', role=User.Role.AGENCY, parent=self.manager,
+        )
+        self.seller = User.objects.create_user(
+            username='seller', password='pw', role=User.Role.SELLER, parent=self.agency,
+        )
+
+    def _seed(self, n):
+        """계층/상품/단가/주문/항목/알림/공지를 각각 n 건씩 만든다."""
+        sellers = User.objects.bulk_create([
+            User(username=f'seller-{i}', role=User.Role.SELLER, parent=self.agency, company_name=f'셀러{i}')
+            for i in range(n)
+        ])
+        categories = Category.objects.bulk_create([Category(name=f'카테고리{i}', display_order=i) for i in range(n)])
+        schema = [
+            {'name': 'url', 'label': 'URL', 'type': 'url', 'required': True},
+            {'name': 'qty', 'label': '수량', 'type': 'number', 'required': True, 'is_quantity': True},
+        ]
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'상품{i}', category=categories[0], base_price=Decimal('1000'), cost_price=Decimal('800'),
+                schema=schema, max_work_days=3,
+            )
+            for i in range(n)
+        ])
+        PricePolicy.objects.bulk_create([
+            PricePolicy(product=product, user=self.seller, price=Decimal('900')) for product in products
+        ])
+        PricePolicy.objects.bulk_create([
+            PricePolicy(product=products[0], user=seller, reduction_rate=10) for seller in sellers
+        ])
+
+        snapshot = OrderSchema.for_schema(schema)
+        now = timezone.now()
+        today = timezone.localdate()
+        statuses = [Order.Status.SUBMITTED, Order.Status.PROCESSING, Order.Status.COMPLETED, Order.Status.CANCELLED]
+        orders = Order.objects.bulk_create([
+            Order(
+                order_number=f'Q{n}-{i}', user=sellers[i], product=products[i % len(products)],
+                status=statuses[i % 4], total_amount=Decimal('11000'), item_count=1, total_quantity=10,
+                deadline=today + timedelta(days=i % 10), item_fields=['url', 'qty'], schema_snapshot=snapshot,
+                confirmed_at=now if statuses[i % 4] in (Order.Status.PROCESSING, Order.Status.COMPLETED) else None,
+                confirmed_by=self.admin,
+            )
+            for i in range(n)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, row_number=1, data={'url': 'https://a.test', 'qty': '10'}, unit_price=1000)
+            for order in orders
+        ])
+        big_order = Order.objects.create(
+            order_number=f'BIG{n}', user=self.seller, product=products[0], status=Order.Status.SUBMITTED,
+            total_amount=Decimal('11000'), item_count=n, total_quantity=n, deadline=today,
+            item_fields=['url', 'qty'], schema_snapshot=snapshot,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=big_order, row_number=i + 1, data={'url': f'https://{i}.test', 'qty': '1'})
+            for i in range(n)
+        ])
+        for user in (self.admin, self.seller):
+            Notification.objects.bulk_create([
+                Notification(user=user, message=f'알림 {i}', link='/orders/') for i in range(n)
+            ])
+        notices = Notice.objects.bulk_create([
+            Notice(title=f'공지 {i}', content='내용', created_by=self.admin) for i in range(n)
+        ])
+        return {
+            'n': n, 'sellers': sellers, 'categories': categories, 'products': products, 'orders': orders,
+            'big_order': big_order, 'notice': notices[0],
+            'policy': PricePolicy.objects.filter(user=self.seller).first(),
+            'notification': Notification.objects.filter(user=self.seller).first(),
+        }
+
+    def _excel(self, n):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['URL', '수량'])
+        for i in range(n):
+            ws.append([f'https://{i}.test', 1])
+        buf = BytesIO()
+        wb.save(buf)
+        return SimpleUploadedFile(
+            'orders.xlsx', buf.getvalue(),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    def _requests(self, ctx):
+        """(URL 이름, 사용자, method, reverse args, data, 요청 옵션) 목록."""
+        n = ctx['n']
+        big = ctx['big_order'].pk
+        product = ctx['products'][0].pk
+        category = ctx['categories'][0].pk
+        leaf = ctx['sellers'][-1].pk
+        # 폼 필드 수 제한(DATA_UPLOAD_MAX_NUMBER_FIELDS) 안에서 최대한 많이 선택
+        order_ids = [o.pk for o in ctx['orders']][:500]
+        rows = [{'url': f'https://{i}.test', 'qty': '1'} for i in range(n)]
+        json_body = {'content_type': 'application/json'}
+        return [
+            ('dashboard:index', self.admin, 'get', [], {}, {}),
+            ('dashboard:index', self.manager, 'get', [], {}, {}),
+            ('dashboard:index', self.agency, 'get', [], {}, {}),
+            ('dashboard:index', self.seller, 'get', [], {}, {}),
+            ('dashboard:deadline_calendar', self.admin, 'get', [], {}, {}),
+            ('dashboard:api_deadline_events', self.admin, 'get', [], {}, {}),
+            ('dashboard:api_deadline_events', self.admin, 'get', [], {'mode': 'summary'}, {}),
+            ('dashboard:notification_unread', self.seller, 'get', [], {}, {}),
+            ('dashboard:notification_read', self.seller, 'post', [ctx['notification'].pk], {}, {}),
+            ('dashboard:notification_read_all', self.seller, 'post', [], {}, {}),
+            ('dashboard:profiling_stats', self.admin, 'get', [], {}, {}),
+            ('dashboard:notice_list', self.admin, 'get', [], {}, {}),
+            ('dashboard:notice_create', self.admin, 'get', [], {}, {}),
+            ('dashboard:notice_edit', self.admin, 'get', [ctx['notice'].pk], {}, {}),
+            ('dashboard:notice_delete', self.admin, 'post', [ctx['notice'].pk], {}, {}),
+            ('accounts:login', None, 'post', [], {'username': 'seller', 'password': 'pw'}, {}),
+            ('accounts:logout', self.seller, 'post', [], {}, {}),
+            ('accounts:user_list', self.admin, 'get', [], {}, {}),
+            ('accounts:api_user_tree', self.admin, 'get', [], {'parent': self.agency.pk}, {}),
+            ('accounts:api_parent_options', self.admin, 'get', [], {'role': 'agency'}, {}),
+            ('accounts:user_create', self.admin, 'get', [], {}, {}),
+            ('accounts:user_edit', self.admin, 'get', [leaf], {}, {}),
+            ('accounts:user_delete', self.admin, 'post', [leaf], {}, {}),
+            ('products:product_list', self.admin, 'get', [], {}, {}),
+            ('products:product_create', self.admin, 'get', [], {}, {}),
+            ('products:product_edit', self.admin, 'get', [product], {}, {}),
+            ('products:api_product_schema', self.seller, 'get', [product], {}, {}),
+            ('products:price_policy_list', self.admin, 'get', [], {}, {}),
+            ('products:price_matrix', self.admin, 'get', [], {}, {}),
+            ('products:api_price_save', self.admin, 'post', [],
+             json.dumps({'product_id': product, 'user_id': self.seller.pk, 'price': 950}), json_body),
+            ('products:price_policy_create', self.admin, 'get', [], {}, {}),
+            ('products:price_policy_edit', self.admin, 'get', [ctx['policy'].pk], {}, {}),
+            ('products:price_policy_delete', self.admin, 'post', [ctx['policy'].pk], {}, {}),
+            ('products:category_list', self.admin, 'get', [], {}, {}),
+            ('products:category_create', self.admin, 'get', [], {}, {}),
+            ('products:category_edit', self.admin, 'get', [category], {}, {}),
+            ('products:category_delete', self.admin, 'post', [ctx['categories'][-1].pk], {}, {}),
+            ('products:category_reorder', self.admin, 'post', [],
+             json.dumps({'order': [c.pk for c in reversed(ctx['categories'])]}), {**json_body, 'bulk': True}),
+            ('products:api_category_products', self.seller, 'get', [category], {}, {}),
+            ('orders:order_grid', self.seller, 'get', [], {}, {}),
+            ('orders:api_order_submit', self.seller, 'post', [],
+             json.dumps({'product_id': product, 'rows': rows}), {**json_body, 'bulk': True}),
+            ('orders:api_excel_template', self.seller, 'get', [product], {}, {}),
+            ('orders:api_excel_upload', self.seller, 'post', [],
+             {'product_id': product, 'file': self._excel(n)}, {}),
+            ('orders:order_list', self.admin, 'get', [], {}, {}),
+            ('orders:order_list', self.agency, 'get', [], {}, {}),
+            ('orders:order_detail', self.admin, 'get', [big], {}, {}),
+            ('orders:api_order_items', self.admin, 'get', [big], {}, {}),
+            ('orders:order_cancel', self.admin, 'post', [big], {}, {}),
+            ('orders:order_delete', self.admin, 'post', [big], {}, {}),
+            ('orders:order_status_update', self.admin, 'post', [big], {'status': Order.Status.PROCESSING}, {}),
+            # 일괄 변경 전에 접수완료 주문으로 입금확인 성공 경로를 잰다
+            ('orders:order_confirm_payment', self.admin, 'post', [ctx['orders'][0].pk], {}, {}),
+            ('orders:order_bulk_status_update', self.admin, 'post', [],
+             {'order_ids': order_ids, 'status': Order.Status.COMPLETED}, {'bulk': True}),
+            ('orders:order_approve', self.admin, 'post', [big], {}, {}),
+            ('orders:order_deadline_update', self.admin, 'post', [big], {'deadline': '2030-01-01'}, {}),
+            ('orders:api_order_renew_data', self.seller, 'get', [big], {}, {}),
+            ('orders:order_items_export', self.admin, 'get', [big], {}, {}),
+            ('orders:order_export', self.admin, 'get', [], {}, {}),
+            ('orders:settlement_list', self.admin, 'get', [], {}, {}),
+            ('orders:settlement_list', self.admin, 'get', [], {'export': 'excel'}, {}),
+            ('orders:settlement_close', self.admin, 'post', [], {}, {}),
+            ('orders:analytics_report', self.admin, 'get', [], {}, {}),
+            ('orders:settlement_secret', self.admin, 'get', [], {}, {}),
+        ]
+
+    def _measure(self, n):
+        counts = {}
+        self.bulk_labels = set()
+        with transaction.atomic():
+            ctx = self._seed(n)
+            for name, user, method, args, data, options in self._requests(ctx):
+                label = f'{name} ({user.username if user else "anonymous"} {method} {sorted(data) if isinstance(data, dict) else "json"})'
+                if options.pop('bulk', False):
+                    self.bulk_labels.add(label)
+                cache.clear()
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                # 요청마다 변경 사항을 되돌려 다음 요청의 데이터 규모를 유지
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as queries:
+                        response = getattr(self.client, method)(reverse(name, args=args), data, **options)
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 500, label)
+                counts[label] = len(queries)
+            transaction.set_rollback(True)
+        return counts
+
+    def test_every_url_is_covered(self):
+        names = {
+            f'{pattern.namespace}:{child.name}'
+            for pattern in get_resolver().url_patterns
+            if getattr(pattern, 'namespace', None) in QUERY_COUNT_NAMESPACES
+            for child in pattern.url_patterns
+        }
+        covered = {request[0] for request in self._requests(self._seed(self.SIZES[0]))}
+        self.assertEqual(names - covered, set())
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        small, large = (self._measure(n) for n in self.SIZES)
+        for label, count in small.items():
+            with self.subTest(label):
+                allowance = BULK_WRITE_QUERY_ALLOWANCE if label in self.bulk_labels else 0
+                self.assertLessEqual(large[label], count + allowance, f'{count} queries at {self.SIZES[0]} rows')
+
+    def test_bulk_status_update_syncs_items_and_notifies(self):
+        ctx = self._seed(self.SIZES[0])
+        order_ids = [o.pk for o in ctx['orders']]
+        self.client.force_login(self.admin)
+        # 접수완료/작업중 주문만 완료로 옮겨진다 — 완료/취소 주문은 전이표에서 제외
+        open_ids = [o.pk for o in ctx['orders'] if o.status in (Order.Status.SUBMITTED, Order.Status.PROCESSING)]
+        self.client.post(reverse('orders:order_bulk_status_update'), {
+            'order_ids': order_ids, 'status': Order.Status.COMPLETED,
+        })
+        self.assertFalse(Order.objects.filter(pk__in=open_ids).exclude(status=Order.Status.COMPLETED).exists())
+        self.assertEqual(
+            Order.objects.filter(pk__in=order_ids, status=Order.Status.CANCELLED).count(),
+            sum(o.status == Order.Status.CANCELLED for o in ctx['orders']),
+        )
+        self.assertFalse(OrderItem.objects.filter(order_id__in=open_ids).exclude(status=OrderItem.Status.COMPLETED).exists())
+        self.assertEqual(OutboxEvent.objects.count(), len(open_ids))
+        dispatch()
+        self.assertEqual(Notification.objects.filter(message__endswith='상태: 완료').count(), len(open_ids))
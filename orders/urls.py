@@ -10,6 +10,7 @@ urlpatterns = [
     path('api/excel-upload/', views.api_excel_upload, name='api_excel_upload'),
     path('', views.order_list, name='order_list'),
     path('<int:pk>/', views.order_detail, name='order_detail'),
+    path('<int:pk>/items/', views.api_order_items, name='api_order_items'),
     path('<int:pk>/cancel/', views.order_cancel, name='order_cancel'),
     path('<int:pk>/delete/', views.order_delete, name='order_delete'),
     path('<int:pk>/status/', views.order_status_update, name='order_status_update'),
@@ -21,5 +22,7 @@ urlpatterns = [
     path('<int:pk>/export-items/', views.order_items_export, name='order_items_export'),
     path('export/', views.order_export, name='order_export'),
     path('settlement/', views.settlement_list, name='settlement_list'),
+    path('settlement/close/', views.settlement_close, name='settlement_close'),
+    path('analytics/', views.analytics_report, name='analytics_report'),
     path('settlement/secret/', views.settlement_secret, name='settlement_secret'),
 ]
@@ -10,9 +10,9 @@ from urllib.parse import quote
 import openpyxl
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ImproperlyConfigured
 from django.core.paginator import Paginator
-from django.db import models
-from django.db.models import Count, Sum
+from django.db import models, transaction
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -21,24 +21,59 @@ from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.worksheet.datavalidation import DataValidation
 
 from accounts.models import User
-from dashboard.models import Notification
-from products.models import Category, PricePolicy, Product
-
-from .models import Order
-from .services import cancel_order, confirm_payment, create_order
+from config.db import read_from_replica
+from products.models import Category, Product
+
+from .analytics import REPORT_DIMENSIONS, load_manifest, query_order_totals
+from .models import ArchivedOrder, Order, OrderItem, unpack_item
+from .services import (
+    IDEMPOTENCY_KEY_MAX_LENGTH, TRANSITION_APPLIED, SubmissionInProgress, cancel_order, complete_submission,
+    confirm_payment, create_order, next_statuses, release_submission, reserve_submission, submission_hash,
+    transition_order, transition_orders,
+)
+from .settlement import close_settlement_period, get_closed_month, settlement_rows
 from .validators import validate_order_data
 
 logger = logging.getLogger(__name__)
 
+ORDER_ITEMS_PAGE_SIZE = 200
+ORDER_ITEMS_MAX_PAGE_SIZE = 1000
+
+
+def _can_view_order(user, order):
+    """주문 조회 권한: 관리자/경리/책임자는 범위 내, 대행사는 본인+소속 셀러, 그 외 본인 주문."""
+    if user.is_admin or user.is_accountant or user.is_manager:
+        return order.user_id in user.get_all_order_user_ids()
+    if user.is_agency:
+        return order.user_id == user.id or (order.user is not None and order.user.parent_id == user.id)
+    return order.user_id == user.id
+
 
-def _notify_order_status(order):
-    Notification.objects.create(
-        user=order.user,
-        message=f'주문 {order.order_number} 상태: {order.get_status_display()}',
-        link=f'/orders/{order.pk}/',
+def _orders_with_snapshot():
+    """주문 + 접수 시점 스키마. 상품은 이름만 쓰므로 스키마/설명 JSON 은 읽지 않는다."""
+    return Order.objects.select_related('user', 'product', 'schema_snapshot').defer(
+        'product__schema', 'product__description',
     )
 
 
+def _get_order(queryset, pk):
+    """주문 조회 — 보관된 주문이면 보관본에서 복원한 읽기 전용 Order, 둘 다 없으면 404."""
+    try:
+        return queryset.get(pk=pk)
+    except Order.DoesNotExist:
+        archived = get_object_or_404(
+            ArchivedOrder.objects.select_related('user__parent', 'product', 'schema_snapshot'), pk=pk,
+        )
+        return archived.to_order()
+
+
+def _item_cells(order):
+    """항목 cells (row_number 순) — 보관된 주문은 보관본에서."""
+    if order.archive:
+        return [cells for (cells,) in order.archive.item_values('cells')]
+    return order.items.order_by('row_number').values_list('cells', flat=True).iterator()
+
+
 def _safe_excel_text(value):
     text = '' if value is None else str(value)
     if text.startswith(('=', '+', '-', '@')):
@@ -60,9 +95,46 @@ def order_grid(request):
     })
 
 
+def _replayed_submission(response):
+    return JsonResponse(response, headers={'Idempotent-Replayed': 'true'})
+
+
+def _submit_order(request, product_id, rows, memo, submission):
+    try:
+        product = get_object_or_404(Product, pk=product_id, is_active=True)
+        valid_rows, errors = validate_order_data(rows, product.schema)
+        if errors:
+            return JsonResponse({'success': False, 'errors': errors}, status=400)
+
+        if not valid_rows:
+            return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': '유효한 데이터가 없습니다.'}]}, status=400)
+
+        with transaction.atomic():
+            order = create_order(request.user, product, valid_rows, memo)
+            total = int(order.total_amount)
+            supply = int(round(total / Decimal('1.1')))
+            result = {
+                'success': True,
+                'order_number': order.order_number,
+                'item_count': order.item_count,
+                'total_amount': total,
+                'supply_amount': supply,
+                'vat_amount': total - supply,
+            }
+            if submission is not None:
+                complete_submission(submission, order, result)
+        return JsonResponse(result)
+    except ValueError as exc:
+        return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': str(exc)}]}, status=400)
+
+
 @login_required
 @require_POST
 def api_order_submit(request):
+    """주문 접수. Idempotency-Key 헤더가 있으면 같은 키의 재요청(더블클릭/재시도)에 저장된 응답을 돌려준다.
+
+    키는 주문 생성 전에 예약하므로, 처리 중에 도착한 같은 키의 요청은 주문을 만들지 않고 409 를 받는다.
+    """
     if request.user.is_manager:
         return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': '책임자는 접수할 수 없습니다.'}]}, status=403)
     try:
@@ -70,34 +142,35 @@ def api_order_submit(request):
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': '잘못된 JSON 형식입니다.'}]}, status=400)
 
-    try:
-        product_id = body.get('product_id')
-        rows = body.get('rows', [])
-        memo = body.get('memo', '')
+    key = request.headers.get('Idempotency-Key', '').strip()
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': '요청 키가 너무 깁니다.'}]}, status=400)
 
-        product = get_object_or_404(Product, pk=product_id, is_active=True)
-        valid_rows, errors = validate_order_data(rows, product.schema)
-        if errors:
-            return JsonResponse({'success': False, 'errors': errors}, status=400)
-
-        if not valid_rows:
-            return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': '유효한 데이터가 없습니다.'}]}, status=400)
+    product_id = body.get('product_id')
+    rows = body.get('rows', [])
+    memo = body.get('memo', '')
+    if not key:
+        return _submit_order(request, product_id, rows, memo, None)
 
-        order = create_order(request.user, product, valid_rows, memo)
-        total = int(order.total_amount)
-        supply = int(round(total / Decimal('1.1')))
-        vat = total - supply
-
-        return JsonResponse({
-            'success': True,
-            'order_number': order.order_number,
-            'item_count': order.item_count,
-            'total_amount': total,
-            'supply_amount': supply,
-            'vat_amount': vat,
-        })
+    try:
+        submission, replay = reserve_submission(request.user, key, submission_hash(product_id, rows, memo))
+    except SubmissionInProgress as exc:
+        return JsonResponse(
+            {'success': False, 'errors': [{'row': 0, 'message': str(exc)}]}, status=409, headers={'Retry-After': '2'},
+        )
     except ValueError as exc:
-        return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': str(exc)}]}, status=400)
+        return JsonResponse({'success': False, 'errors': [{'row': 0, 'message': str(exc)}]}, status=422)
+    if replay is not None:
+        return _replayed_submission(replay)
+
+    try:
+        response = _submit_order(request, product_id, rows, memo, submission)
+    except BaseException:
+        release_submission(submission)
+        raise
+    if response.status_code != 200:
+        release_submission(submission)
+    return response
 
 
 @login_required
@@ -357,34 +430,59 @@ def order_list(request):
 
 @login_required
 def order_detail(request, pk):
-    order = get_object_or_404(Order.objects.select_related('user', 'user__parent', 'product', 'approved_by'), pk=pk)
-    user = request.user
-    if user.is_admin or user.is_accountant or user.is_manager:
-        if order.user_id not in user.get_all_order_user_ids():
-            return redirect('orders:order_list')
-    elif user.is_agency:
-        child_ids = list(User.objects.filter(parent=user).values_list('id', flat=True))
-        if order.user_id not in child_ids + [user.id]:
-            return redirect('orders:order_list')
-    elif order.user != user:
+    order = _get_order(_orders_with_snapshot().select_related('user__parent', 'approved_by'), pk)
+    if not _can_view_order(request.user, order):
         return redirect('orders:order_list')
 
-    schema = order.product.schema or []
-    columns = [f.get('label', f['name']) for f in schema]
-    items = order.items.all()
-    item_rows = []
-    for item in items:
-        values = [item.data.get(f['name'], '') for f in schema]
-        item_rows.append({
-            'item': item,
-            'values': values,
-        })
-
+    # 항목은 api_order_items 로 페이지 단위로 불러와 가상 스크롤 테이블에 렌더링
     return render(request, 'orders/order_detail.html', {
         'order': order,
-        'items': items,
-        'columns': columns,
-        'item_rows': item_rows,
+        'status_choices': [(value, Order.Status(value).label) for value in next_statuses(order.status)],
+        'columns': [column['label'] for column in order.columns],
+        'item_page_size': ORDER_ITEMS_PAGE_SIZE,
+    })
+
+
+@login_required
+def api_order_items(request, pk):
+    """주문 항목 JSON — row_number 기준 키셋 페이지 (after 이후 limit 건).
+
+    rows: [row_number, [스키마 순서 값...], status, unit_price(셀러 제외)]
+    """
+    order = _get_order(Order.objects.select_related('user', 'schema_snapshot'), pk)
+    user = request.user
+    if not _can_view_order(user, order):
+        return JsonResponse({'success': False, 'message': '접근 권한이 없습니다.'}, status=403)
+
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = min(max(int(request.GET.get('limit', ORDER_ITEMS_PAGE_SIZE)), 1), ORDER_ITEMS_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': '잘못된 요청입니다.'}, status=400)
+
+    read = order.item_reader([column['name'] for column in order.columns])
+    show_price = not user.is_seller
+    fields = ['row_number', 'cells', 'status'] + (['unit_price'] if show_price else [])
+    if order.archive:
+        items = [item for item in order.archive.item_values(*fields) if item[0] > after][:limit + 1]
+    else:
+        items = list(
+            order.items.filter(row_number__gt=after).order_by('row_number').values_list(*fields)[:limit + 1]
+        )
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    rows = []
+    for item in items:
+        row = [item[0], read(item[1]), item[2]]
+        if show_price:
+            row.append(int(item[3]))
+        rows.append(row)
+    return JsonResponse({
+        'success': True,
+        'rows': rows,
+        'statuses': dict(OrderItem.Status.choices),
+        'next': items[-1][0] if has_more else None,
     })
 
 
@@ -403,9 +501,7 @@ def order_cancel(request, pk):
         return redirect('orders:order_detail', pk=pk)
 
     try:
-        cancel_order(order, user)
-        order.refresh_from_db()
-        _notify_order_status(order)
+        cancel_order(order, user, allowed_from={Order.Status.SUBMITTED})
         messages.success(request, '주문이 취소되었습니다.')
     except ValueError as exc:
         messages.error(request, str(exc))
@@ -438,16 +534,11 @@ def order_status_update(request, pk):
         return redirect('orders:order_list')
     new_status = request.POST.get('status')
     if new_status in dict(Order.Status.choices):
-        order.status = new_status
-        order.save(update_fields=['status', 'updated_at'])
-        # 주문 항목 상태 동기화
-        from .models import OrderItem
-        if new_status == Order.Status.PROCESSING:
-            order.items.exclude(status=OrderItem.Status.COMPLETED).update(status=OrderItem.Status.PROCESSING)
-        elif new_status == Order.Status.COMPLETED:
-            order.items.update(status=OrderItem.Status.COMPLETED)
-        _notify_order_status(order)
-        messages.success(request, f'주문 상태가 {order.get_status_display()}(으)로 변경되었습니다.')
+        try:
+            transition_order(order, new_status, by=request.user)
+            messages.success(request, f'주문 상태가 {order.get_status_display()}(으)로 변경되었습니다.')
+        except ValueError as exc:
+            messages.error(request, str(exc))
     return redirect('orders:order_detail', pk=pk)
 
 
@@ -465,21 +556,14 @@ def order_bulk_status_update(request):
 
     allowed_user_ids = request.user.get_all_order_user_ids()
     orders = Order.objects.filter(pk__in=order_ids, user_id__in=allowed_user_ids)
-    from .models import OrderItem
-    count = 0
-    for order in orders:
-        order.status = new_status
-        order.save(update_fields=['status', 'updated_at'])
-        # 주문 항목 상태 동기화
-        if new_status == Order.Status.PROCESSING:
-            order.items.exclude(status=OrderItem.Status.COMPLETED).update(status=OrderItem.Status.PROCESSING)
-        elif new_status == Order.Status.COMPLETED:
-            order.items.update(status=OrderItem.Status.COMPLETED)
-        _notify_order_status(order)
-        count += 1
+    # 조건부 UPDATE 1회 + 항목 동기화 + 이벤트 기록 — 주문 수와 무관하게 쿼리 수 일정
+    outcomes = transition_orders(orders, new_status, by=request.user)
+    count = sum(1 for outcome, _ in outcomes.values() if outcome == TRANSITION_APPLIED)
 
     status_label = dict(Order.Status.choices).get(new_status)
     messages.success(request, f'{count}건의 주문이 {status_label}(으)로 변경되었습니다.')
+    if count < len(outcomes):
+        messages.warning(request, f'{len(outcomes) - count}건은 현재 상태에서 {status_label}(으)로 변경할 수 없어 제외되었습니다.')
     return redirect('orders:order_list')
 
 
@@ -494,8 +578,6 @@ def order_confirm_payment(request, pk):
         return redirect('orders:order_list')
     try:
         confirm_payment(order, request.user)
-        order.refresh_from_db()
-        _notify_order_status(order)
         messages.success(request, f'주문 {order.order_number} 입금이 확인되었습니다.')
     except ValueError as exc:
         messages.error(request, str(exc))
@@ -544,9 +626,10 @@ def order_approve(request, pk):
 
 
 @login_required
+@read_from_replica
 def order_items_export(request, pk):
-    """주문 항목 엑셀 다운로드 — 상품 스키마 양식 그대로"""
-    order = get_object_or_404(Order.objects.select_related('user', 'user__parent', 'product', 'approved_by'), pk=pk)
+    """주문 항목 엑셀 다운로드 — 접수 시점 스키마 양식 그대로"""
+    order = _get_order(_orders_with_snapshot().select_related('user__parent'), pk)
     user = request.user
 
     # 권한 체크
@@ -560,8 +643,8 @@ def order_items_export(request, pk):
     elif order.user != user:
         return redirect('orders:order_list')
 
-    schema = order.product.schema or []
-    items = order.items.all().order_by('row_number')
+    columns = order.columns
+    read = order.item_reader([column['name'] for column in columns])
 
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -571,30 +654,18 @@ def order_items_export(request, pk):
     header_fill_default = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
     header_font = Font(color='FFFFFF', bold=True, size=11)
 
-    for col_idx, field in enumerate(schema, 1):
-        label = field.get('label', field['name'])
-        cell = ws.cell(row=1, column=col_idx, value=label)
+    for col_idx, column in enumerate(columns, 1):
+        cell = ws.cell(row=1, column=col_idx, value=column['label'])
 
-        color = (field.get('color') or '#4472C4').lstrip('#')
+        color = (column['color'] or '#4472C4').lstrip('#')
         cell.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
         cell.font = header_font
         cell.alignment = Alignment(horizontal='center')
-
-        ftype = field.get('type', 'text')
-        if ftype == 'date':
-            width = 14
-        elif ftype == 'number':
-            width = 12
-        elif ftype == 'url':
-            width = 30
-        else:
-            width = 20
-        ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = width
+        ws.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = column['width']
 
     # 데이터 행
-    for row_idx, item in enumerate(items, 2):
-        for col_idx, field in enumerate(schema, 1):
-            value = item.data.get(field['name'], '')
+    for row_idx, cells in enumerate(_item_cells(order), 2):
+        for col_idx, value in enumerate(read(cells), 1):
             ws.cell(row=row_idx, column=col_idx, value=_safe_excel_text(value))
 
     buf = BytesIO()
@@ -613,6 +684,7 @@ def order_items_export(request, pk):
 
 
 @login_required
+@read_from_replica
 def order_export(request):
     user = request.user
     if user.is_admin or user.is_accountant or user.is_manager:
@@ -656,34 +728,18 @@ def order_export(request):
 
 
 @login_required
+@read_from_replica
 def settlement_list(request):
     user = request.user
     if not (user.is_admin or user.is_accountant):
         return redirect('orders:order_list')
 
-    confirmed_statuses = [Order.Status.PAID, Order.Status.PROCESSING, Order.Status.COMPLETED]
-    allowed_user_ids = user.get_all_order_user_ids()
-    orders = Order.objects.select_related('user', 'product', 'confirmed_by').filter(
-        status__in=confirmed_statuses, user_id__in=allowed_user_ids
-    )
-
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     period = request.GET.get('period', 'month')
 
-    if date_from:
-        orders = orders.filter(confirmed_at__date__gte=date_from)
-    elif period == 'month' and not date_to:
-        now = timezone.now()
-        first_day = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        orders = orders.filter(confirmed_at__gte=first_day)
-
-    if date_to:
-        orders = orders.filter(confirmed_at__date__lte=date_to)
-
-    orders = orders.order_by('-confirmed_at')
-
-    summary = orders.aggregate(total_count=Count('id'), total_amount=Sum('total_amount'))
+    orders = settlement_rows(user.get_all_order_user_ids(), date_from, date_to, period)
+    summary = orders.summary()
 
     if request.GET.get('export') == 'excel':
         wb = openpyxl.Workbook()
@@ -702,7 +758,7 @@ def settlement_list(request):
 
         for row_idx, order in enumerate(orders, 2):
             ws.cell(row=row_idx, column=1, value=_safe_excel_text(order.order_number))
-            ws.cell(row=row_idx, column=2, value=_safe_excel_text(str(order.user)))
+            ws.cell(row=row_idx, column=2, value=_safe_excel_text(str(order.user) if order.user else '-'))
             ws.cell(row=row_idx, column=3, value=_safe_excel_text(order.product.name))
             ws.cell(row=row_idx, column=4, value=order.item_count)
             ws.cell(row=row_idx, column=5, value=int(order.total_amount))
@@ -723,15 +779,73 @@ def settlement_list(request):
     return render(request, 'orders/settlement_list.html', {
         'orders': orders_page,
         'summary': summary,
+        'closed_month': get_closed_month(),
         'date_from': date_from or '',
         'date_to': date_to or '',
         'period': period,
     })
 
 
+@login_required
+@require_POST
+def settlement_close(request):
+    """지난달까지의 정산을 마감하고 주문별 정산 수치를 스냅샷으로 고정."""
+    if not (request.user.is_admin or request.user.is_accountant):
+        return redirect('orders:order_list')
+
+    last_month = timezone.localdate().replace(day=1) - td(days=1)
+    try:
+        periods = close_settlement_period(last_month, closed_by=request.user)
+        months = ', '.join(f'{p.month:%Y-%m}' for p in periods)
+        messages.success(request, f'{months} 정산이 마감되었습니다.')
+    except ValueError as exc:
+        messages.error(request, str(exc))
+    return redirect('orders:settlement_list')
+
+
+@login_required
+def analytics_report(request):
+    """월별 Parquet 분석 저장소 기반 주문 이력 리포트 (운영 DB 미조회)."""
+    if not (request.user.is_admin or request.user.is_accountant):
+        return redirect('orders:order_list')
+
+    group_by = request.GET.get('group_by', 'month')
+    if group_by not in REPORT_DIMENSIONS:
+        group_by = 'month'
+    month_from = request.GET.get('month_from', '')
+    month_to = request.GET.get('month_to', '')
+
+    rows = []
+    error = ''
+    try:
+        rows = query_order_totals(
+            group_by=group_by,
+            month_from=month_from or None,
+            month_to=month_to or None,
+            user_ids=request.user.get_all_order_user_ids(),
+        )
+    except ImproperlyConfigured as exc:
+        error = str(exc)
+
+    return render(request, 'orders/analytics_report.html', {
+        'rows': rows,
+        'error': error,
+        'group_by': group_by,
+        'dimensions': [(key, label) for key, (label, _) in REPORT_DIMENSIONS.items()],
+        'month_from': month_from,
+        'month_to': month_to,
+        'manifest': sorted(load_manifest().items(), reverse=True),
+        'totals': {
+            'order_count': sum(r['order_count'] for r in rows),
+            'total_quantity': sum(r['total_quantity'] for r in rows),
+            'total_amount': sum(r['total_amount'] for r in rows),
+        },
+    })
+
+
 @login_required
 def api_order_renew_data(request, pk):
-    order = get_object_or_404(Order.objects.select_related('user', 'product'), pk=pk)
+    order = _get_order(Order.objects.select_related('user', 'product'), pk)
     user = request.user
 
     # 권한: 본인 OR admin/accountant/manager/agency(소속 셀러의 주문)
@@ -749,9 +863,7 @@ def api_order_renew_data(request, pk):
     if not order.product.is_active:
         return JsonResponse({'success': False, 'message': '해당 상품이 비활성 상태입니다. 재연장할 수 없습니다.'}, status=400)
 
-    rows = list(
-        order.items.order_by('row_number').values_list('data', flat=True)
-    )
+    rows = [unpack_item(order.item_fields, cells) for cells in _item_cells(order)]
 
     return JsonResponse({
         'success': True,
@@ -762,12 +874,13 @@ def api_order_renew_data(request, pk):
     })
 
 
-SETTLEMENT_SECRET_PASSWORD = os.getenv('SETTLEMENT_SECRET_PASSWORD', '1019')
+SETTLEMENT_SECRET_PASSWORD = os.getenv('SETTLEMENT_SECRET_PASSWORD', '')
 SETTLEMENT_SECRET_SESSION_KEY = 'settlement_secret_ok'
 SETTLEMENT_SECRET_SESSION_AGE_SECONDS = int(os.getenv('SETTLEMENT_SECRET_SESSION_AGE_SECONDS', '1800'))
 
 
 @login_required
+@read_from_replica
 def settlement_secret(request):
     if not (request.user.is_admin or request.user.is_accountant):
         return redirect('orders:order_list')
@@ -788,92 +901,13 @@ def settlement_secret(request):
     if not request.session.get(SETTLEMENT_SECRET_SESSION_KEY):
         return render(request, 'orders/settlement_secret_login.html')
 
-    confirmed_statuses = [Order.Status.PAID, Order.Status.PROCESSING, Order.Status.COMPLETED]
-    allowed_user_ids = request.user.get_all_order_user_ids()
-    orders = Order.objects.select_related('user', 'product', 'confirmed_by').filter(
-        status__in=confirmed_statuses, user_id__in=allowed_user_ids
-    )
-
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     period = request.GET.get('period', 'month')
 
-    if date_from:
-        orders = orders.filter(confirmed_at__date__gte=date_from)
-    elif period == 'month' and not date_to:
-        now = timezone.now()
-        first_day = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        orders = orders.filter(confirmed_at__gte=first_day)
-
-    if date_to:
-        orders = orders.filter(confirmed_at__date__lte=date_to)
-
-    orders = orders.order_by('-confirmed_at')
-
-    order_list_all = list(orders)
-
-    # PricePolicy를 미리 한번에 조회 (N+1 쿼리 방지)
-    policy_keys = set((o.product_id, o.user_id) for o in order_list_all)
-    if policy_keys:
-        q = models.Q()
-        for pid, uid in policy_keys:
-            q |= models.Q(product_id=pid, user_id=uid)
-        policies_map = {
-            (p.product_id, p.user_id): p
-            for p in PricePolicy.objects.filter(q)
-        }
-    else:
-        policies_map = {}
-
-    enriched_orders = []
-    sum_total_amount = Decimal('0')
-    sum_supply = Decimal('0')
-    sum_vat = Decimal('0')
-    sum_reduced_qty = 0
-    sum_reduced_profit = Decimal('0')
-
-    for order in order_list_all:
-        total = int(order.total_amount)
-        supply = int(round(Decimal(total) / Decimal('1.1')))
-        vat = total - supply
-
-        # 업체별 감은 비율 조회 → 없으면 상품 기본값 사용
-        policy = policies_map.get((order.product_id, order.user_id))
-        if policy and policy.reduction_rate is not None:
-            rate = policy.reduction_rate
-        else:
-            rate = order.product.reduction_rate or 0
-        total_qty = order.total_quantity or 0
-        reduced_qty = int(total_qty * rate / 100)
-        actual_qty = total_qty - reduced_qty
-        per_unit = Decimal(supply) / Decimal(total_qty) if total_qty > 0 else Decimal('0')
-        reduced_profit = int(Decimal(reduced_qty) * per_unit)
-
-        enriched_orders.append({
-            'order': order,
-            'supply': supply,
-            'vat': vat,
-            'reduction_rate': rate,
-            'total_qty': total_qty,
-            'reduced_qty': reduced_qty,
-            'actual_qty': actual_qty,
-            'reduced_profit': reduced_profit,
-        })
-
-        sum_total_amount += order.total_amount
-        sum_supply += supply
-        sum_vat += vat
-        sum_reduced_qty += reduced_qty
-        sum_reduced_profit += reduced_profit
-
-    summary = {
-        'total_count': len(order_list_all),
-        'total_amount': int(sum_total_amount),
-        'total_supply': int(sum_supply),
-        'total_vat': int(sum_vat),
-        'total_reduced_qty': sum_reduced_qty,
-        'total_reduced_profit': int(sum_reduced_profit),
-    }
+    # 마감월은 스냅샷, 미마감 기간만 DB에서 실시간 계산 (전체 목록을 메모리에 올리지 않음)
+    orders = settlement_rows(request.user.get_all_order_user_ids(), date_from, date_to, period)
+    summary = orders.summary()
 
     if request.GET.get('export') == 'excel':
         wb = openpyxl.Workbook()
@@ -891,29 +925,29 @@ def settlement_secret(request):
             cell.font = header_font
             cell.alignment = Alignment(horizontal='center')
 
-        for row_idx, item in enumerate(enriched_orders, 2):
-            o = item['order']
+        for row_idx, o in enumerate(orders, 2):
             ws.cell(row=row_idx, column=1, value=_safe_excel_text(o.order_number))
-            ws.cell(row=row_idx, column=2, value=_safe_excel_text(o.user.company_name or o.user.username))
+            # 스냅샷의 주문자는 탈퇴 시 비워진다 (SET_NULL)
+            ws.cell(row=row_idx, column=2, value=_safe_excel_text((o.user.company_name or o.user.username) if o.user else '-'))
             ws.cell(row=row_idx, column=3, value=_safe_excel_text(o.product.name))
-            ws.cell(row=row_idx, column=4, value=item['total_qty'])
-            ws.cell(row=row_idx, column=5, value=item['reduction_rate'])
-            ws.cell(row=row_idx, column=6, value=item['reduced_qty'])
-            ws.cell(row=row_idx, column=7, value=item['actual_qty'])
-            ws.cell(row=row_idx, column=8, value=item['supply'])
-            ws.cell(row=row_idx, column=9, value=item['vat'])
+            ws.cell(row=row_idx, column=4, value=o.total_qty)
+            ws.cell(row=row_idx, column=5, value=o.reduction_rate)
+            ws.cell(row=row_idx, column=6, value=o.reduced_qty)
+            ws.cell(row=row_idx, column=7, value=o.actual_qty)
+            ws.cell(row=row_idx, column=8, value=o.supply)
+            ws.cell(row=row_idx, column=9, value=o.vat)
             ws.cell(row=row_idx, column=10, value=int(o.total_amount))
-            ws.cell(row=row_idx, column=11, value=item['reduced_profit'])
+            ws.cell(row=row_idx, column=11, value=o.reduced_profit)
             ws.cell(row=row_idx, column=12, value=o.confirmed_at.strftime('%Y-%m-%d %H:%M') if o.confirmed_at else '-')
             ws.cell(row=row_idx, column=13, value=_safe_excel_text(o.get_status_display()))
 
-        sum_row = len(enriched_orders) + 2
+        sum_row = summary['total_count'] + 2
         sum_fill = PatternFill(start_color='F2F4F6', end_color='F2F4F6', fill_type='solid')
         sum_font = Font(bold=True)
         ws.cell(row=sum_row, column=1, value='합계').font = sum_font
-        ws.cell(row=sum_row, column=4, value=sum(i['total_qty'] for i in enriched_orders)).font = sum_font
+        ws.cell(row=sum_row, column=4, value=summary['total_qty']).font = sum_font
         ws.cell(row=sum_row, column=6, value=summary['total_reduced_qty']).font = sum_font
-        ws.cell(row=sum_row, column=7, value=sum(i['actual_qty'] for i in enriched_orders)).font = sum_font
+        ws.cell(row=sum_row, column=7, value=summary['total_actual_qty']).font = sum_font
         ws.cell(row=sum_row, column=8, value=summary['total_supply']).font = sum_font
         ws.cell(row=sum_row, column=9, value=summary['total_vat']).font = sum_font
         ws.cell(row=sum_row, column=10, value=summary['total_amount']).font = sum_font
@@ -929,7 +963,7 @@ def settlement_secret(request):
         wb.save(response)
         return response
 
-    paginator = Paginator(enriched_orders, 20)
+    paginator = Paginator(orders, 20)
     orders_page = paginator.get_page(request.GET.get('page'))
 
     return render(request, 'orders/settlement_secret.html', {
@@ -939,6 +973,3 @@ def settlement_secret(request):
         'date_to': date_to or '',
         'period': period,
     })
-
-
-
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from orders.models import bump_deadline_version
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name='카테고리명')
@@ -65,6 +67,13 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        # 상품명은 마감일 캘린더 이벤트 제목에 들어간다
+        if update_fields is None or 'name' in update_fields:
+            bump_deadline_version()
+
 
 class PricePolicy(models.Model):
     product = models.ForeignKey(
@@ -1,3 +1,55 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+
+from .models import Category, PricePolicy, Product
+
+
+class ProductApiTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role=User.Role.ADMIN)
+        self.seller = User.objects.create_user(username='seller', password='pw', role=User.Role.SELLER)
+        self.category = Category.objects.create(name='리뷰')
+        self.product_a = Product.objects.create(
+            name='A상품', category=self.category, base_price=Decimal('1000'), cost_price=Decimal('700'),
+            schema=[{'name': '키워드', 'type': 'text'}],
+        )
+        self.product_b = Product.objects.create(
+            name='B상품', category=self.category, base_price=Decimal('2000'), cost_price=Decimal('1500'), schema=[],
+        )
+        Product.objects.create(
+            name='C상품', category=self.category, base_price=Decimal('3000'), cost_price=Decimal('1'),
+            schema=[], is_active=False,
+        )
+        PricePolicy.objects.create(product=self.product_a, user=self.seller, price=Decimal('900'))
+        PricePolicy.objects.create(product=self.product_b, user=self.seller, price=None, reduction_rate=10)
+
+    def test_product_schema_uses_policy_price(self):
+        self.client.force_login(self.seller)
+        data = self.client.get(reverse('products:api_product_schema', args=[self.product_a.pk])).json()
+        self.assertEqual(data['price'], 900)
+        self.assertEqual(data['schema'], self.product_a.schema)
+        # 단가 미지정 정책은 기본단가, admin 은 원가
+        data = self.client.get(reverse('products:api_product_schema', args=[self.product_b.pk])).json()
+        self.assertEqual(data['price'], 2000)
+        self.client.force_login(self.admin)
+        data = self.client.get(reverse('products:api_product_schema', args=[self.product_a.pk])).json()
+        self.assertEqual(data['price'], 700)
+
+    def test_category_products_single_policy_query(self):
+        self.client.force_login(self.seller)
+        url = reverse('products:api_category_products', args=[self.category.pk])
+        with self.assertNumQueries(5):  # 세션, 사용자, 카테고리, 단가 정책, 상품
+            data = self.client.get(url).json()
+        self.assertEqual(
+            [(p['name'], p['price']) for p in data['products']],
+            [('A상품', 900), ('B상품', 2000)],
+        )
 
-# Create your tests here.
+    def test_missing_product_is_404(self):
+        self.client.force_login(self.seller)
+        response = self.client.get(reverse('products:api_product_schema', args=[9999]))
+        self.assertEqual(response.status_code, 404)
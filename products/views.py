@@ -1,4 +1,4 @@
-﻿from django.shortcuts import render, redirect, get_object_or_404
+﻿from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
@@ -63,38 +63,43 @@ def price_matrix(request):
     if not (request.user.is_admin or request.user.is_accountant):
         return redirect('dashboard:index')
     categories = Category.objects.filter(is_active=True).order_by('display_order', 'name')
-    products = Product.objects.filter(is_active=True).select_related('category').order_by('category__display_order', 'name')
+    products = Product.objects.filter(is_active=True).order_by('category__display_order', 'name')
     descendant_ids = request.user.get_descendant_ids()
-    users = User.objects.filter(role__in=['agency', 'seller'], is_active=True, id__in=descendant_ids).order_by('role', 'company_name')
-    policies = {
-        (p.product_id, p.user_id): p
-        for p in PricePolicy.objects.all()
+    users = User.objects.filter(
+        role__in=['agency', 'seller'], is_active=True, id__in=descendant_ids,
+    ).select_related('parent').order_by('role', 'company_name')
+    user_rows = list(users)
+    # 업체별로 설정된 단가만 내려보내고, 모달을 열 때 상품 목록과 합친다 (업체 x 상품 전체를 렌더링하지 않음)
+    user_data = {
+        u.id: {'name': u.company_name or u.username, 'policies': {}}
+        for u in user_rows
     }
-
-    matrix = []
-    for u in users:
-        row = {
-            'user': u,
-            'prices': []
+    for product_id, user_id, price, reduction_rate in PricePolicy.objects.filter(user__in=users).values_list(
+        'product_id', 'user_id', 'price', 'reduction_rate',
+    ):
+        if price is not None or reduction_rate is not None:
+            user_data[user_id]['policies'][product_id] = [int(price) if price is not None else None, reduction_rate]
+
+    matrix = [
+        {'user': u, 'configured_count': len(user_data[u.id]['policies'])}
+        for u in user_rows
+    ]
+    product_data = [
+        {
+            'productId': p.id,
+            'productName': p.name,
+            'categoryId': p.category_id or 0,
+            'basePrice': int(p.base_price),
+            'defaultRate': p.reduction_rate,
         }
-        for p in products:
-            policy = policies.get((p.id, u.id))
-            row['prices'].append({
-                'product': p,
-                'policy': policy,
-                'price': int(policy.price) if policy and policy.price is not None else None,
-                'reduction_rate': policy.reduction_rate if policy and policy.reduction_rate is not None else None,
-            })
-        row['configured_count'] = sum(
-            1 for item in row['prices']
-            if item['price'] is not None or item['reduction_rate'] is not None
-        )
-        matrix.append(row)
+        for p in products
+    ]
 
     return render(request, 'products/price_matrix.html', {
-        'products': products,
         'categories': categories,
         'matrix': matrix,
+        'product_data': product_data,
+        'user_data': user_data,
     })
 
 
@@ -201,16 +206,13 @@ def price_policy_delete(request, pk):
 
 
 @login_required
-def api_product_schema(request, pk):
-    product = get_object_or_404(Product, pk=pk)
-    user = request.user
+async def api_product_schema(request, pk):
+    product = await aget_object_or_404(Product, pk=pk)
+    user = await request.auser()
     # 해당 유저별 단가 조회 (admin은 원가, 그 외는 기본단가)
     default_price = product.cost_price if user.is_admin else product.base_price
-    try:
-        policy = PricePolicy.objects.get(product=product, user=user)
-        price = int(policy.price) if policy.price is not None else int(default_price)
-    except PricePolicy.DoesNotExist:
-        price = int(default_price)
+    policy_price = await PricePolicy.objects.filter(product=product, user=user).values_list('price', flat=True).afirst()
+    price = int(policy_price) if policy_price is not None else int(default_price)
     return JsonResponse({
         'schema': product.schema,
         'price': price,
@@ -281,33 +283,35 @@ def category_reorder(request):
     if not (request.user.is_admin or request.user.is_accountant):
         return JsonResponse({'error': 'forbidden'}, status=403)
     try:
-        order = json.loads(request.body).get('order', [])
-        for i, pk in enumerate(order):
-            Category.objects.filter(pk=int(pk)).update(display_order=i)
+        positions = {int(pk): i for i, pk in enumerate(json.loads(request.body).get('order', []))}
+        categories = list(Category.objects.filter(pk__in=positions).only('pk'))
+        for category in categories:
+            category.display_order = positions[category.pk]
+        Category.objects.bulk_update(categories, ['display_order'])
         return JsonResponse({'ok': True})
     except (json.JSONDecodeError, ValueError):
         return JsonResponse({'error': 'invalid'}, status=400)
 
 
 @login_required
-def api_category_products(request, pk):
+async def api_category_products(request, pk):
     """카테고리의 활성 상품 목록 JSON 반환"""
-    category = get_object_or_404(Category, pk=pk, is_active=True)
-    products = category.products.filter(is_active=True).order_by('name')
+    category = await aget_object_or_404(Category, pk=pk, is_active=True)
+    user = await request.auser()
+    # 사용자별 단가는 한 번에 조회 (admin은 원가, 그 외는 기본단가)
+    policy_prices = {
+        product_id: price
+        async for product_id, price in PricePolicy.objects.filter(
+            user=user, product__category=category, price__isnull=False,
+        ).values_list('product_id', 'price')
+    }
     data = []
-    for p in products:
-        # 사용자별 단가 조회 (admin은 원가, 그 외는 기본단가)
-        default_price = p.cost_price if request.user.is_admin else p.base_price
-        try:
-            policy = PricePolicy.objects.get(product=p, user=request.user)
-            price = int(policy.price) if policy.price is not None else int(default_price)
-        except PricePolicy.DoesNotExist:
-            price = int(default_price)
+    async for p in category.products.filter(is_active=True).order_by('name'):
+        default_price = p.cost_price if user.is_admin else p.base_price
         data.append({
             'id': p.id,
             'name': p.name,
             'description': p.description or '',
-            'price': price,
+            'price': int(policy_prices.get(p.id, default_price)),
         })
     return JsonResponse({'products': data})
-